@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Watch a running ADMP job and abort it when the trajectory becomes unphysical.
+
+This script:
+1. Tails the Gaussian log incrementally while g16 runs
+2. Tracks total energy drift from the first step summary (ETot) and the
+   fictitious electronic kinetic energy EKinP = ETot - (ETot-EKinP), which
+   measures how far the density matrix lags behind adiabaticity. EKinP is
+   compared with the nuclear kinetic energy EKinC of the same step, since
+   its healthy size scales with the temperature of the run (up to about
+   0.1 EKinC in admp_jobs/results/CF2O/800K, which terminated normally)
+3. Counts SCF convergence failures
+4. When a threshold is exceeded, terminates g16 and writes a flag file
+   (<log>.watchdog) describing why, so the runner can move on to the next
+   trajectory
+
+Exit codes: 0 when g16 finishes on its own, 2 when the run was aborted.
+
+Usage (from the runner, with g16 started in the background):
+    python admp_watchdog.py CF2O_ADMP_800K.log --pid $g16_pid
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import time
+
+ETOT_PATTERN = re.compile(r'\bETot\s*=\s*(-?\d+\.\d+(?:[DE][-+]?\d+)?)')
+ETOT_EKINP_PATTERN = re.compile(r'ETot-EKinP\s*=\s*(-?\d+\.\d+(?:[DE][-+]?\d+)?)')
+EKINC_PATTERN = re.compile(r'\bEKinC\s*=\s*(-?\d+\.\d+(?:[DE][-+]?\d+)?)')
+STEP_PATTERN = re.compile(r'Summary information for step\s+(\d+)')
+
+SCF_FAILURE_MARKERS = ("Convergence failure", "Convergence criterion not met")
+TERMINATION_MARKERS = ("Normal termination", "Error termination")
+
+def to_float(text):
+    """Parse a Gaussian number, which may use a D exponent."""
+    return float(text.replace('D', 'E'))
+
+class EnergyMonitor:
+    """Accumulates step summaries and decides whether a trajectory has diverged."""
+
+    def __init__(self, max_drift=2e-3, max_ekinp_ratio=0.25, max_scf_failures=3, max_ekinp=None):
+        self.max_drift = max_drift
+        self.max_ekinp_ratio = max_ekinp_ratio
+        self.max_ekinp = max_ekinp
+        self.max_scf_failures = max_scf_failures
+        self.step = None
+        self.reference_etot = None
+        self.etot = None
+        self.ekinc = None
+        self.scf_failures = 0
+        self.terminated = False
+
+    def feed(self, line):
+        """Process one log line; return a reason string if the run must stop."""
+        match = STEP_PATTERN.search(line)
+        if match:
+            self.step = int(match.group(1))
+            return None
+
+        if "ETot-EKinP" in line:
+            match = ETOT_EKINP_PATTERN.search(line)
+            if match and self.etot is not None:
+                ekinp = self.etot - to_float(match.group(1))
+                if self.max_ekinp is not None and abs(ekinp) > self.max_ekinp:
+                    return f"EKinP {ekinp:.6f} Eh exceeds {self.max_ekinp} Eh at step {self.step}"
+                if self.ekinc and abs(ekinp) > self.max_ekinp_ratio * self.ekinc:
+                    return (f"EKinP {ekinp:.6f} Eh exceeds {self.max_ekinp_ratio} x EKinC "
+                            f"({self.ekinc:.6f} Eh) at step {self.step}")
+            return None
+
+        match = EKINC_PATTERN.search(line)
+        if match:
+            self.ekinc = to_float(match.group(1))
+            return None
+
+        match = ETOT_PATTERN.search(line)
+        if match:
+            self.etot = to_float(match.group(1))
+            if self.reference_etot is None:
+                self.reference_etot = self.etot
+            drift = self.etot - self.reference_etot
+            if abs(drift) > self.max_drift:
+                return f"ETot drift {drift:.6f} Eh exceeds {self.max_drift} Eh at step {self.step}"
+            return None
+
+        if any(marker in line for marker in SCF_FAILURE_MARKERS):
+            self.scf_failures += 1
+            if self.scf_failures >= self.max_scf_failures:
+                return f"{self.scf_failures} SCF convergence failures by step {self.step}"
+        elif line.startswith("SCF Done:"):
+            self.scf_failures = 0
+        elif any(marker in line for marker in TERMINATION_MARKERS):
+            self.terminated = True
+
+        return None
+
+def follow(log_file, offset, partial):
+    """Read lines appended since offset; return (lines, new offset, trailing partial line)."""
+    try:
+        with open(log_file, 'r', errors='replace') as f:
+            f.seek(offset)
+            chunk = f.read()
+            offset = f.tell()
+    except FileNotFoundError:
+        return [], offset, partial
+
+    text = partial + chunk
+    lines = text.split('\n')
+    return lines[:-1], offset, lines[-1]
+
+def process_alive(pid):
+    """True while the process exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def descendants(pid):
+    """Process ids of all children of pid, recursively (Linux /proc)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # The command name may contain spaces; fields resume after ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+def terminate(pid, grace=30):
+    """Stop g16 and its link executables, escalating to SIGKILL after grace seconds."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        # Links (l502.exe, ...) run as children of g16
+        for target in descendants(pid) + [pid]:
+            try:
+                os.kill(target, sig)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + grace
+        while time.time() < deadline:
+            if not process_alive(pid):
+                return
+            time.sleep(1)
+
+def write_flag(flag_file, log_file, reason, monitor):
+    """Record why the run was aborted."""
+    with open(flag_file, 'w') as f:
+        json.dump({
+            'log': log_file,
+            'reason': reason,
+            'step': monitor.step,
+            'reference_etot': monitor.reference_etot,
+            'last_etot': monitor.etot,
+            'scf_failures': monitor.scf_failures,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }, f, indent=2)
+
+def watch(log_file, pid, monitor, flag_file, interval=10.0):
+    """Follow the log until g16 exits or a threshold is exceeded. Returns the exit code."""
+    offset = 0
+    partial = ""
+    while True:
+        alive = process_alive(pid)
+        lines, offset, partial = follow(log_file, offset, partial)
+        for line in lines:
+            reason = monitor.feed(line.strip())
+            if reason:
+                print(f"Watchdog: aborting {log_file}: {reason}", flush=True)
+                write_flag(flag_file, log_file, reason, monitor)
+                terminate(pid)
+                return 2
+        if not alive or monitor.terminated:
+            return 0
+        time.sleep(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Abort ADMP runs that stop conserving energy")
+    parser.add_argument("log_file", help="Gaussian log file being written")
+    parser.add_argument("--pid", type=int, required=True,
+                      help="Process id of g16; its link processes are stopped as well")
+    parser.add_argument("--max-drift", type=float, default=2e-3,
+                      help="Allowed |ETot - ETot(step 0)| in Hartree (default: 2e-3)")
+    parser.add_argument("--max-ekinp-ratio", type=float, default=0.25,
+                      help="Allowed fictitious electronic kinetic energy as a fraction of the "
+                           "nuclear kinetic energy EKinC (default: 0.25)")
+    parser.add_argument("--max-ekinp", type=float,
+                      help="Also abort when EKinP exceeds this many Hartree (default: no absolute limit)")
+    parser.add_argument("--max-scf-failures", type=int, default=3,
+                      help="Consecutive SCF convergence failures allowed (default: 3)")
+    parser.add_argument("--interval", type=float, default=10.0,
+                      help="Seconds between log checks (default: 10)")
+    parser.add_argument("--flag-file",
+                      help="Where to record an abort (default: <log_file>.watchdog)")
+
+    args = parser.parse_args()
+
+    monitor = EnergyMonitor(args.max_drift, args.max_ekinp_ratio, args.max_scf_failures, args.max_ekinp)
+    flag_file = args.flag_file or f"{args.log_file}.watchdog"
+    sys.exit(watch(args.log_file, args.pid, monitor, flag_file, args.interval))
+
+if __name__ == "__main__":
+    main()
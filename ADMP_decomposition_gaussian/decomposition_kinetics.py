@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Estimate decomposition rate constants from ADMP trajectories.
+
+This script:
+1. Reads every XYZ trajectory in admp_jobs/results/<molecule>/<temperature>/
+   (single runs, stitched segments and replicas)
+2. Finds the first dissociation in each trajectory: the first frame from which
+   a bond present in the starting geometry stays stretched beyond a multiple
+   of its covalent length
+3. Fits a first-order rate constant per temperature, treating trajectories
+   without a dissociation as censored at their length (k = events / total time)
+4. Fits Arrhenius parameters across temperatures, with bootstrap confidence
+   intervals obtained by resampling trajectories
+5. Writes one summary table (decomposition_kinetics.csv)
+
+Usage:
+    python decomposition_kinetics.py
+    python decomposition_kinetics.py --molecule CF2O --bootstrap 5000
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from results_catalog import find_artifacts
+
+# Covalent radii (Angstrom) used to identify bonds
+COVALENT_RADII = {
+    'H': 0.31, 'He': 0.28, 'Li': 1.28, 'Be': 0.96, 'B': 0.84, 'C': 0.76, 'N': 0.71,
+    'O': 0.66, 'F': 0.57, 'Ne': 0.58, 'Na': 1.66, 'Mg': 1.41, 'Al': 1.21, 'Si': 1.11,
+    'P': 1.07, 'S': 1.05, 'Cl': 1.02, 'Ar': 1.06, 'K': 2.03, 'Ca': 1.76, 'Br': 1.20,
+    'I': 1.39,
+}
+
+GAS_CONSTANT = 8.314462618e-3  # kJ/(mol K)
+SEGMENT_PATTERN = re.compile(r'_seg\d+$')
+
+def read_xyz_trajectory(xyz_file):
+    """
+    Return (symbols, coordinates) with coordinates shaped (frames, atoms, 3).
+
+    Raises ValueError for empty or truncated files, which get_xyz.py writes
+    for runs that failed before the first orientation block.
+    """
+    with open(xyz_file, 'r') as f:
+        lines = f.read().splitlines()
+
+    try:
+        n_atoms = int(lines[0])
+    except (IndexError, ValueError):
+        raise ValueError("no atom count on the first line") from None
+    block = n_atoms + 2
+    n_frames = len(lines) // block
+    if n_atoms < 1 or n_frames < 1:
+        raise ValueError(f"fewer than {block} lines for one frame")
+    symbols = [line.split()[0] for line in lines[2:2 + n_atoms]]
+
+    atom_lines = [lines[i * block + 2 + j] for i in range(n_frames) for j in range(n_atoms)]
+    coords = np.array([line.split()[1:4] for line in atom_lines], dtype=float)
+    return symbols, coords.reshape(n_frames, n_atoms, 3)
+
+def initial_bonds(symbols, coords, bond_factor=1.2):
+    """Return (i, j, reference length) arrays for bonds in the first frame."""
+    radii = np.array([COVALENT_RADII.get(s.capitalize(), 1.5) for s in symbols])
+    i, j = np.triu_indices(len(symbols), k=1)
+    reference = radii[i] + radii[j]
+    distances = np.linalg.norm(coords[0, i] - coords[0, j], axis=-1)
+    bonded = distances < bond_factor * reference
+    return i[bonded], j[bonded], reference[bonded]
+
+def first_dissociation(symbols, coords, break_factor=2.0, persist=10):
+    """
+    Return the frame index of the first dissociation, or None.
+
+    All bond lengths of all frames are computed at once; a bond counts as
+    broken from the first frame after which it stays beyond break_factor times
+    its covalent length for `persist` consecutive frames.
+    """
+    i, j, reference = initial_bonds(symbols, coords)
+    if len(i) == 0 or len(coords) < persist:
+        return None
+
+    lengths = np.linalg.norm(coords[:, i] - coords[:, j], axis=-1)
+    broken = (lengths > break_factor * reference).any(axis=1).astype(int)
+
+    # Number of broken frames in each window of `persist` frames
+    window = np.convolve(broken, np.ones(persist, dtype=int), mode='valid')
+    sustained = np.flatnonzero(window == persist)
+    return int(sustained[0]) if len(sustained) else None
+
+def trajectory_labels(xyz_file):
+    """Molecule and temperature (K) from results/<molecule>/<temperature>/."""
+    temperature = xyz_file.parent.name
+    return xyz_file.parent.parent.name, float(temperature.rstrip('Kk'))
+
+def collect_events(results_dir, molecule=None, time_step=0.1, break_factor=2.0, persist=10):
+    """
+    Detect dissociations in all trajectories.
+
+    Returns {molecule: {temperature: (events, times)}} where events is a 0/1
+    array per trajectory and times the dissociation time (or trajectory
+    length for censored runs) in fs.
+    """
+    data = {}
+    for xyz_file in find_artifacts(results_dir, ["xyz"], molecule=molecule):
+        if SEGMENT_PATTERN.search(xyz_file.stem):
+            continue
+        mol, temperature = trajectory_labels(xyz_file)
+        try:
+            symbols, coords = read_xyz_trajectory(xyz_file)
+        except ValueError as e:
+            print(f"  WARNING: Skipping {xyz_file.name}: {e}")
+            continue
+        frame = first_dissociation(symbols, coords, break_factor, persist)
+
+        event = frame is not None
+        time = (frame if event else len(coords) - 1) * time_step
+        per_temp = data.setdefault(mol, {}).setdefault(temperature, ([], []))
+        per_temp[0].append(int(event))
+        per_temp[1].append(time)
+
+        status = f"dissociates at {time:.1f} fs" if event else f"intact for {time:.1f} fs"
+        print(f"  {xyz_file.name}: {status}")
+
+    return {mol: {t: (np.array(e), np.array(times)) for t, (e, times) in per_temp.items()}
+            for mol, per_temp in data.items()}
+
+def rate(events, times):
+    """Events per fs of exposure along the last axis; NaN without any exposure."""
+    exposure = times.sum(axis=-1)
+    return np.divide(events.sum(axis=-1), exposure,
+                     out=np.full(np.shape(exposure), np.nan), where=exposure > 0)
+
+def bootstrap_rates(events, times, n_boot, rng):
+    """Resample trajectories with replacement; return n_boot rate estimates (1/fs)."""
+    idx = rng.integers(0, len(events), size=(n_boot, len(events)))
+    return rate(events[idx], times[idx])
+
+def arrhenius_fit(temperatures, rates):
+    """
+    Least-squares fit of ln k = ln A - Ea / RT.
+
+    rates may be 2D (bootstrap samples x temperatures); each row is fitted
+    independently. Returns (Ea in kJ/mol, ln A with k in 1/s).
+    """
+    x = 1.0 / np.asarray(temperatures)
+    y = np.log(np.asarray(rates) * 1e15)
+    x_mean = x.mean()
+    slope = ((x - x_mean) * (y - y.mean(axis=-1, keepdims=True))).sum(axis=-1) / ((x - x_mean) ** 2).sum()
+    intercept = y.mean(axis=-1) - slope * x_mean
+    return -slope * GAS_CONSTANT, intercept
+
+def percentile(values, q):
+    """Percentile ignoring resamples without exposure; NaN when there are none."""
+    values = values[~np.isnan(values)]
+    return np.percentile(values, q) if len(values) else np.nan
+
+def analyse(data, n_boot=2000, confidence=0.95, seed=0):
+    """Return summary rows with rate constants and Arrhenius parameters."""
+    rng = np.random.default_rng(seed)
+    tail = 100 * (1 - confidence) / 2
+    rows = []
+
+    for mol, per_temp in sorted(data.items()):
+        temperatures = sorted(per_temp)
+        rates = []
+        boot = []
+        for temperature in temperatures:
+            events, times = per_temp[temperature]
+            rates.append(rate(events, times))
+            boot.append(bootstrap_rates(events, times, n_boot, rng))
+        rates = np.array(rates)
+        boot = np.array(boot).T
+
+        # Temperatures without any dissociation carry no rate information
+        fitted = rates > 0
+        fit = {}
+        if fitted.sum() >= 2:
+            fit_temperatures = np.array(temperatures)[fitted]
+            ea, ln_a = arrhenius_fit(fit_temperatures, rates[fitted])
+            # Resamples that lost every event at some temperature cannot be fitted
+            fit_boot = boot[:, fitted]
+            fit_boot = fit_boot[(fit_boot > 0).all(axis=1)]
+            boot_ea, boot_ln_a = arrhenius_fit(fit_temperatures, fit_boot)
+            fit = {
+                'Ea_kJ_mol': ea,
+                'Ea_ci_low': np.percentile(boot_ea, tail),
+                'Ea_ci_high': np.percentile(boot_ea, 100 - tail),
+                'log10_A_per_s': ln_a / np.log(10),
+                'log10_A_ci_low': np.percentile(boot_ln_a, tail) / np.log(10),
+                'log10_A_ci_high': np.percentile(boot_ln_a, 100 - tail) / np.log(10),
+            }
+
+        for column, temperature in enumerate(temperatures):
+            events, times = per_temp[temperature]
+            row = {
+                'molecule': mol,
+                'temperature_K': temperature,
+                'trajectories': len(events),
+                'dissociations': int(events.sum()),
+                'exposure_fs': times.sum(),
+                'k_per_s': rates[column] * 1e15,
+                'k_ci_low': percentile(boot[:, column], tail) * 1e15,
+                'k_ci_high': percentile(boot[:, column], 100 - tail) * 1e15,
+            }
+            row.update(fit)
+            rows.append(row)
+
+    return rows
+
+def write_summary(rows, output_file):
+    """Write the summary table as CSV."""
+    columns = ['molecule', 'temperature_K', 'trajectories', 'dissociations', 'exposure_fs',
+               'k_per_s', 'k_ci_low', 'k_ci_high', 'Ea_kJ_mol', 'Ea_ci_low', 'Ea_ci_high',
+               'log10_A_per_s', 'log10_A_ci_low', 'log10_A_ci_high']
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, restval="")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: (f"{v:.6g}" if isinstance(v, float) else v) for k, v in row.items()})
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit decomposition kinetics from ADMP trajectories")
+    parser.add_argument("--results-dir", default="./admp_jobs/results",
+                      help="ADMP results directory (default: ./admp_jobs/results)")
+    parser.add_argument("--molecule", help="Only analyse this molecule")
+    parser.add_argument("--time-step", type=float, default=0.1,
+                      help="Time between trajectory frames in fs (default: 0.1)")
+    parser.add_argument("--break-factor", type=float, default=2.0,
+                      help="Bond counts as broken beyond this multiple of its covalent length (default: 2.0)")
+    parser.add_argument("--persist", type=int, default=10,
+                      help="Frames a bond must stay broken (default: 10)")
+    parser.add_argument("--bootstrap", type=int, default=2000,
+                      help="Bootstrap resamples for confidence intervals (default: 2000)")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                      help="Confidence level (default: 0.95)")
+    parser.add_argument("--seed", type=int, default=0,
+                      help="Bootstrap random seed (default: 0)")
+    parser.add_argument("--output", default="decomposition_kinetics.csv",
+                      help="Summary table (default: decomposition_kinetics.csv)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.results_dir):
+        print(f"Error: Results directory '{args.results_dir}' not found!")
+        sys.exit(1)
+
+    print(f"Reading trajectories from {args.results_dir}")
+    data = collect_events(args.results_dir, args.molecule, args.time_step,
+                          args.break_factor, args.persist)
+    if not data:
+        print("No trajectories found. Run get_xyz.py first.")
+        sys.exit(1)
+
+    rows = analyse(data, args.bootstrap, args.confidence, args.seed)
+    write_summary(rows, args.output)
+
+    print(f"\n{'molecule':<16}{'T (K)':>8}{'traj':>6}{'events':>8}{'k (1/s)':>12}  Ea (kJ/mol)")
+    for row in rows:
+        ea = f"{row['Ea_kJ_mol']:.1f}" if 'Ea_kJ_mol' in row else "-"
+        print(f"{row['molecule']:<16}{row['temperature_K']:>8.0f}{row['trajectories']:>6}"
+              f"{row['dissociations']:>8}{row['k_per_s']:>12.3e}  {ea}")
+    print(f"\nSummary written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,13 @@ ADMP is an ab initio molecular dynamics method that can be used to study thermal
 pathways of molecules by simulating their behavior at elevated temperatures.
 """
 
+import argparse
 import os
 import glob
+import math
+import random
 import re
+import sys
 from pathlib import Path
 
 # Configuration
@@ -24,9 +28,28 @@ DEFAULT_CONFIG = {
     'basis': "6-31G(d)",
     'mem': "8GB",
     'nproc': 8,
-    'rstf': 10  # Save checkpoint every n steps (ADMP RSTF parameter)
+    'rstf': 10,  # Save checkpoint every n steps (ADMP RSTF parameter)
+    'segments': 1,  # Split each trajectory into this many restartable runs
+    'replicas': 1,  # Independent trajectories per molecule and temperature
+    'seed': 2025  # Base seed for replica initial velocities
 }
 
+# Atomic masses (amu) for initial velocity sampling
+ATOMIC_MASSES = {
+    'H': 1.00794, 'He': 4.002602, 'Li': 6.941, 'Be': 9.012182, 'B': 10.811,
+    'C': 12.0107, 'N': 14.0067, 'O': 15.9994, 'F': 18.9984032, 'Ne': 20.1797,
+    'Na': 22.98976928, 'Mg': 24.305, 'Al': 26.9815386, 'Si': 28.0855, 'P': 30.973762,
+    'S': 32.065, 'Cl': 35.453, 'Ar': 39.948, 'K': 39.0983, 'Ca': 40.078,
+    'Br': 79.904, 'I': 126.90447,
+}
+ATOMIC_SYMBOLS = {1: 'H', 2: 'He', 3: 'Li', 4: 'Be', 5: 'B', 6: 'C', 7: 'N', 8: 'O',
+                  9: 'F', 10: 'Ne', 11: 'Na', 12: 'Mg', 13: 'Al', 14: 'Si', 15: 'P',
+                  16: 'S', 17: 'Cl', 18: 'Ar', 19: 'K', 20: 'Ca', 35: 'Br', 53: 'I'}
+
+BOLTZMANN = 1.380649e-23  # J/K
+AMU = 1.66053906660e-27  # kg
+BOHR = 0.529177210903e-10  # m
+
 def extract_geometry(file_path):
     """Extract geometry, charge, and multiplicity from a Gaussian input file."""
     geometry_lines = []
@@ -96,51 +119,243 @@ def create_admp_input(molecule_path, temp, output_dir,
         print(f"WARNING: No geometry found in {molecule_path}, skipping.")
         return False
         
+    # Header with proper ADMP specifications based on Gaussian documentation
+    lines = [f"%mem={mem}", f"%nprocshared={nproc}"]
+    # Route section with ADMP keyword - note that temperature is controlled via initial velocities
+    #lines += [f"# {method}/{basis} ADMP int=ultrafine", ""]
+    lines += [f"# {method}/{basis} ADMP int=ultrafine Temperature={temp}", ""]
+    
+    # Title
+    lines += [f"{molecule_name} ADMP thermal decomposition simulation targeting {temp}K", ""]
+    
+    # Charge, multiplicity and geometry
+    lines.append(f"{charge} {multiplicity}")
+    lines.extend(geometry)
+    
+    # Note: Initial velocities would need to be added here for temperature control
+    # This requires additional implementation to generate appropriate velocities
+    # based on the desired temperature
+    
+    # End file with newline
+    content = "\n".join(lines) + "\n\n"
+    
+    # Check the content for syntax errors before it is written, so the file is written once
+    if "'" in content or '"' in content:
+        print(f"WARNING: Unexpected quote characters found in {output_path}")
+        content = content.replace("'", "").replace('"', "")
+        print(f"Cleaned quote characters from {output_path}")
+    
     with open(output_path, 'w') as f:
-        # Header with proper ADMP specifications based on Gaussian documentation
-        f.write(f"%mem={mem}\n")
-        f.write(f"%nprocshared={nproc}\n")
-        # Write route section with ADMP keyword - note that temperature is controlled via initial velocities
-        #f.write(f"# {method}/{basis} ADMP int=ultrafine\n\n")
-        f.write(f"# {method}/{basis} ADMP int=ultrafine Temperature={temp}\n\n")
+        f.write(content)
         
-        # Title
-        f.write(f"{molecule_name} ADMP thermal decomposition simulation targeting {temp}K\n\n")
-        
-        # Charge and multiplicity
-        f.write(f"{charge} {multiplicity}\n")
+    print(f"Created {output_path}")
+    return True
+
+
+def segment_points(max_points, segments):
+    """Cumulative step counts at the end of each segment."""
+    return [round(max_points * k / segments) for k in range(1, segments + 1)]
+
+
+def create_admp_segments(molecule_path, temp, output_dir, segments,
+                         max_points=2000, method='B3LYP', basis='6-31G(d)',
+                         mem='8GB', nproc=8):
+    """Create restartable segment inputs for one ADMP trajectory.
+    
+    Segment 1 starts from the optimized geometry. Each later segment copies the
+    previous segment's checkpoint (%oldchk) and continues it with ADMP(Restart),
+    so a segment lost to walltime or preemption can be rerun on its own.
+    MaxPoints is cumulative over the trajectory."""
+    
+    molecule_name = os.path.basename(molecule_path).replace('.gjf', '')
+    base_name = f"{molecule_name}_ADMP_{temp}K"
+    
+    geometry, charge, multiplicity = extract_geometry(molecule_path)
+    
+    if not geometry:
+        print(f"WARNING: No geometry found in {molecule_path}, skipping.")
+        return []
+    
+    created = []
+    for segment, points in enumerate(segment_points(max_points, segments), start=1):
+        segment_name = f"{base_name}_seg{segment:02d}"
+        output_path = Path(output_dir) / f"{segment_name}.gjf"
         
-        # Write geometry
-        for line in geometry:
-            f.write(f"{line}\n")
+        with open(output_path, 'w') as f:
+            f.write(f"%mem={mem}\n")
+            f.write(f"%nprocshared={nproc}\n")
+            if segment > 1:
+                f.write(f"%oldchk={base_name}_seg{segment - 1:02d}.chk\n")
+            f.write(f"%chk={segment_name}.chk\n")
             
-        # Note: Initial velocities would need to be added here for temperature control
-        # This requires additional implementation to generate appropriate velocities
-        # based on the desired temperature
+            if segment == 1:
+                f.write(f"# {method}/{basis} ADMP(MaxPoints={points}) int=ultrafine Temperature={temp}\n\n")
+                f.write(f"{molecule_name} ADMP thermal decomposition simulation targeting {temp}K "
+                        f"(segment 1 of {segments})\n\n")
+                f.write(f"{charge} {multiplicity}\n")
+                for line in geometry:
+                    f.write(f"{line}\n")
+            else:
+                # Geometry, velocities and settings come from the checkpoint
+                f.write(f"# {method}/{basis} ADMP(Restart,MaxPoints={points}) int=ultrafine Temperature={temp}\n")
+            
+            f.write("\n")
         
-        # End file with newline
-        f.write("\n")
+        created.append(output_path)
+    
+    print(f"Created {len(created)} segments for {base_name} ({max_points} steps)")
+    return created
+
+
+def atom_mass(label):
+    """Mass in amu of an atom given by symbol or atomic number."""
+    if label.isdigit():
+        label = ATOMIC_SYMBOLS[int(label)]
+    return ATOMIC_MASSES[label.capitalize()]
+
+
+def sample_velocities(geometry, temp, rng, rescale=False):
+    """Sample Maxwell-Boltzmann Cartesian velocities (bohr/s) for a geometry.
+    
+    Centre-of-mass motion is removed; the sampled kinetic energy is kept, so
+    replicas start with energies spread as in a canonical ensemble. With
+    rescale=True every replica instead gets exactly the kinetic energy of the
+    target temperature over 3N-3 degrees of freedom."""
+    masses = [atom_mass(line.split()[0]) * AMU for line in geometry]
+    velocities = [[rng.gauss(0.0, math.sqrt(BOLTZMANN * temp / m)) for _ in range(3)]
+                  for m in masses]
+    
+    total_mass = sum(masses)
+    com = [sum(m * v[i] for m, v in zip(masses, velocities)) / total_mass for i in range(3)]
+    velocities = [[v[i] - com[i] for i in range(3)] for v in velocities]
+    
+    dof = 3 * len(masses) - 3
+    kinetic = 0.5 * sum(m * sum(c * c for c in v) for m, v in zip(masses, velocities))
+    if rescale and dof > 0 and kinetic > 0:
+        scale = math.sqrt(0.5 * dof * BOLTZMANN * temp / kinetic)
+        velocities = [[c * scale for c in v] for v in velocities]
+    
+    return [[c / BOHR for c in v] for v in velocities]
+
+
+def create_admp_replicas(molecule_path, temp, output_dir, replicas, seed,
+                         max_points=2000, method='B3LYP', basis='6-31G(d)',
+                         mem='8GB', nproc=8):
+    """Create R independent ADMP inputs for one molecule and temperature.
+    
+    Each replica _rNN starts from the optimized geometry with its own
+    Maxwell-Boltzmann velocities (ADMP(ReadVelocity)). The random stream is
+    seeded from (seed, molecule, temperature, replica), so regenerating the
+    inputs reproduces the same initial conditions.
+    
+    Returns a list of manifest records."""
+    
+    molecule_name = os.path.basename(molecule_path).replace('.gjf', '')
+    base_name = f"{molecule_name}_ADMP_{temp}K"
+    
+    geometry, charge, multiplicity = extract_geometry(molecule_path)
+    
+    if not geometry:
+        print(f"WARNING: No geometry found in {molecule_path}, skipping.")
+        return []
+    
+    records = []
+    for replica in range(1, replicas + 1):
+        replica_seed = f"{seed}:{molecule_name}:{temp}:{replica}"
+        velocities = sample_velocities(geometry, temp, random.Random(replica_seed))
+        replica_name = f"{base_name}_r{replica:02d}"
+        output_path = Path(output_dir) / f"{replica_name}.gjf"
         
-    # Verify the file content to ensure no syntax errors
-    try:
-        with open(output_path, 'r') as f:
-            content = f.read()
-            if "'" in content or '"' in content:
-                print(f"WARNING: Unexpected quote characters found in {output_path}")
-                # Remove any quote characters
-                content = content.replace("'", "").replace('"', "")
-                with open(output_path, 'w') as f_clean:
-                    f_clean.write(content)
-                print(f"Cleaned quote characters from {output_path}")
-    except Exception as e:
-        print(f"Error verifying file {output_path}: {e}")
+        with open(output_path, 'w') as f:
+            f.write(f"%mem={mem}\n")
+            f.write(f"%nprocshared={nproc}\n")
+            f.write(f"%chk={replica_name}.chk\n")
+            f.write(f"# {method}/{basis} ADMP(MaxPoints={max_points},ReadVelocity) int=ultrafine\n\n")
+            f.write(f"{molecule_name} ADMP replica {replica} of {replicas} at {temp}K (seed {replica_seed})\n\n")
+            f.write(f"{charge} {multiplicity}\n")
+            for line in geometry:
+                f.write(f"{line}\n")
+            f.write("\n")
+            # Initial velocities in bohr/s, one line per atom
+            for vx, vy, vz in velocities:
+                f.write(f"{vx:16.8E}{vy:16.8E}{vz:16.8E}\n")
+            f.write("\n")
         
-    print(f"Created {output_path}")
-    return True
+        records.append({
+            'input': output_path,
+            'molecule': molecule_name,
+            'temperature': temp,
+            'replica': replica,
+            'seed': replica_seed,
+        })
+    
+    print(f"Created {len(records)} replicas for {base_name}")
+    return records
 
 
-def main():
+def write_ensemble_manifest(records, output_dir):
+    """Write the tab-separated manifest read by submit_admp_array.s.
+    
+    Line N+1 describes array task N."""
+    manifest_path = Path(output_dir) / "ensemble_manifest.tsv"
+    with open(manifest_path, 'w') as f:
+        f.write("task\tinput\tmolecule\ttemperature\treplica\tseed\n")
+        for task, record in enumerate(records):
+            f.write(f"{task}\t{record['input']}\t{record['molecule']}\t{record['temperature']}\t"
+                    f"{record['replica']}\t{record['seed']}\n")
+    return manifest_path
+
+
+def parse_temperatures(values):
+    """Temperatures given as separate values or comma-separated (e.g. 600,800,1000)."""
+    return [int(value) for text in values for value in text.split(",") if value]
+
+
+def parse_args(argv=None):
+    """Command-line options; defaults come from DEFAULT_CONFIG."""
     config = DEFAULT_CONFIG
+    parser = argparse.ArgumentParser(description="Generate ADMP inputs at various temperatures")
+    # Both spellings are accepted: the README documents --max_points, the other scripts use dashes
+    parser.add_argument("--input_dir", "--input-dir", default=config['input_dir'],
+                      help="Directory containing optimized molecule files")
+    parser.add_argument("--output_dir", "--output-dir", default=config['output_dir'],
+                      help=f"Directory to store ADMP input files (default: {config['output_dir']})")
+    parser.add_argument("--temperatures", nargs="+", default=[str(t) for t in config['temperatures']],
+                      help="Temperatures in Kelvin, separate or comma-separated "
+                           f"(default: {','.join(map(str, config['temperatures']))})")
+    parser.add_argument("--max_points", "--max-points", type=int, default=config['max_points'],
+                      help=f"Maximum number of ADMP steps (default: {config['max_points']})")
+    parser.add_argument("--delta_t", "--delta-t", type=float, default=config['delta_t'],
+                      help=f"Time step in femtoseconds (default: {config['delta_t']})")
+    parser.add_argument("--method", default=config['method'],
+                      help=f"Computational method (default: {config['method']})")
+    parser.add_argument("--basis", default=config['basis'],
+                      help=f"Basis set (default: {config['basis']})")
+    parser.add_argument("--mem", default=config['mem'],
+                      help=f"Memory allocation for Gaussian (default: {config['mem']})")
+    parser.add_argument("--nproc", type=int, default=config['nproc'],
+                      help=f"Number of processors (default: {config['nproc']})")
+    parser.add_argument("--rstf", type=int, default=config['rstf'],
+                      help=f"Save a checkpoint every n steps (default: {config['rstf']})")
+    parser.add_argument("--segments", type=int, default=config['segments'],
+                      help="Split each trajectory into this many restartable runs "
+                           f"(default: {config['segments']})")
+    parser.add_argument("--replicas", type=int, default=config['replicas'],
+                      help=f"Independent trajectories per molecule and temperature (default: {config['replicas']})")
+    parser.add_argument("--seed", type=int, default=config['seed'],
+                      help=f"Base seed for replica initial velocities (default: {config['seed']})")
+    
+    args = parser.parse_args(argv)
+    args.temperatures = parse_temperatures(args.temperatures)
+    # Replicas are short array tasks started from sampled velocities; they are
+    # not split into restart segments
+    if args.replicas > 1 and args.segments > 1:
+        parser.error("--replicas and --segments cannot be combined")
+    return args
+
+
+def main():
+    config = dict(DEFAULT_CONFIG, **vars(parse_args()))
     
     # Create output directory
     output_dir = Path(config['output_dir'])
@@ -180,6 +395,8 @@ def main():
     print(f"Found {len(input_files)} input files.")
     
     # Create directory structure for temperatures
+    ensemble = []
+    single_runs = []
     for temp in config['temperatures']:
         temp_dir = output_dir / f"{temp}K"
         temp_dir.mkdir(exist_ok=True)
@@ -188,7 +405,34 @@ def main():
         
         # Generate ADMP inputs for each molecule at this temperature
         for molecule_path in input_files:
-            create_admp_input(
+            if config['replicas'] > 1:
+                ensemble.extend(create_admp_replicas(
+                    molecule_path=molecule_path,
+                    temp=temp,
+                    output_dir=temp_dir,
+                    replicas=config['replicas'],
+                    seed=config['seed'],
+                    max_points=config['max_points'],
+                    method=config['method'],
+                    basis=config['basis'],
+                    mem=config['mem'],
+                    nproc=config['nproc']
+                ))
+                continue
+            if config['segments'] > 1:
+                create_admp_segments(
+                    molecule_path=molecule_path,
+                    temp=temp,
+                    output_dir=temp_dir,
+                    segments=config['segments'],
+                    max_points=config['max_points'],
+                    method=config['method'],
+                    basis=config['basis'],
+                    mem=config['mem'],
+                    nproc=config['nproc']
+                )
+                continue
+            created = create_admp_input(
                 molecule_path=molecule_path,
                 temp=temp,
                 output_dir=temp_dir,
@@ -200,9 +444,29 @@ def main():
                 nproc=config['nproc'],
                 rstf=config['rstf']
             )
+            if created:
+                molecule_name = os.path.basename(molecule_path).replace('.gjf', '')
+                single_runs.append(temp_dir / f"{molecule_name}_ADMP_{temp}K.gjf")
             
     print(f"\nGenerated ADMP input files for {len(input_files)} molecules at {len(config['temperatures'])} temperatures.")
     print("Run these Gaussian calculations to simulate thermal decomposition processes.")
+
+    # SLURM time requests sized from past runs (walltime_model.py)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from walltime_model import time_for_inputs
+
+    if single_runs:
+        time_limit = time_for_inputs(single_runs, "2-00:00:00")
+        print(f"Submit them with: sbatch --time={time_limit} submit_admp_jobs.s")
+    if config['segments'] > 1:
+        print("Submit segmented trajectories as dependent job chains with ./submit_admp_segments.sh")
+    if ensemble:
+        manifest_path = write_ensemble_manifest(ensemble, output_dir)
+        time_limit = time_for_inputs([record['input'] for record in ensemble], "12:00:00",
+                                     aggregate="max")
+        print(f"Wrote {len(ensemble)} replica tasks to {manifest_path}")
+        print(f"Submit them as an array with: "
+              f"sbatch --array=0-{len(ensemble) - 1} --time={time_limit} submit_admp_array.s")
     print("\nTo analyze results:")
     print("1. Extract snapshots from ADMP trajectories at points where bonds break")
     print("2. Use these geometries as starting points for transition state searches")
@@ -2,7 +2,10 @@
 # python Extract_Optimized_From_Gaussian.py filename
 
 from __future__ import print_function
-import sys, os
+import sys, os, re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_catalog import find_artifacts
 
 def extract_all(text, target):
     linenums = []
@@ -39,47 +42,61 @@ code = {"1" : "H", "2" : "He", "3" : "Li", "4" : "Be", "5" : "B", \
 "111": "Rg" ,"112" : "Uub","113" : "Uut","114" : "Uuq","115" : "Uup", \
 "116": "Uuh","117" : "Uus","118" : "Uuo"}
 
+# Segment suffix written by generate_admp_inputs.py for restartable runs
+SEGMENT_PATTERN = re.compile(r'_seg(\d+)$')
+
+def read_log_frames(logfile_fn):
+    """Return the atoms (atomic number, x, y, z) of every "Input orientation:" block"""
+    with open(logfile_fn, 'r') as logfile_fh:
+        text = logfile_fh.readlines()
+    
+    # Find all "Input orientation:" headers
+    input_orient_indices = []
+    for i, line in enumerate(text):
+        if "Input orientation:" in line:
+            input_orient_indices.append(i)
+    
+    frames = []
+    for idx in input_orient_indices:
+        # Skip header lines to reach coordinates
+        coord_idx = idx + 5
+        
+        # Collect atoms until we hit the separator
+        atoms = []
+        while coord_idx < len(text) and "---" not in text[coord_idx]:
+            line = text[coord_idx].strip()
+            if line:  # Skip empty lines
+                parts = line.split()
+                if len(parts) >= 6 and parts[0].isdigit() and parts[1].isdigit():
+                    atoms.append((parts[1], parts[3], parts[4], parts[5]))
+            coord_idx += 1
+        frames.append(atoms)
+    return frames
+
+def write_xyz_frames(outfile, frames, first_step=0):
+    """Write frames to an open xyz file, numbering time steps from first_step"""
+    for step, atoms in enumerate(frames, start=first_step):
+        outfile.write(f"{len(atoms)}\n")
+        outfile.write(f"Time step {step}\n")
+        
+        for atom in atoms:
+            atom_num, x, y, z = atom
+            atom_symbol = code[atom_num]
+            outfile.write(f"{atom_symbol} {x} {y} {z}\n")
+
 def process_log_file(logfile_fn):
     """Process a single ADMP log file and create corresponding xyz file"""
     logfile_bn = os.path.splitext(os.path.basename(logfile_fn))[0]
     
     try:
-        with open(logfile_fn, 'r') as logfile_fh:
-            text = logfile_fh.readlines()
+        frames = read_log_frames(logfile_fn)
         
         # Create output file in same directory as input
         output_dir = os.path.dirname(logfile_fn)
         outfile_path = os.path.join(output_dir, logfile_bn + '.xyz')
         
-        # Find all "Input orientation:" headers
-        input_orient_indices = []
-        for i, line in enumerate(text):
-            if "Input orientation:" in line:
-                input_orient_indices.append(i)
-        
         with open(outfile_path, 'w') as outfile:
-            for step, idx in enumerate(input_orient_indices):
-                # Skip header lines to reach coordinates
-                coord_idx = idx + 5
-                
-                # Collect atoms until we hit the separator
-                atoms = []
-                while coord_idx < len(text) and "---" not in text[coord_idx]:
-                    line = text[coord_idx].strip()
-                    if line:  # Skip empty lines
-                        parts = line.split()
-                        if len(parts) >= 6 and parts[0].isdigit() and parts[1].isdigit():
-                            atoms.append((parts[1], parts[3], parts[4], parts[5]))
-                    coord_idx += 1
-                
-                # Write the atoms to file
-                outfile.write(f"{len(atoms)}\n")
-                outfile.write(f"Time step {step}\n")
-                
-                for atom in atoms:
-                    atom_num, x, y, z = atom
-                    atom_symbol = code[atom_num]
-                    outfile.write(f"{atom_symbol} {x} {y} {z}\n")
+            write_xyz_frames(outfile, frames)
         
         print(f"Successfully processed: {logfile_fn}")
         return True
@@ -88,6 +105,61 @@ def process_log_file(logfile_fn):
         print(f"Error processing {logfile_fn}: {str(e)}")
         return False
 
+def split_segment_name(logfile_fn):
+    """Return (trajectory log path without _segNN, segment number or None)"""
+    root, ext = os.path.splitext(str(logfile_fn))
+    match = SEGMENT_PATTERN.search(root)
+    if not match:
+        return str(logfile_fn), None
+    return root[:match.start()] + ext, int(match.group(1))
+
+def stitch_segment_logs(segment_logs):
+    """
+    Write one continuous xyz trajectory from the logs of a segmented run.
+    
+    Each restarted segment begins from the last geometry of the previous one,
+    so its first frame is dropped. Stitching stops at the first missing segment.
+    """
+    ordered = sorted(segment_logs, key=lambda log: split_segment_name(log)[1])
+    trajectory_log = split_segment_name(ordered[0])[0]
+    outfile_path = os.path.splitext(trajectory_log)[0] + '.xyz'
+    
+    try:
+        step = 0
+        stitched = 0
+        with open(outfile_path, 'w') as outfile:
+            for expected, log in enumerate(ordered, start=1):
+                segment = split_segment_name(log)[1]
+                if segment != expected:
+                    print(f"Warning: segment {expected} missing for {trajectory_log}, "
+                          f"stopping after {expected - 1} segments")
+                    break
+                frames = read_log_frames(log)
+                if segment > 1:
+                    frames = frames[1:]
+                write_xyz_frames(outfile, frames, first_step=step)
+                step += len(frames)
+                stitched += 1
+        
+        print(f"Successfully stitched {stitched} segments into: {outfile_path}")
+        return True
+    
+    except Exception as e:
+        print(f"Error stitching segments of {trajectory_log}: {str(e)}")
+        return False
+
+def group_segment_logs(log_files):
+    """Split logs into unsegmented logs and {trajectory log: [segment logs]}"""
+    single = []
+    segmented = {}
+    for log_file in log_files:
+        trajectory_log, segment = split_segment_name(log_file)
+        if segment is None:
+            single.append(log_file)
+        else:
+            segmented.setdefault(trajectory_log, []).append(log_file)
+    return single, segmented
+
 def main():
     # Walk through the admp_jobs/results directory
     results_dir = "./admp_jobs/results"
@@ -98,15 +170,20 @@ def main():
     processed_count = 0
     error_count = 0
     
-    # Walk through all subdirectories
-    for root, dirs, files in os.walk(results_dir):
-        for file in files:
-            if file.endswith('.log'):
-                log_path = os.path.join(root, file)
-                if process_log_file(log_path):
-                    processed_count += 1
-                else:
-                    error_count += 1
+    # Logs in all subdirectories, from the results catalog
+    single, segmented = group_segment_logs(find_artifacts(results_dir, ["log"]))
+    for log_path in single:
+        if process_log_file(str(log_path)):
+            processed_count += 1
+        else:
+            error_count += 1
+    
+    # Segmented runs are stitched into one trajectory each
+    for segment_logs in segmented.values():
+        if stitch_segment_logs(segment_logs):
+            processed_count += 1
+        else:
+            error_count += 1
     
     print(f"\nProcessing complete!")
     print(f"Successfully processed: {processed_count} files")
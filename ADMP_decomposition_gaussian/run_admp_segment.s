@@ -0,0 +1,94 @@
+#!/bin/bash
+#SBATCH --account="punim0131"
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+#SBATCH --cpus-per-task=4
+#SBATCH --time=12:00:00
+#SBATCH --mem=5G
+#SBATCH --partition=sapphire
+#SBATCH --requeue
+#SBATCH --job-name=ADMP_segment
+#SBATCH --output=ADMP_segment_%j.log
+
+# Run one segment of a segmented ADMP trajectory.
+# Usage: sbatch run_admp_segment.s admp_jobs/800K/CF2O_ADMP_800K_seg02.gjf
+# Submitted in dependency chains by submit_admp_segments.sh; exits non-zero
+# when the segment fails so later segments are not started.
+
+# Load required modules
+module purge
+module load NVHPC/22.11-CUDA-11.7.0
+module load Gaussian/g16c01-CUDA-11.7.0
+
+export GAUSS_PDEF=${SLURM_CPUS_PER_TASK}
+WATCHDOG="$(pwd)/admp_watchdog.py"
+
+file="$1"
+if [ -z "$file" ] || [ ! -f "$file" ]; then
+    echo "ERROR: Segment input '$file' not found"
+    exit 1
+fi
+
+# Results directory based on file path
+filename=$(basename "$file")
+base_name=$(basename "$file" .gjf)
+molecule=${filename%_ADMP_*}
+temp=${filename#*_ADMP_}
+temp=${temp%_seg*}
+
+results_dir="./admp_jobs/results/$molecule/$temp"
+mkdir -p "$results_dir"
+results_dir_abs=$(cd "$results_dir" && pwd)
+cp "$file" "$results_dir_abs/"
+
+# Run in node-local scratch, starting from the previous segment's checkpoint
+job_scratch="${TMPDIR:-/tmp}/admp_${SLURM_JOB_ID:-$$}/$base_name"
+mkdir -p "$job_scratch"
+cp "$file" "$job_scratch/"
+export GAUSS_SCRDIR="$job_scratch"
+
+oldchk=$(grep -m1 "^%oldchk=" "$file" | cut -d= -f2)
+if [ -n "$oldchk" ]; then
+    if [ ! -f "$results_dir_abs/$oldchk" ]; then
+        echo "ERROR: Previous segment checkpoint $oldchk not found in $results_dir"
+        rm -rf "$job_scratch"
+        exit 1
+    fi
+    cp "$results_dir_abs/$oldchk" "$job_scratch/"
+fi
+
+cd "$job_scratch"
+echo "Running Gaussian for $base_name"
+# The watchdog stops g16 and its links when the trajectory diverges
+g16 "$filename" &
+g16_pid=$!
+python3 "$WATCHDOG" "${base_name}.log" --pid $g16_pid &
+watchdog_pid=$!
+wait $g16_pid
+wait $watchdog_pid
+
+status=0
+if [ -f "${base_name}.log.watchdog" ]; then
+    echo "WARNING: ADMP segment $base_name was aborted by the watchdog:"
+    grep '"reason"' "${base_name}.log.watchdog"
+    status=1
+elif grep -q "Normal termination" "${base_name}.log"; then
+    echo "ADMP segment $base_name completed successfully."
+    formchk "${base_name}.chk" "${base_name}.fchk"
+else
+    echo "WARNING: ADMP segment $base_name did not complete successfully."
+    grep -A5 "Error termination" "${base_name}.log" || echo "No specific error message found."
+    status=1
+fi
+
+# The next segment reads the checkpoint from the results directory, so copy
+# back before the job ends
+for name in "${base_name}.log" "${base_name}.chk" "${base_name}.fchk" "${base_name}.log.watchdog"; do
+    if [ -f "$name" ]; then
+        cp "$name" "$results_dir_abs/" || { echo "WARNING: Failed to copy back $name"; status=1; }
+    fi
+done
+cd "$results_dir_abs"
+rm -rf "$(dirname "$job_scratch")"
+
+exit $status
@@ -0,0 +1,85 @@
+#!/bin/bash
+#SBATCH --account="punim0131"
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+#SBATCH --cpus-per-task=4
+#SBATCH --time=12:00:00
+#SBATCH --mem=5G
+#SBATCH --partition=sapphire
+#SBATCH --job-name=ADMP_ensemble
+#SBATCH --output=ADMP_ensemble_%A_%a.log
+
+# Run one replica of an ADMP ensemble per array task.
+# Usage: sbatch --array=0-<N-1>[%<parallel>] submit_admp_array.s [manifest]
+# The manifest (default: admp_jobs/ensemble_manifest.tsv) is written by
+# generate_admp_inputs.py when replicas > 1; line N+1 describes task N.
+
+# Load required modules
+module purge
+module load NVHPC/22.11-CUDA-11.7.0
+module load Gaussian/g16c01-CUDA-11.7.0
+
+export GAUSS_PDEF=${SLURM_CPUS_PER_TASK}
+WATCHDOG="$(pwd)/admp_watchdog.py"
+
+MANIFEST="${1:-./admp_jobs/ensemble_manifest.tsv}"
+TASK_ID="${SLURM_ARRAY_TASK_ID:-0}"
+
+file=$(awk -F'\t' -v task="$TASK_ID" 'NR > 1 && $1 == task { print $2 }' "$MANIFEST")
+if [ -z "$file" ] || [ ! -f "$file" ]; then
+    echo "ERROR: No input for task $TASK_ID in $MANIFEST"
+    exit 1
+fi
+
+# Replicas share the molecule/temperature results directory
+filename=$(basename "$file")
+base_name=$(basename "$file" .gjf)
+molecule=${filename%_ADMP_*}
+temp=${filename#*_ADMP_}
+temp=${temp%_r[0-9]*}
+
+results_dir="./admp_jobs/results/$molecule/$temp"
+mkdir -p "$results_dir"
+results_dir_abs=$(cd "$results_dir" && pwd)
+cp "$file" "$results_dir_abs/"
+
+echo "Task $TASK_ID: $base_name"
+
+# Run in node-local scratch
+job_scratch="${TMPDIR:-/tmp}/admp_${SLURM_JOB_ID:-$$}/$base_name"
+mkdir -p "$job_scratch"
+cp "$file" "$job_scratch/"
+export GAUSS_SCRDIR="$job_scratch"
+
+cd "$job_scratch"
+# The watchdog stops g16 and its links when the trajectory diverges
+g16 "$filename" &
+g16_pid=$!
+python3 "$WATCHDOG" "${base_name}.log" --pid $g16_pid &
+watchdog_pid=$!
+wait $g16_pid
+wait $watchdog_pid
+
+status=0
+if [ -f "${base_name}.log.watchdog" ]; then
+    echo "WARNING: ADMP replica $base_name was aborted by the watchdog:"
+    grep '"reason"' "${base_name}.log.watchdog"
+    status=1
+elif grep -q "Normal termination" "${base_name}.log"; then
+    echo "ADMP replica $base_name completed successfully."
+    formchk "${base_name}.chk" "${base_name}.fchk"
+else
+    echo "WARNING: ADMP replica $base_name did not complete successfully."
+    grep -A5 "Error termination" "${base_name}.log" || echo "No specific error message found."
+    status=1
+fi
+
+for name in "${base_name}.log" "${base_name}.chk" "${base_name}.fchk" "${base_name}.log.watchdog"; do
+    if [ -f "$name" ]; then
+        cp "$name" "$results_dir_abs/" || echo "WARNING: Failed to copy back $name"
+    fi
+done
+cd "$results_dir_abs"
+rm -rf "$(dirname "$job_scratch")"
+
+exit $status
@@ -8,6 +8,8 @@
 #SBATCH --partition=sapphire
 #SBATCH --job-name=ADMP_decomp
 #SBATCH --output=ADMP_decomp_%j.log
+#SBATCH --signal=B:USR1@300
+#SBATCH --requeue
 
 # Load required modules
 module purge
@@ -19,6 +21,70 @@ export GAUSS_PDEF=${SLURM_CPUS_PER_TASK}
 echo "Starting ADMP decomposition calculations"
 echo "----------------------------------------"
 
+# Directory to return to after each calculation
+SUBMIT_DIR="${SLURM_SUBMIT_DIR:-$(pwd)}"
+
+# Failed runs are classified and retried with an adjusted input up to this
+# many times (see gaussian_failures.py); attempts are counted in
+# <name>.retries in the results directory, across allocations
+RETRY_BUDGET="${RETRY_BUDGET:-2}"
+
+# SLURM sends USR1 five minutes before the time limit (--signal above). The
+# running trajectory is stopped, its input rewritten to continue from the
+# checkpoint, and the job requeued; the next allocation skips finished
+# trajectories and resumes the interrupted one. Continuations are counted in
+# <name>.continuations, separately from failure retries, and only stop a
+# trajectory that has needed this many allocations
+MAX_CONTINUATIONS="${MAX_CONTINUATIONS:-20}"
+TIMED_OUT=0
+g16_pid=""
+on_time_limit() {
+    echo "Time limit approaching; stopping to requeue"
+    TIMED_OUT=1
+    [ -n "$g16_pid" ] && kill -TERM "$g16_pid" 2>/dev/null
+}
+trap on_time_limit USR1
+
+requeue_job() {
+    if [ ${#COPY_PIDS[@]} -gt 0 ]; then
+        wait "${COPY_PIDS[@]}"
+    fi
+    rm -rf "$JOB_SCRATCH"
+    if [ -n "$SLURM_JOB_ID" ] && scontrol requeue "$SLURM_JOB_ID"; then
+        echo "Requeued job $SLURM_JOB_ID"
+    else
+        echo "WARNING: Could not requeue; submit the job again to continue"
+    fi
+    exit 0
+}
+
+# Throughput metrics for watching the batch (see pipeline_metrics.py);
+# a failed metrics update never affects the run
+export METRICS_DIR="${METRICS_DIR:-$SUBMIT_DIR/metrics}"
+record_metrics() {
+    python3 "$SUBMIT_DIR/../pipeline_metrics.py" "$@" > /dev/null 2>&1 || true
+}
+
+# Per-job scratch directories live on node-local storage
+JOB_SCRATCH="${TMPDIR:-/tmp}/admp_${SLURM_JOB_ID:-$$}"
+mkdir -p "$JOB_SCRATCH"
+COPY_PIDS=()
+
+# Copy declared outputs from node-local scratch back to the shared results
+# directory, then remove the scratch directory
+copy_back() {
+    local scratch_dir="$1"
+    local dest_dir="$2"
+    shift 2
+
+    for name in "$@"; do
+        if [ -f "$scratch_dir/$name" ]; then
+            cp "$scratch_dir/$name" "$dest_dir/" || echo "WARNING: Failed to copy back $name"
+        fi
+    done
+    rm -rf "$scratch_dir"
+}
+
 # Function to validate and fix Gaussian input file
 validate_input_file() {
     local input_file="$1"
@@ -37,7 +103,11 @@ validate_input_file() {
 }
 
 # Process all ADMP input files in admp_jobs directory and its subdirectories
-find ./admp_jobs -name "*_ADMP_*.gjf" | sort | while read -r file; do
+mapfile -t ADMP_FILES < <(find ./admp_jobs -name "*_ADMP_*.gjf" -not -path "./admp_jobs/results/*" | sort)
+record_metrics start admp --total ${#ADMP_FILES[@]}
+
+for file in "${ADMP_FILES[@]}"; do
+    [ $TIMED_OUT -eq 1 ] && requeue_job
     echo "Processing: $file"
     echo "----------------------------------------"
     
@@ -46,49 +116,179 @@ find ./admp_jobs -name "*_ADMP_*.gjf" | sort | while read -r file; do
     molecule=${filename%_ADMP_*}
     temp=${filename#*_ADMP_}
     temp=${temp%.gjf}
+    temp=${temp%_seg*}
+    temp=${temp%_r[0-9]*}
     
     results_dir="./admp_jobs/results/$molecule/$temp"
     mkdir -p "$results_dir"
+    base_name=$(basename "$file" .gjf)
+    
+    # Trajectories finished in an earlier allocation are not rerun
+    if grep -q "Normal termination" "$results_dir/${base_name}.log" 2>/dev/null; then
+        echo "Already completed: $results_dir/${base_name}.log"
+        record_metrics finish admp "$base_name" --status skipped
+        echo "----------------------------------------"
+        continue
+    fi
+    
+    # An interrupted or retried trajectory keeps the input rewritten in the
+    # results directory, unless the source input was edited since then
+    retries_file="$results_dir/${base_name}.retries"
+    continuations_file="$results_dir/${base_name}.continuations"
+    results_input="$results_dir/$(basename "$file")"
+    resumed=0
+    if [ -f "$retries_file" ] || [ -f "$continuations_file" ]; then
+        if [ -f "$results_input" ] && [ ! "$file" -nt "$results_input" ]; then
+            resumed=1
+        else
+            echo "Source input changed; starting $base_name afresh"
+            rm -f "$retries_file" "$continuations_file"
+        fi
+    fi
+    
+    # Attempts and continuations used so far, including earlier allocations
+    attempt=$(cat "$retries_file" 2>/dev/null || echo 0)
+    continuation=$(cat "$continuations_file" 2>/dev/null || echo 0)
+    if [ "$attempt" -gt "$RETRY_BUDGET" ] || [ "$continuation" -ge "$MAX_CONTINUATIONS" ]; then
+        echo "SKIPPING: $base_name used $attempt retries and $continuation continuations"
+        record_metrics finish admp "$base_name" --status failed
+        echo "----------------------------------------"
+        continue
+    fi
     
     # Copy input file to results directory
-    cp "$file" "$results_dir/"
+    if [ $resumed -eq 1 ]; then
+        echo "Resuming after $attempt retries and $continuation continuations"
+    else
+        cp "$file" "$results_dir/"
+    fi
     
     # Validate the input file
     if ! validate_input_file "$results_dir/$(basename "$file")"; then
         echo "SKIPPING due to validation errors: $file"
+        record_metrics finish admp "$(basename "$file" .gjf)" --status skipped
         echo "----------------------------------------"
         continue
     fi
     
+    # Stage the input to node-local scratch; Gaussian scratch files
+    # (.rwf, fort.7, ...) never touch the shared filesystem
+    results_dir_abs=$(cd "$results_dir" && pwd)
+    job_scratch="$JOB_SCRATCH/$base_name"
+    mkdir -p "$job_scratch"
+    cp "$results_dir/$(basename "$file")" "$job_scratch/"
+    if [ $resumed -eq 1 ] && [ -f "$results_dir_abs/${base_name}.chk" ]; then
+        cp "$results_dir_abs/${base_name}.chk" "$job_scratch/"
+    fi
+    export GAUSS_SCRDIR="$job_scratch"
+    
+    # Restarted segments continue from the previous segment's checkpoint,
+    # which must be copied back before it can be staged
+    oldchk=$(grep -m1 "^%oldchk=" "$file" | cut -d= -f2)
+    if [ -n "$oldchk" ]; then
+        if [ ${#COPY_PIDS[@]} -gt 0 ]; then
+            wait "${COPY_PIDS[@]}"
+            COPY_PIDS=()
+        fi
+        if [ ! -f "$results_dir_abs/$oldchk" ]; then
+            echo "SKIPPING: previous segment checkpoint $oldchk not found"
+            record_metrics finish admp "$base_name" --status skipped
+            echo "----------------------------------------"
+            rm -rf "$job_scratch"
+            continue
+        fi
+        cp "$results_dir_abs/$oldchk" "$job_scratch/"
+    fi
+    
     # Run Gaussian on the file
-    cd "$results_dir"
+    cd "$job_scratch"
     echo "Running Gaussian for $molecule at $temp"
-    g16 "$(basename "$file")"
+    record_metrics stage admp "$base_name" g16
+    while true; do
+        # The watchdog stops g16 and its links when the trajectory diverges,
+        # and the loop moves on to the next one
+        g16 "$(basename "$file")" &
+        g16_pid=$!
+        python3 "$SUBMIT_DIR/admp_watchdog.py" "${base_name}.log" --pid $g16_pid &
+        watchdog_pid=$!
+        # wait returns early when the USR1 trap fires; keep waiting for g16
+        while ! wait $g16_pid && kill -0 $g16_pid 2>/dev/null; do :; done
+        g16_pid=""
+        wait $watchdog_pid
+        
+        if [ $TIMED_OUT -eq 1 ]; then
+            # Continue from the checkpoint in the next allocation; this is
+            # not a failure and does not use the retry budget
+            continuation=$((continuation + 1))
+            echo "$continuation" > "$results_dir_abs/${base_name}.continuations"
+            python3 "$SUBMIT_DIR/../gaussian_failures.py" retry --walltime "$(basename "$file")" "${base_name}.log"
+            mv "${base_name}.log" "${base_name}.log.part${continuation}" 2>/dev/null
+            copy_back "$job_scratch" "$results_dir_abs" "$(basename "$file")" "${base_name}.chk" \
+                "${base_name}.log.part${continuation}"
+            cd "$SUBMIT_DIR"
+            requeue_job
+        fi
+        
+        if grep -q "Normal termination" "${base_name}.log" || [ $attempt -ge $RETRY_BUDGET ]; then
+            break
+        fi
+        # Rewrite the input for the failure class; stop if it is not retryable
+        if ! python3 "$SUBMIT_DIR/../gaussian_failures.py" retry "$(basename "$file")" "${base_name}.log"; then
+            break
+        fi
+        attempt=$((attempt + 1))
+        echo "$attempt" > "$results_dir_abs/${base_name}.retries"
+        # Keep the failed attempt's log; a restarted run only logs the continuation
+        mv "${base_name}.log" "${base_name}.log.attempt${attempt}"
+        echo "Retry $attempt of $RETRY_BUDGET for $molecule at $temp"
+    done
     
     # Check completion status
-    if grep -q "Normal termination" "$(basename "${file%.gjf}.log")"; then
+    if [ -f "${base_name}.log.watchdog" ]; then
+        echo "WARNING: ADMP calculation for $molecule at $temp was aborted by the watchdog:"
+        grep '"reason"' "${base_name}.log.watchdog"
+        record_metrics finish admp "$base_name" --status failed --log "${base_name}.log"
+    elif grep -q "Normal termination" "$(basename "${file%.gjf}.log")"; then
         echo "ADMP calculation for $molecule at $temp completed successfully."
         
         # Process checkpoint file
-        base_name=$(basename "$file" .gjf)
         if [ -f "${base_name}.chk" ]; then
             echo "Converting checkpoint file to formatted checkpoint..."
+            record_metrics stage admp "$base_name" formchk
             formchk "${base_name}.chk" "${base_name}.fchk"
 
         else
             echo "WARNING: Checkpoint file not found"
         fi
+        record_metrics finish admp "$base_name" --status done --log "${base_name}.log"
     else
         echo "WARNING: ADMP calculation for $molecule at $temp may not have completed successfully."
         # Examine error message
         echo "Error details:"
         grep -A5 "Error termination" "$(basename "${file%.gjf}.log")" || echo "No specific error message found."
+        record_metrics finish admp "$base_name" --status failed --log "${base_name}.log"
     fi
     
+    # Copy back only the artifacts we keep, in the background while the
+    # next trajectory starts
+    keep_files=("$(basename "$file")" "${base_name}.log" "${base_name}.chk" "${base_name}.fchk" "${base_name}.log.watchdog")
+    for attempt_log in "${base_name}".log.attempt*; do
+        [ -f "$attempt_log" ] && keep_files+=("$attempt_log")
+    done
+    copy_back "$job_scratch" "$results_dir_abs" "${keep_files[@]}" &
+    COPY_PIDS+=($!)
+    
     echo "----------------------------------------"
-    cd - > /dev/null
+    cd "$SUBMIT_DIR"
 done
 
+# Wait for outstanding copy-backs before finishing
+if [ ${#COPY_PIDS[@]} -gt 0 ]; then
+    echo "Waiting for ${#COPY_PIDS[@]} copy-back operations to finish..."
+    wait "${COPY_PIDS[@]}"
+fi
+rm -rf "$JOB_SCRATCH"
+
 echo "All ADMP jobs completed."
 
 ##DO NOT ADD/EDIT BEYOND THIS LINE##
@@ -0,0 +1,62 @@
+#!/bin/bash
+# Submit segmented ADMP trajectories as SLURM dependency chains.
+#
+# Each segment (generated with segments > 1 in generate_admp_inputs.py) runs as
+# its own run_admp_segment.s job that starts only after the previous segment
+# finished successfully (afterok). Segments whose log already shows normal
+# termination are skipped, so rerunning this script resumes broken chains.
+# Each job's --time is predicted from past runs by walltime_model.py.
+#
+# Usage: ./submit_admp_segments.sh [--dry-run]
+
+DRY_RUN=0
+if [ "$1" == "--dry-run" ]; then
+    DRY_RUN=1
+fi
+
+mapfile -t FIRST_SEGMENTS < <(find ./admp_jobs -name "*_ADMP_*_seg01.gjf" -not -path "./admp_jobs/results/*" | sort)
+
+if [ ${#FIRST_SEGMENTS[@]} -eq 0 ]; then
+    echo "No segmented ADMP inputs found in ./admp_jobs"
+    exit 1
+fi
+
+for first in "${FIRST_SEGMENTS[@]}"; do
+    trajectory=${first%_seg01.gjf}
+    filename=$(basename "$trajectory")
+    molecule=${filename%_ADMP_*}
+    temp=${filename#*_ADMP_}
+    results_dir="./admp_jobs/results/$molecule/$temp"
+
+    echo "Trajectory: $filename"
+    previous=""
+    for segment in $(ls "${trajectory}"_seg*.gjf | sort); do
+        base_name=$(basename "$segment" .gjf)
+        if [ -f "$results_dir/${base_name}.log" ] && grep -q "Normal termination" "$results_dir/${base_name}.log"; then
+            echo "  $base_name already completed, skipping"
+            continue
+        fi
+
+        dependency=()
+        if [ -n "$previous" ]; then
+            dependency=(--dependency=afterok:$previous --kill-on-invalid-dep=yes)
+        fi
+
+        time_limit=$(python3 ../walltime_model.py predict "$segment" --default 12:00:00)
+        time_limit=${time_limit:-12:00:00}
+        
+        if [ $DRY_RUN -eq 1 ]; then
+            echo "  sbatch --time=$time_limit ${dependency[*]} run_admp_segment.s $segment"
+            previous="DRYRUN"
+        else
+            # Later segments must not start without their predecessor, so a
+            # failed submission ends this trajectory's chain
+            if ! previous=$(sbatch --parsable --time="$time_limit" "${dependency[@]}" run_admp_segment.s "$segment") \
+                || [ -z "$previous" ]; then
+                echo "  ERROR: Submitting $base_name failed; remaining segments of $filename not submitted"
+                break
+            fi
+            echo "  $base_name submitted as job $previous"
+        fi
+    done
+done
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Apply a retention policy to Gaussian result artifacts.
+
+This script:
+1. Compresses (or drops) raw .chk files once a formatted checkpoint exists
+2. Stores .fchk files in a lazily regenerable form: dropped when a checkpoint
+   remains to re-run formchk from, otherwise gzip-compressed
+3. Removes empty files (e.g. empty _g16.out) and redundant scratch leftovers
+   (fort.7, .rwf)
+4. Reports the bytes reclaimed, with --dry-run showing the plan only
+
+Consumers that need a formatted checkpoint call ensure_fchk() (or run this
+script with --ensure), which regenerates it on demand.
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from results_catalog import list_directories
+
+ROOT = Path(__file__).resolve().parent
+
+DEFAULT_DIRS = [
+    ROOT / "generate_orbitals_from_ADMP" / "orbital_results",
+    ROOT / "ADMP_decomposition_gaussian" / "admp_jobs" / "results",
+]
+
+# Leftovers that are never read after a job finishes
+REDUNDANT_NAMES = {"fort.7"}
+REDUNDANT_SUFFIXES = {".rwf", ".int", ".d2e", ".scr"}
+
+def gzip_file(path):
+    """Compress a file to path.gz and remove the original."""
+    gz_path = Path(f"{path}.gz")
+    with open(path, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    shutil.copystat(path, gz_path)
+    os.remove(path)
+    return gz_path
+
+def gunzip_file(gz_path, output_path):
+    """Decompress gz_path to output_path, keeping the compressed copy."""
+    with gzip.open(gz_path, 'rb') as src, open(output_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    return Path(output_path)
+
+def ensure_fchk(fchk_path, formchk="formchk"):
+    """
+    Make sure a formatted checkpoint exists, regenerating it if needed.
+
+    Looks for, in order: the .fchk itself, a compressed .fchk.gz, a .chk, or a
+    compressed .chk.gz (decompressed to a temporary file for formchk).
+    """
+    fchk = Path(fchk_path)
+    if fchk.exists():
+        return fchk
+
+    fchk_gz = Path(f"{fchk}.gz")
+    if fchk_gz.exists():
+        return gunzip_file(fchk_gz, fchk)
+
+    chk = fchk.with_suffix(".chk")
+    chk_gz = Path(f"{chk}.gz")
+    if chk.exists():
+        subprocess.run([formchk, str(chk), str(fchk)], check=True, stdout=subprocess.DEVNULL)
+        return fchk
+    if chk_gz.exists():
+        with tempfile.TemporaryDirectory(dir=fchk.parent) as tmp_dir:
+            tmp_chk = gunzip_file(chk_gz, Path(tmp_dir) / chk.name)
+            subprocess.run([formchk, str(tmp_chk), str(fchk)], check=True, stdout=subprocess.DEVNULL)
+        return fchk
+
+    raise FileNotFoundError(f"No checkpoint to regenerate {fchk} from")
+
+def plan_directory(directory, files, chk_policy="compress", fchk_policy="regenerable"):
+    """
+    Return the (action, path, size) list for one directory.
+
+    Actions are "delete-empty", "delete-redundant", "compress" and "delete".
+    """
+    actions = []
+    names = set(files)
+    sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in files}
+
+    for name in sorted(files):
+        path = os.path.join(directory, name)
+        if sizes[name] == 0:
+            actions.append(("delete-empty", path, 0))
+        elif name in REDUNDANT_NAMES or os.path.splitext(name)[1] in REDUNDANT_SUFFIXES:
+            actions.append(("delete-redundant", path, sizes[name]))
+
+    for name in sorted(n for n in files if n.endswith(".chk") and sizes[n] > 0):
+        base = name[:-len(".chk")]
+        fchk = f"{base}.fchk"
+        formatted = (fchk in names and sizes[fchk] > 0) or f"{fchk}.gz" in names
+        chk_remains = f"{name}.gz" in names
+
+        if formatted and chk_policy == "compress":
+            actions.append(("compress", os.path.join(directory, name), sizes[name]))
+            chk_remains = True
+        elif formatted and chk_policy == "drop":
+            actions.append(("delete", os.path.join(directory, name), sizes[name]))
+        else:
+            chk_remains = True
+
+        if fchk in names and sizes[fchk] > 0:
+            fchk_path = os.path.join(directory, fchk)
+            if fchk_policy == "regenerable" and chk_remains:
+                actions.append(("delete", fchk_path, sizes[fchk]))
+            elif fchk_policy in ("regenerable", "compress"):
+                actions.append(("compress", fchk_path, sizes[fchk]))
+
+    # Formatted checkpoints without any raw checkpoint beside them
+    for name in sorted(n for n in files if n.endswith(".fchk") and sizes[n] > 0):
+        base = name[:-len(".fchk")]
+        if f"{base}.chk" not in names and fchk_policy in ("regenerable", "compress"):
+            has_chk_gz = f"{base}.chk.gz" in names
+            action = "delete" if has_chk_gz and fchk_policy == "regenerable" else "compress"
+            actions.append((action, os.path.join(directory, name), sizes[name]))
+
+    return actions
+
+def apply_retention(base_dirs, chk_policy="compress", fchk_policy="regenerable", dry_run=True):
+    """
+    Go through the cataloged result directories and apply the retention policy.
+
+    Returns a dict mapping action to [file count, bytes affected, bytes reclaimed].
+    For compression in dry-run mode the reclaimed bytes are not known yet.
+    """
+    report = {}
+    for base_dir in base_dirs:
+        if not Path(base_dir).exists():
+            continue
+        for root, files in list_directories(base_dir):
+            for action, path, size in plan_directory(root, files, chk_policy, fchk_policy):
+                reclaimed = 0 if action == "compress" else size
+                if not dry_run:
+                    if action == "compress":
+                        reclaimed = size - os.path.getsize(gzip_file(path))
+                    else:
+                        os.remove(path)
+                totals = report.setdefault(action, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += size
+                totals[2] += reclaimed
+    return report
+
+def format_bytes(n):
+    """Format a byte count for the report."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a retention policy to Gaussian artifacts")
+    parser.add_argument("dirs", nargs="*", default=[str(d) for d in DEFAULT_DIRS],
+                      help="Result directories to clean (default: orbital and ADMP results)")
+    parser.add_argument("--chk", choices=["keep", "compress", "drop"], default="compress",
+                      help="What to do with .chk files that have been formatted (default: compress)")
+    parser.add_argument("--fchk", choices=["keep", "compress", "regenerable"], default="regenerable",
+                      help="How to store .fchk files (default: regenerable)")
+    parser.add_argument("--dry-run", action="store_true",
+                      help="Report what would be reclaimed without changing anything")
+    parser.add_argument("--ensure", nargs="+", metavar="FCHK",
+                      help="Regenerate the given .fchk files on demand and exit")
+
+    args = parser.parse_args()
+
+    if args.ensure:
+        for fchk in args.ensure:
+            print(f"Formatted checkpoint available: {ensure_fchk(fchk)}")
+        return
+
+    report = apply_retention(args.dirs, args.chk, args.fchk, dry_run=args.dry_run)
+
+    print("Retention report" + (" (dry run)" if args.dry_run else "") + ":")
+    total = 0
+    for action, (count, size, reclaimed) in sorted(report.items()):
+        total += reclaimed
+        line = f"  {action:<18}{count:>7} files  {format_bytes(size):>10}"
+        if action == "compress" and args.dry_run:
+            line += "  (savings measured when applied)"
+        else:
+            line += f"  reclaimed {format_bytes(reclaimed)}"
+        print(line)
+    print(f"Total reclaimed: {format_bytes(total)}")
+
+if __name__ == "__main__":
+    main()
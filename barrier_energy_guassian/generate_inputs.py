@@ -5,8 +5,11 @@ Script to generate Gaussian input files for barrier energy calculations using
 optimized geometries from geom_optimise_gaussian folder.
 """
 
+import argparse
 import os
+import re
 from pathlib import Path
+from pprint import pformat
 import shutil
 
 def create_ts_input(reactant_path, product_path, ts_name, output_dir):
@@ -15,6 +18,7 @@ def create_ts_input(reactant_path, product_path, ts_name, output_dir):
     
     with open(output_path, 'w') as f:
         # Header with TS search specifications
+        f.write(f"%chk={ts_name}.chk\n")
         f.write("%mem=3GB\n")
         f.write("%nprocshared=4\n")
         f.write("# opt=(ts,calcfc,noeigen,qst3) freq m062x/def2tzvp geom=connectivity int=ultrafine scf=(tight,xqc)\n\n")
@@ -40,6 +44,34 @@ def create_ts_input(reactant_path, product_path, ts_name, output_dir):
         f.write("--Link1--\n")
         # ... (will be generated from reactant/product interpolation)
 
+def read_charge_multiplicity(gjf_path):
+    """Read the charge and multiplicity line from a Gaussian input file"""
+    with open(gjf_path, 'r') as f:
+        match = re.search(r'\n\s*(-?\d+)\s+(\d+)\s*\n', f.read())
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return 0, 1
+
+def create_irc_input(ts_name, charge, multiplicity, output_dir, max_points=20):
+    """Create Gaussian input file for an IRC run from the TS checkpoint"""
+    output_path = Path(output_dir) / f"{ts_name}_IRC.gjf"
+
+    with open(output_path, 'w') as f:
+        # Read geometry and force constants from the TS search checkpoint
+        f.write(f"%oldchk={ts_name}.chk\n")
+        f.write(f"%chk={ts_name}_IRC.chk\n")
+        f.write("%mem=3GB\n")
+        f.write("%nprocshared=4\n")
+        f.write(f"# irc=(rcfc,maxpoints={max_points}) m062x/def2tzvp geom=check guess=read int=ultrafine scf=(tight,xqc)\n\n")
+
+        # Title
+        f.write(f"{ts_name} intrinsic reaction coordinate\n\n")
+
+        # Charge and multiplicity
+        f.write(f"{charge} {multiplicity}\n\n")
+
+    return output_path
+
 def setup_reaction_paths():
     """Define reaction pathways and their components"""
     return {
@@ -75,14 +107,17 @@ def setup_reaction_paths():
         #}
     }
 
-def create_barrier_calculation_script(output_dir):
+def create_barrier_calculation_script(output_dir, reaction_paths=None):
     """Create a Python script to calculate barrier energies from Gaussian outputs"""
     script_path = Path(output_dir) / "calculate_barriers.py"
+    if reaction_paths is None:
+        reaction_paths = {}
     
     with open(script_path, 'w') as f:
         f.write("""#!/usr/bin/env python
 
 import os
+import sys
 from pathlib import Path
 
 def extract_energy(log_file):
@@ -106,12 +141,14 @@ def calculate_barrier(reactant_log, ts_log, product_logs):
     return barrier, rxn_energy
 
 def main():
-    reaction_paths = {
-        # Add your reaction paths here
-    }
+    reaction_paths = __REACTION_PATHS__
+    
+    # Optionally restrict to the reactions named on the command line
+    selected = sys.argv[1:] or list(reaction_paths)
     
     results = {}
-    for rxn, paths in reaction_paths.items():
+    for rxn in selected:
+        paths = reaction_paths[rxn]
         barrier, rxn_energy = calculate_barrier(
             f"{paths['reactant']}.log",
             f"{paths['ts_name']}.log",
@@ -132,18 +169,31 @@ def main():
 
 if __name__ == "__main__":
     main()
-""")
+""".replace("__REACTION_PATHS__", pformat(reaction_paths)))
 
 def main():
+    all_paths = setup_reaction_paths()
+    parser = argparse.ArgumentParser(description="Generate TS and IRC inputs for the reaction pathways")
+    parser.add_argument("--geom-dir", default="../geom_optimise_guassian/gaussian_projects",
+                      help="Directory with the optimized geometries (default: ../geom_optimise_guassian/gaussian_projects)")
+    parser.add_argument("--output-dir", default="barrier_energy_gaussian",
+                      help="Directory for the generated files (default: barrier_energy_gaussian)")
+    parser.add_argument("--reactions", nargs="+", choices=list(all_paths),
+                      help="Only generate these reactions (default: all)")
+    parser.add_argument("--irc-points", type=int, default=20,
+                      help="IRC points in each direction (default: 20)")
+    
+    args = parser.parse_args()
+    
     # Create directory structure
-    base_dir = Path("barrier_energy_gaussian")
+    base_dir = Path(args.output_dir)
     base_dir.mkdir(exist_ok=True)
     
     # Get optimized geometries directory
-    geom_opt_dir = Path("../geom_optimise_guassian/gaussian_projects")
+    geom_opt_dir = Path(args.geom_dir)
     
     # Setup reaction paths
-    reaction_paths = setup_reaction_paths()
+    reaction_paths = {rxn: all_paths[rxn] for rxn in args.reactions or all_paths}
     
     # Generate TS input files for each reaction path
     for rxn_name, components in reaction_paths.items():
@@ -158,16 +208,22 @@ def main():
             base_dir
         )
         
+        # Create IRC input reading the TS checkpoint
+        charge, multiplicity = read_charge_multiplicity(reactant_file)
+        create_irc_input(components['ts_name'], charge, multiplicity, base_dir, args.irc_points)
+        
         # Copy reactant and product input files
         for file in [reactant_file] + product_files:
             shutil.copy2(file, base_dir)
     
     # Create barrier calculation script
-    create_barrier_calculation_script(base_dir)
+    create_barrier_calculation_script(base_dir, reaction_paths)
     
-    print("Generated barrier energy calculation files in barrier_energy_gaussian/")
-    print("1. Run Gaussian calculations for all .gjf files")
+    print(f"Generated barrier energy calculation files in {base_dir}/")
+    print("1. Run Gaussian calculations for all .gjf files, or schedule them by dependency with:")
+    print("   python schedule_reaction_network.py --backend slurm")
     print("2. Run calculate_barriers.py to get barrier energies")
+    print("3. Run thermochemistry.py for enthalpy and free-energy barriers over a temperature range")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Schedule the barrier energy workflow as a dependency graph.
+
+This script:
+1. Builds a job graph from the reaction pathways in generate_inputs.py
+   (species optimisation -> TS search -> IRC -> barrier evaluation)
+2. Submits every job to SLURM chained with --dependency=afterok (jobs whose
+   prerequisite failed are cancelled), or runs the graph with a local
+   worker pool
+3. Releases each TS search as soon as its own reactant and products finish,
+   so independent pathways proceed concurrently
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from generate_inputs import setup_reaction_paths
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from walltime_model import load_models, time_for_inputs
+
+# SLURM time requests per stage, used when there is no history to predict from
+STAGE_TIMES = {
+    'opt': "2-00:00:00",
+    'ts': "2-00:00:00",
+    'irc': "2-00:00:00",
+    'barrier': "00:10:00"
+}
+
+SLURM_LOG_DIR = "slurm_logs"
+
+SLURM_HEADER = """#!/bin/bash
+#SBATCH --account="punim0131"
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+#SBATCH --cpus-per-task=4
+#SBATCH --time={time}
+#SBATCH --mem=5G
+#SBATCH --partition=sapphire
+#SBATCH --job-name={name}
+#SBATCH --output={log_dir}/{name}_%j.out
+
+module purge
+module load NVHPC/22.11-CUDA-11.7.0
+module load Gaussian/g16c01-CUDA-11.7.0
+
+export GAUSS_PDEF=${{SLURM_CPUS_PER_TASK}}
+
+cd "{work_dir}"
+"""
+
+def build_job_graph(reaction_paths):
+    """
+    Build the job graph for a set of reaction pathways.
+
+    Returns an ordered dict mapping job name to a dict with the stage, the
+    command to run and the names of the jobs it depends on. Species shared
+    between pathways are optimised only once.
+    """
+    graph = OrderedDict()
+
+    # Species optimisations have no dependencies
+    for components in reaction_paths.values():
+        for species in [components['reactant']] + components['products']:
+            name = f"opt_{species}"
+            if name not in graph:
+                graph[name] = {
+                    'stage': 'opt',
+                    'command': ["g16", f"{species}.gjf"],
+                    'depends_on': []
+                }
+
+    for rxn_name, components in reaction_paths.items():
+        ts_name = components['ts_name']
+        species = [components['reactant']] + components['products']
+
+        graph[f"ts_{ts_name}"] = {
+            'stage': 'ts',
+            'command': ["g16", f"{ts_name}.gjf"],
+            'depends_on': [f"opt_{s}" for s in species]
+        }
+        graph[f"irc_{ts_name}"] = {
+            'stage': 'irc',
+            'command': ["g16", f"{ts_name}_IRC.gjf"],
+            'depends_on': [f"ts_{ts_name}"]
+        }
+        graph[f"barrier_{rxn_name}"] = {
+            'stage': 'barrier',
+            'command': ["python", "calculate_barriers.py", rxn_name],
+            'depends_on': [f"irc_{ts_name}"]
+        }
+
+    return graph
+
+def topological_order(graph):
+    """Return job names ordered so every job follows its dependencies."""
+    remaining = {name: set(job['depends_on']) for name, job in graph.items()}
+    order = []
+
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between jobs: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return order
+
+def job_time(job, work_dir, models):
+    """SLURM time for a job: predicted from past runs of similar inputs, else the stage default."""
+    default = STAGE_TIMES[job['stage']]
+    if job['command'][0] != "g16":
+        return default
+    gjf_file = Path(work_dir) / job['command'][1]
+    if not gjf_file.exists():
+        return default
+    return time_for_inputs([gjf_file], default, models=models)
+
+def write_job_script(name, job, work_dir, script_dir, time=None):
+    """Write the SLURM batch script for a single job."""
+    script_path = Path(script_dir) / f"{name}.s"
+    # SLURM output stays apart from the Gaussian logs that the harvesters
+    # (find_artifacts(..., ["log"])) collect; SLURM does not create the directory
+    log_dir = Path(work_dir).resolve() / SLURM_LOG_DIR
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(script_path, 'w') as f:
+        f.write(SLURM_HEADER.format(time=time or STAGE_TIMES[job['stage']], name=name,
+                                    work_dir=Path(work_dir).resolve(), log_dir=log_dir))
+        f.write("\n" + " ".join(job['command']) + "\n")
+
+    return script_path
+
+def submit_slurm(graph, work_dir, dry_run=False):
+    """Submit all jobs to SLURM, chaining them with afterok dependencies."""
+    script_dir = Path(work_dir) / "jobs"
+    script_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        models = load_models()
+    except Exception as e:
+        print(f"WARNING: Walltime model unavailable ({e}); using stage defaults")
+        models = {}
+
+    job_ids = {}
+    for name in topological_order(graph):
+        job = graph[name]
+        script_path = write_job_script(name, job, work_dir, script_dir,
+                                       job_time(job, work_dir, models))
+
+        cmd = ["sbatch", "--parsable"]
+        if job['depends_on']:
+            dependency = ":".join(job_ids[dep] for dep in job['depends_on'])
+            # A failed prerequisite cancels its dependents instead of leaving them pending
+            cmd += [f"--dependency=afterok:{dependency}", "--kill-on-invalid-dep=yes"]
+        cmd.append(str(script_path))
+
+        if dry_run:
+            job_ids[name] = f"<{name}>"
+        else:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            # --parsable prints "jobid" or "jobid;cluster"
+            job_ids[name] = result.stdout.strip().split(';')[0]
+
+        print(f"  {' '.join(cmd)}  ->  {job_ids[name]}")
+
+    return job_ids
+
+def run_local(graph, work_dir, max_workers=2):
+    """
+    Run the job graph locally, starting each job once its dependencies succeed.
+
+    Jobs whose dependencies failed are skipped. Returns a dict mapping job name
+    to "done", "failed" or "skipped".
+    """
+    status = {}
+    pending = OrderedDict((name, graph[name]) for name in topological_order(graph))
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, job in list(pending.items()):
+                dep_status = [status.get(dep) for dep in job['depends_on']]
+                if any(s in ("failed", "skipped") for s in dep_status):
+                    status[name] = "skipped"
+                    print(f"  - Skipping {name}: a dependency did not complete")
+                    del pending[name]
+                elif all(s == "done" for s in dep_status):
+                    print(f"  - Starting {name}: {' '.join(job['command'])}")
+                    future = pool.submit(subprocess.run, job['command'], cwd=work_dir,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+                    running[future] = name
+                    del pending[name]
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    ok = future.result().returncode == 0
+                except OSError as e:
+                    print(f"  ✗ ERROR: Could not start {name}: {e}")
+                    ok = False
+                status[name] = "done" if ok else "failed"
+                print(f"  {'✓' if ok else '✗'} {name} {status[name]}")
+
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule barrier energy jobs by dependency")
+    parser.add_argument("--work-dir", default="barrier_energy_gaussian",
+                      help="Directory containing the generated .gjf files")
+    parser.add_argument("--backend", choices=["slurm", "local"], default="slurm",
+                      help="Submit to SLURM or run with a local worker pool (default: slurm)")
+    parser.add_argument("--max-workers", type=int, default=2,
+                      help="Concurrent jobs for the local backend (default: 2)")
+    parser.add_argument("--dry-run", action="store_true",
+                      help="Print the submission plan without submitting")
+
+    args = parser.parse_args()
+
+    graph = build_job_graph(setup_reaction_paths())
+
+    # Every Gaussian job needs its input file from generate_inputs.py
+    missing = [job['command'][1] for job in graph.values()
+               if job['command'][0] == "g16" and not (Path(args.work_dir) / job['command'][1]).exists()]
+    if missing:
+        print(f"WARNING: {len(missing)} input files missing from {args.work_dir}:")
+        for file in missing:
+            print(f"  - {file}")
+        print("Run generate_inputs.py first.")
+        if not args.dry_run:
+            return
+
+    print(f"Scheduling {len(graph)} jobs from {args.work_dir}")
+    if args.backend == "slurm":
+        submit_slurm(graph, args.work_dir, dry_run=args.dry_run)
+    else:
+        status = run_local(graph, args.work_dir, max_workers=args.max_workers)
+        done = sum(1 for s in status.values() if s == "done")
+        print(f"\nCompleted {done}/{len(graph)} jobs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""
+Free-energy barriers at arbitrary temperatures from existing opt+freq logs.
+
+This script:
+1. Parses the electronic energy, harmonic frequencies, rotational constants,
+   molecular mass, multiplicity and rotational symmetry number from each
+   species' Gaussian log once, caching them in thermo_data.json (logs are
+   re-parsed only when they change)
+2. Evaluates rigid-rotor/harmonic-oscillator partition functions for a whole
+   temperature array at once, giving ZPE, H, S and G per species
+3. Combines the species along the reaction paths from generate_inputs.py
+   into barrier and reaction energies versus temperature
+   (barrier_vs_temperature.csv)
+
+No Gaussian rerun with temperature= is needed; the imaginary mode of a
+transition state is excluded from its vibrational partition function.
+
+Usage:
+    python thermochemistry.py --log-dir barrier_energy_gaussian
+    python thermochemistry.py --temperatures 600 1500 --step 100 --low-freq-cutoff 100
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from generate_inputs import setup_reaction_paths
+
+# Physical constants (SI)
+KB = 1.380649e-23        # J/K
+H_PLANCK = 6.62607015e-34  # J s
+C_LIGHT = 2.99792458e10  # cm/s
+AMU = 1.66053906660e-27  # kg
+R_GAS = 8.314462618      # J/(mol K)
+HARTREE_J_MOL = 2625499.639  # J/mol per Hartree
+KCAL_PER_HARTREE = 627.509
+ATM = 101325.0           # Pa
+
+SCF_PATTERN = re.compile(r'SCF Done:\s+E\(\S+\)\s*=\s*(-?\d+\.\d+)')
+MASS_PATTERN = re.compile(r'Molecular mass:\s+([\d.]+)')
+SYMMETRY_PATTERN = re.compile(r'Rotational symmetry number\s+(\d+)')
+MULTIPLICITY_PATTERN = re.compile(r'Multiplicity\s*=\s*(\d+)')
+
+CACHE_NAME = "thermo_data.json"
+
+def parse_freq_log(log_file):
+    """
+    Extract the data needed for thermochemistry from an opt+freq log.
+
+    The last occurrence of each quantity is used, so the values belong to the
+    frequency job at the optimised geometry.
+    """
+    data = {
+        'energy': None,
+        'frequencies': [],
+        'rotational_constants_ghz': [],
+        'mass_amu': None,
+        'symmetry_number': 1,
+        'multiplicity': 1,
+    }
+    frequencies = []
+    in_freq_block = False
+
+    with open(log_file, 'r', errors='replace') as f:
+        for line in f:
+            if line.startswith(" SCF Done:"):
+                match = SCF_PATTERN.search(line)
+                if match:
+                    data['energy'] = float(match.group(1))
+            elif line.startswith(" Frequencies --"):
+                if not in_freq_block:
+                    # A new frequency calculation replaces earlier ones
+                    frequencies = []
+                    in_freq_block = True
+                frequencies.extend(float(v) for v in line.split("--", 1)[1].split())
+            elif "Rotational constants (GHZ):" in line:
+                constants = []
+                for token in line.split(":", 1)[1].split():
+                    try:
+                        constants.append(float(token))
+                    except ValueError:
+                        # "*******" marks an infinite constant (linear molecules)
+                        pass
+                data['rotational_constants_ghz'] = constants
+            elif line.startswith(" Molecular mass:"):
+                data['mass_amu'] = float(MASS_PATTERN.search(line).group(1))
+            elif "Rotational symmetry number" in line:
+                data['symmetry_number'] = int(SYMMETRY_PATTERN.search(line).group(1))
+            elif " Multiplicity =" in line:
+                data['multiplicity'] = int(MULTIPLICITY_PATTERN.search(line).group(1))
+            elif line.startswith(" - Thermochemistry -"):
+                in_freq_block = False
+
+    data['frequencies'] = frequencies
+    return data
+
+def load_species(names, log_dir, cache_file=None):
+    """
+    Return {name: parsed data} for the species' logs.
+
+    Parsed data is cached and reused while a log's size and mtime are unchanged.
+    """
+    log_dir = Path(log_dir)
+    cache_file = Path(cache_file) if cache_file else log_dir / CACHE_NAME
+    cache = {}
+    if cache_file.exists():
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+
+    species = {}
+    changed = False
+    for name in names:
+        log_file = log_dir / f"{name}.log"
+        if not log_file.exists():
+            continue
+        stat = log_file.stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        entry = cache.get(name)
+        if entry is None or entry['stamp'] != stamp:
+            entry = {'stamp': stamp, 'data': parse_freq_log(log_file)}
+            cache[name] = entry
+            changed = True
+        species[name] = entry['data']
+
+    if changed:
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=1)
+    return species
+
+def thermo(data, temperatures, pressure_atm=1.0, low_freq_cutoff=None):
+    """
+    RRHO thermochemistry over an array of temperatures.
+
+    Returns a dict of arrays (Hartree, or Hartree/K for S): zpe, H, S and G
+    (including the electronic energy), plus the temperatures themselves.
+    """
+    T = np.asarray(temperatures, dtype=float)
+
+    # Real vibrational modes; imaginary ones (negative) are dropped
+    nu = np.array([v for v in data['frequencies'] if v > 0.0])
+    if low_freq_cutoff:
+        nu = np.maximum(nu, low_freq_cutoff)
+    theta_v = H_PLANCK * C_LIGHT * nu / KB
+    zpe = R_GAS * theta_v.sum() / 2
+
+    x = theta_v[:, None] / T[None, :]
+    expm1 = np.expm1(x)
+    e_vib = zpe + R_GAS * (theta_v[:, None] / expm1).sum(axis=0)
+    s_vib = R_GAS * (x / expm1 - np.log1p(-np.exp(-x))).sum(axis=0)
+
+    # Translation (ideal gas, H includes PV = RT)
+    mass = data['mass_amu'] * AMU
+    pressure = pressure_atm * ATM
+    q_trans = (2 * np.pi * mass * KB * T / H_PLANCK ** 2) ** 1.5 * KB * T / pressure
+    s_trans = R_GAS * (np.log(q_trans) + 2.5)
+    h_trans = 2.5 * R_GAS * T
+
+    # Rotation: rotational temperatures from the constants in GHz
+    theta_r = np.array([c for c in data['rotational_constants_ghz'] if c > 0.0]) * 1e9 * H_PLANCK / KB
+    sigma = data['symmetry_number']
+    if len(theta_r) >= 3:
+        q_rot = np.sqrt(np.pi) / sigma * T ** 1.5 / np.sqrt(np.prod(theta_r[:3]))
+        s_rot = R_GAS * (np.log(q_rot) + 1.5)
+        h_rot = 1.5 * R_GAS * T
+    elif len(theta_r) >= 1:
+        q_rot = T / (sigma * theta_r[-1])
+        s_rot = R_GAS * (np.log(q_rot) + 1.0)
+        h_rot = R_GAS * T
+    else:
+        s_rot = np.zeros_like(T)
+        h_rot = np.zeros_like(T)
+
+    s_elec = R_GAS * np.log(data['multiplicity'])
+
+    enthalpy = e_vib + h_trans + h_rot
+    entropy = s_vib + s_trans + s_rot + s_elec
+    energy = data['energy']
+    return {
+        'T': T,
+        'zpe': zpe / HARTREE_J_MOL,
+        'H': energy + enthalpy / HARTREE_J_MOL,
+        'S': entropy / HARTREE_J_MOL,
+        'G': energy + (enthalpy - T * entropy) / HARTREE_J_MOL,
+    }
+
+def barrier_table(reaction_paths, species, temperatures, pressure_atm=1.0, low_freq_cutoff=None):
+    """
+    Barrier and reaction energies (kcal/mol) versus temperature.
+
+    Returns one row per reaction and temperature; reactions with a missing or
+    incomplete log are reported and skipped.
+    """
+    results = {}
+    for name, data in species.items():
+        if data['energy'] is None or data['mass_amu'] is None or not data['frequencies']:
+            continue
+        results[name] = thermo(data, temperatures, pressure_atm, low_freq_cutoff)
+
+    rows = []
+    for rxn, paths in reaction_paths.items():
+        products = paths['products']
+        needed = [paths['reactant'], paths['ts_name']] + products
+        missing = [name for name in needed if name not in results]
+        if missing:
+            print(f"Skipping {rxn}: no frequency data for {', '.join(missing)}")
+            continue
+
+        reactant = results[paths['reactant']]
+        ts = results[paths['ts_name']]
+        product = {key: sum(results[p][key] for p in products) for key in ('zpe', 'H', 'G')}
+        product_energy = sum(species[p]['energy'] for p in products)
+        reactant_energy = species[paths['reactant']]['energy']
+        ts_energy = species[paths['ts_name']]['energy']
+
+        d_e = (ts_energy - reactant_energy) * KCAL_PER_HARTREE
+        d_e0 = d_e + (ts['zpe'] - reactant['zpe']) * KCAL_PER_HARTREE
+        d_h = (ts['H'] - reactant['H']) * KCAL_PER_HARTREE
+        d_g = (ts['G'] - reactant['G']) * KCAL_PER_HARTREE
+        rxn_e = (product_energy - reactant_energy) * KCAL_PER_HARTREE
+        rxn_g = (product['G'] - reactant['G']) * KCAL_PER_HARTREE
+
+        for i, temperature in enumerate(reactant['T']):
+            rows.append({
+                'reaction': rxn,
+                'temperature_K': temperature,
+                'barrier_E': d_e,
+                'barrier_E0': d_e0,
+                'barrier_H': d_h[i],
+                'barrier_G': d_g[i],
+                'reaction_E': rxn_e,
+                'reaction_G': rxn_g[i],
+            })
+    return rows
+
+def write_table(rows, output_file):
+    """Write the barrier table as CSV."""
+    columns = ['reaction', 'temperature_K', 'barrier_E', 'barrier_E0', 'barrier_H',
+               'barrier_G', 'reaction_E', 'reaction_G']
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: (f"{v:.4f}" if isinstance(v, (float, np.floating)) else v)
+                             for k, v in row.items()})
+
+def main():
+    parser = argparse.ArgumentParser(description="Barriers versus temperature from opt+freq logs")
+    parser.add_argument("--log-dir", default="barrier_energy_gaussian",
+                      help="Directory with the species and TS logs (default: barrier_energy_gaussian)")
+    parser.add_argument("--temperatures", type=float, nargs="+", default=[600.0, 1500.0],
+                      help="Temperatures in K, or MIN MAX with --step (default: 600 1500)")
+    parser.add_argument("--step", type=float, default=50.0,
+                      help="Spacing when two temperatures are given as a range (default: 50)")
+    parser.add_argument("--pressure", type=float, default=1.0,
+                      help="Pressure in atm (default: 1.0)")
+    parser.add_argument("--low-freq-cutoff", type=float,
+                      help="Raise real frequencies below this value (cm-1) to it")
+    parser.add_argument("--output", default="barrier_vs_temperature.csv",
+                      help="Output table (default: barrier_vs_temperature.csv)")
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.log_dir):
+        print(f"Error: Log directory '{args.log_dir}' not found!")
+        sys.exit(1)
+
+    if len(args.temperatures) == 2:
+        low, high = args.temperatures
+        temperatures = np.arange(low, high + args.step / 2, args.step)
+    else:
+        temperatures = np.array(args.temperatures)
+
+    reaction_paths = setup_reaction_paths()
+    names = sorted({name for paths in reaction_paths.values()
+                    for name in [paths['reactant'], paths['ts_name']] + paths['products']})
+    species = load_species(names, args.log_dir)
+
+    rows = barrier_table(reaction_paths, species, temperatures, args.pressure, args.low_freq_cutoff)
+    if not rows:
+        print("No reaction has frequency data for all of its species yet.")
+        sys.exit(1)
+    write_table(rows, args.output)
+
+    print(f"\n{'reaction':<12}{'T (K)':>8}{'dE':>9}{'dH':>9}{'dG':>9}  (barriers, kcal/mol)")
+    for row in rows:
+        print(f"{row['reaction']:<12}{row['temperature_K']:>8.0f}{row['barrier_E']:>9.2f}"
+              f"{row['barrier_H']:>9.2f}{row['barrier_G']:>9.2f}")
+    print(f"\nTable written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Stand-ins for g16, formchk and cubegen for running the pipeline locally.
+
+The g16, formchk and cubegen executables in this directory call into this
+module. Put the directory first on PATH and the runners work unchanged:
+1. g16 reads the input (including --Link1-- batches and ADMP routes) and
+   writes a log in the layout of real Gaussian 16 output and a checkpoint
+   padded to a realistic size; ADMP jobs get step summaries
+2. formchk turns such a checkpoint into a .fchk with the real geometry
+3. cubegen writes cubes for the default, explicit (npts > 0) and stdin grid
+   (npts -1) modes, and point values for npts -5
+
+Behaviour is set through the environment:
+    FAKE_G16_DELAY, FAKE_FORMCHK_DELAY, FAKE_CUBEGEN_DELAY
+        Seconds per job or call, either a number or a MIN-MAX range
+    FAKE_G16_FAILURE_RATE, FAKE_CUBEGEN_FAILURE_RATE
+        Probability of a failed job or call (default: 0)
+    FAKE_G16_FAILURE_MODES
+        Comma-separated failure classes to draw from: scf, memory, link9999,
+        walltime (default: scf)
+    FAKE_CUBE_POINTS
+        Points per axis of cubes, overriding the npts requested by the caller
+        (by default cubes have the requested size, 80 when npts is 0)
+    FAKE_ADMP_STEPS
+        Upper limit on the steps written for ADMP jobs (default: 100)
+    FAKE_GAUSSIAN_SEED
+        Seed for delays, failures and values (default: 0)
+    FAKE_GAUSSIAN_LEDGER
+        If set, one tab-separated line (tool, name, start, end, status) is
+        appended per call, for measuring the pipeline's own overhead
+
+Failures are drawn from the job's %chk and route, so a rerun of an unchanged
+input fails again while a retry with a rewritten route gets a new draw.
+"""
+
+import fcntl
+import os
+import random
+import sys
+import time
+
+# Taken before the heavier imports, so the ledger covers the whole call
+STARTED = time.time()
+
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent.parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_data import SEPARATOR, write_admp_log, write_fchk_array
+from walltime_model import estimate_nbasis, read_gjf_jobs, route_method_basis
+
+BOHR = 0.52917721
+ATOMIC_NUMBERS = {
+    'H': 1, 'He': 2, 'Li': 3, 'Be': 4, 'B': 5, 'C': 6, 'N': 7, 'O': 8, 'F': 9, 'Ne': 10,
+    'Na': 11, 'Mg': 12, 'Al': 13, 'Si': 14, 'P': 15, 'S': 16, 'Cl': 17, 'Ar': 18,
+    'K': 19, 'Ca': 20, 'Br': 35, 'I': 53,
+}
+
+FAILURE_MESSAGES = {
+    'scf': [" Convergence failure -- run terminated.",
+            " Error termination via Lnk1e in /apps/gaussian/g16/l502.exe at Wed Mar 19 16:19:07 2025."],
+    'memory': [" galloc:  could not allocate memory.",
+               " Error termination via Lnk1e in /apps/gaussian/g16/l302.exe at Wed Mar 19 16:19:07 2025."],
+    'link9999': [" Optimization stopped.",
+                 " Error termination request processed by link 9999.",
+                 " Error termination via Lnk1e in /apps/gaussian/g16/l9999.exe at Wed Mar 19 16:19:07 2025."],
+    # Killed by the scheduler: no termination message at all
+    'walltime': [],
+}
+
+# Checkpoints hold the geometry as a text header followed by padding
+CHK_MAGIC = "FAKECHK"
+
+def env_float(name, default=0.0):
+    return float(os.environ.get(name, default))
+
+def rng_for(*keys):
+    """Random generator seeded by FAKE_GAUSSIAN_SEED and the given keys."""
+    seed = zlib.crc32(":".join([os.environ.get("FAKE_GAUSSIAN_SEED", "0"), *map(str, keys)]).encode())
+    return random.Random(seed)
+
+def delay(name, rng):
+    """Sleep for the delay configured in the environment variable `name`."""
+    spec = os.environ.get(name, "0")
+    if "-" in spec.lstrip("-"):
+        low, high = spec.split("-", 1)
+        seconds = rng.uniform(float(low), float(high))
+    else:
+        seconds = float(spec)
+    if seconds > 0:
+        time.sleep(seconds)
+
+def record(tool, name, start, status):
+    """Append a line to the ledger, if one is configured."""
+    ledger = os.environ.get("FAKE_GAUSSIAN_LEDGER")
+    if not ledger:
+        return
+    with open(ledger, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(f"{tool}\t{name}\t{start:.6f}\t{time.time():.6f}\t{status}\n")
+
+def read_link0(section, key):
+    for line in section.splitlines():
+        if line.lower().startswith(f"%{key}="):
+            return line.split("=", 1)[1].strip()
+    return None
+
+def job_geometry(section, symbols):
+    """(symbol, x, y, z) rows of a job's input, or synthetic positions if it reads them from a checkpoint."""
+    atoms = []
+    for line in section.splitlines():
+        fields = line.split()
+        if len(fields) == 4 and fields[0].capitalize() in ATOMIC_NUMBERS:
+            try:
+                atoms.append((fields[0].capitalize(), *map(float, fields[1:])))
+            except ValueError:
+                pass
+    if atoms:
+        return atoms
+    return [(symbol, 1.5 * i, 0.0, 0.0) for i, symbol in enumerate(symbols)]
+
+def write_chk(path, atoms, nbasis, energy):
+    """Write a checkpoint roughly the size of a real one (MO coefficients and density)."""
+    header = [f"{CHK_MAGIC} {len(atoms)} {nbasis} {energy:.10f}"]
+    header += [f"{symbol} {x:.8f} {y:.8f} {z:.8f}" for symbol, x, y, z in atoms]
+    text = ("\n".join(header) + "\n").encode()
+    size = max(len(text), 8 * 3 * nbasis * nbasis + 1_000_000)
+    with open(path, 'wb') as f:
+        f.write(text)
+        f.write(b"\0" * (size - len(text)))
+
+def read_chk(path):
+    """Return (atoms, nbasis, energy) from a checkpoint written by write_chk."""
+    with open(path, 'rb') as f:
+        head = f.read(65536).split(b"\0", 1)[0].decode().splitlines()
+    magic, natoms, nbasis, energy = head[0].split()
+    if magic != CHK_MAGIC:
+        raise ValueError(f"{path} is not a checkpoint written by the fake g16")
+    atoms = [(fields[0], *map(float, fields[1:4])) for fields in map(str.split, head[1:1 + int(natoms)])]
+    return atoms, int(nbasis), float(energy)
+
+def write_frame_job(log, gjf_name, section, route, atoms, nbasis, rng, failure, step=1):
+    """Write one job's part of the log; return its SCF energy.
+
+    Like g16, the banner is written once per process; later --Link1-- steps
+    start with the "Proceeding to internal job step" line.
+    """
+    energy = -100.0 * len(atoms) + rng.gauss(0, 0.01)
+    cycles = rng.randint(8, 25)
+    nproc = read_link0(section, "nprocshared") or read_link0(section, "nproc") or "1"
+
+    if step == 1:
+        log.write(" Entering Gaussian System, Link 0=g16\n")
+        log.write(f" Input={gjf_name}\n Output={Path(gjf_name).stem}.log\n")
+    else:
+        log.write(f" Link1:  Proceeding to internal job step number {step:2d}.\n")
+    for line in section.splitlines():
+        if line.startswith("%"):
+            log.write(f" {line}\n")
+    log.write(f" Will use up to {int(nproc):4d} processors via shared memory.\n")
+    log.write(" " + "-" * 70 + "\n")
+    log.write(f" {route}\n")
+    log.write(" " + "-" * 70 + "\n")
+    log.write("                          Input orientation:                          \n")
+    log.write(SEPARATOR)
+    log.write(" Center     Atomic      Atomic             Coordinates (Angstroms)\n")
+    log.write(" Number     Number       Type             X           Y           Z\n")
+    log.write(SEPARATOR)
+    for i, (symbol, x, y, z) in enumerate(atoms):
+        log.write(f" {i + 1:6d} {ATOMIC_NUMBERS[symbol]:10d} {0:11d} {x:15.6f}{y:12.6f}{z:12.6f}\n")
+    log.write(SEPARATOR)
+    log.write(f" {nbasis:5d} basis functions,   {2 * nbasis:4d} primitive gaussians\n")
+    log.write(f" NAtoms= {len(atoms):4d} NActive= {len(atoms):4d} NUniq= {len(atoms):4d}\n")
+    log.write(f" NBasis= {nbasis:5d} RedAO= T EigKep=  4.33D-03  NBF= {nbasis:5d}\n")
+
+    if failure:
+        for line in FAILURE_MESSAGES[failure]:
+            log.write(f"{line}\n")
+        return energy
+
+    method = route_method_basis(route)[0] or "B3LYP"
+    log.write(f" SCF Done:  E(R{method.upper()}) =  {energy:.9f}     A.U. after {cycles:4d} cycles\n")
+    cpu = cycles * nbasis * len(atoms) * 0.01
+    log.write(f" Job cpu time:       0 days {int(cpu // 3600):2d} hours {int(cpu % 3600 // 60):2d} minutes "
+              f"{cpu % 60:4.1f} seconds.\n")
+    log.write(f" Elapsed time:       0 days {int(cpu // 3600):2d} hours {int(cpu % 3600 // 60):2d} minutes "
+              f"{cpu % 60 / 4:4.1f} seconds.\n")
+    log.write(" Normal termination of Gaussian 16 at Wed Mar 19 16:19:07 2025.\n")
+    return energy
+
+def g16_main():
+    if len(sys.argv) < 2:
+        print("usage: g16 input.gjf", file=sys.stderr)
+        return 1
+    gjf_file = Path(sys.argv[1])
+    with open(gjf_file, 'r') as f:
+        sections = f.read().split("--Link1--")
+    jobs = read_gjf_jobs(gjf_file)
+
+    rate = env_float("FAKE_G16_FAILURE_RATE")
+    modes = [m for m in os.environ.get("FAKE_G16_FAILURE_MODES", "scf").split(",") if m in FAILURE_MESSAGES]
+    status = 0
+
+    # ADMP trajectories: one job whose log carries the step summaries
+    route, symbols, steps = jobs[0]
+    if "ADMP" in route.upper():
+        rng = rng_for(gjf_file.name, route)
+        delay("FAKE_G16_DELAY", rng)
+        n_steps = min(steps or 100, int(env_float("FAKE_ADMP_STEPS", 100)))
+        nbasis = estimate_nbasis(symbols, route_method_basis(route)[1]) or 10 * len(symbols)
+        write_admp_log(gjf_file.with_suffix(".log"), len(symbols), n_steps, nbasis)
+        chk = read_link0(sections[0], "chk")
+        if chk:
+            write_chk(chk, job_geometry(sections[0], symbols), nbasis, -312.99)
+        record("g16", gjf_file.stem, STARTED, 0)
+        return 0
+
+    with open(gjf_file.with_suffix(".log"), 'w') as log:
+        for step, (section, (route, symbols, _)) in enumerate(zip(sections, jobs), start=1):
+            chk = read_link0(section, "chk") or f"{gjf_file.stem}.chk"
+            rng = rng_for(chk, route)
+            failure = rng.choice(modes) if modes and rng.random() < rate else None
+            delay("FAKE_G16_DELAY", rng)
+
+            atoms = job_geometry(section, symbols)
+            nbasis = estimate_nbasis([a[0] for a in atoms], route_method_basis(route)[1]) or 10 * len(atoms)
+            energy = write_frame_job(log, gjf_file.name, section, route, atoms, nbasis, rng, failure, step)
+            if failure:
+                # Gaussian stops at the first failed job of a --Link1-- input
+                status = 137 if failure == "walltime" else 1
+                break
+            write_chk(chk, atoms, nbasis, energy)
+
+    record("g16", gjf_file.stem, STARTED, status)
+    return status
+
+def orbital_coefficients(nbasis, rng):
+    """
+    MO coefficients, one column per MO, orthonormal in an AO metric fixed per basis size.
+
+    Frames differ by a small random rotation, so orbital overlaps between
+    frames look like those of a trajectory.
+    """
+    base = np.random.default_rng(nbasis)
+    a = base.normal(size=(nbasis, nbasis))
+    w, v = np.linalg.eigh(a @ a.T / nbasis + np.eye(nbasis))
+    q, r = np.linalg.qr(base.normal(size=(nbasis, nbasis)) + rng.normal(0, 0.01, (nbasis, nbasis)))
+    return (v / np.sqrt(w)) @ v.T @ (q * np.sign(np.diag(r)))
+
+def formchk_main():
+    args = [a for a in sys.argv[1:] if not a.startswith("-")]
+    if not args:
+        print("usage: formchk file.chk [file.fchk]", file=sys.stderr)
+        return 1
+    chk_file = Path(args[0])
+    fchk_file = Path(args[1]) if len(args) > 1 else chk_file.with_suffix(".fchk")
+    delay("FAKE_FORMCHK_DELAY", rng_for("formchk", chk_file.name))
+
+    try:
+        atoms, nbasis, energy = read_chk(chk_file)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"formchk: cannot read {chk_file}: {e}", file=sys.stderr)
+        record("formchk", chk_file.stem, STARTED, 1)
+        return 1
+
+    rng = np.random.default_rng(zlib.crc32(chk_file.name.encode()))
+    numbers = [ATOMIC_NUMBERS[a[0]] for a in atoms]
+    n_electrons = sum(numbers)
+    with open(fchk_file, 'w') as f:
+        f.write(f"{chk_file.stem}\n")
+        f.write(f"{'SP':<10}{'RB3LYP':<60}{'6-31G(d)':<20}\n")
+        f.write(f"{'Number of atoms':<43}I{len(atoms):17d}\n")
+        f.write(f"{'Charge':<43}I{0:17d}\n")
+        f.write(f"{'Multiplicity':<43}I{1:17d}\n")
+        f.write(f"{'Number of electrons':<43}I{n_electrons:17d}\n")
+        f.write(f"{'Number of alpha electrons':<43}I{n_electrons // 2:17d}\n")
+        f.write(f"{'Number of beta electrons':<43}I{n_electrons // 2:17d}\n")
+        f.write(f"{'Number of basis functions':<43}I{nbasis:17d}\n")
+        f.write(f"{'Number of independent functions':<43}I{nbasis:17d}\n")
+        write_fchk_array(f, "Atomic numbers", "I", numbers)
+        write_fchk_array(f, "Current cartesian coordinates", "R",
+                         [c / BOHR for _, x, y, z in atoms for c in (x, y, z)])
+        f.write(f"{'SCF Energy':<43}R     {energy:22.15E}\n")
+        write_fchk_array(f, "Alpha Orbital Energies", "R", np.sort(rng.uniform(-25, 2, nbasis)).tolist())
+        write_fchk_array(f, "Alpha MO coefficients", "R", orbital_coefficients(nbasis, rng).T.ravel().tolist())
+        write_fchk_array(f, "Total SCF Density", "R",
+                         rng.normal(0, 0.1, nbasis * (nbasis + 1) // 2).tolist())
+
+    record("formchk", chk_file.stem, STARTED, 0)
+    return 0
+
+def read_fchk_geometry(fchk_file):
+    """Return (atomic numbers, coordinates in bohr) from a formatted checkpoint."""
+    arrays = {}
+    label, values, remaining = None, [], 0
+    with open(fchk_file, 'r') as f:
+        for line in f:
+            if remaining:
+                values.extend(line.split())
+                remaining -= len(line.split())
+                if remaining <= 0:
+                    arrays[label] = values
+                    remaining = 0
+                if len(arrays) == 2:
+                    break
+            elif line.startswith(("Atomic numbers", "Current cartesian coordinates")) and "N=" in line:
+                label = line[:43].strip()
+                values, remaining = [], int(line.split("N=")[1])
+    numbers = np.array(arrays["Atomic numbers"], dtype=int)
+    coords = np.array(arrays["Current cartesian coordinates"], dtype=float).reshape(-1, 3)
+    return numbers, coords
+
+def write_cube_file(path, title, numbers, coords, origin, axes, counts, orbital):
+    """Write a cube (bohr) with a Gaussian blob on each atom; orbitals get a node."""
+    with open(path, 'w') as f:
+        f.write(f" {title}\n")
+        f.write(" MO coefficients\n" if orbital else f" {title} values\n")
+        f.write(f"{-len(numbers) if orbital else len(numbers):5d}"
+                f"{origin[0]:12.6f}{origin[1]:12.6f}{origin[2]:12.6f}\n")
+        for n, axis in zip(counts, axes):
+            f.write(f"{n:5d}{axis[0]:12.6f}{axis[1]:12.6f}{axis[2]:12.6f}\n")
+        for number, (x, y, z) in zip(numbers, coords):
+            f.write(f"{number:5d}{float(number):12.6f}{x:12.6f}{y:12.6f}{z:12.6f}\n")
+        if orbital:
+            f.write(f"{1:5d}{1:5d}\n")
+
+        # Six values per line, a new line after each z row
+        row_format = ("%13.5E" * 6 + "\n") * (counts[2] // 6)
+        if counts[2] % 6:
+            row_format += "%13.5E" * (counts[2] % 6) + "\n"
+        plane_format = row_format * counts[1]
+
+        # One x plane at a time keeps memory bounded for large grids
+        j, k = np.meshgrid(np.arange(counts[1]), np.arange(counts[2]), indexing='ij')
+        for i in range(counts[0]):
+            points = origin + i * axes[0] + j[..., None] * axes[1] + k[..., None] * axes[2]
+            r2 = ((points[:, :, None, :] - coords[None, None, :, :]) ** 2).sum(axis=-1)
+            values = np.exp(-r2).sum(axis=-1)
+            if orbital:
+                values = values * (points[..., 0] - coords[:, 0].mean())
+            f.write(plane_format % tuple(values.ravel()))
+
+def cubegen_main():
+    args = sys.argv[1:]
+    if len(args) < 4:
+        print("usage: cubegen nprocs kind fchk cube [npts] [format]", file=sys.stderr)
+        return 1
+    kind, fchk_file, cube_file = args[1], args[2], args[3]
+    npts = int(args[4]) if len(args) > 4 else 0
+    rng = rng_for("cubegen", Path(cube_file).name, kind)
+    delay("FAKE_CUBEGEN_DELAY", rng)
+
+    if rng.random() < env_float("FAKE_CUBEGEN_FAILURE_RATE"):
+        print(f"cubegen: failed to evaluate {kind}", file=sys.stderr)
+        record("cubegen", Path(cube_file).stem, STARTED, 1)
+        return 1
+
+    try:
+        numbers, coords = read_fchk_geometry(fchk_file)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"cubegen: cannot read {fchk_file}: {e}", file=sys.stderr)
+        record("cubegen", Path(cube_file).stem, STARTED, 1)
+        return 1
+
+    if npts == -5:
+        # Points (bohr) on stdin; one "x y z value" row per point
+        points = np.loadtxt(sys.stdin, ndmin=2)
+        r = np.linalg.norm(points[:, None, :] - coords[None, :, :], axis=-1)
+        values = (numbers[None, :] / np.maximum(r, 0.1)).sum(axis=1) * 0.01
+        with open(cube_file, 'w') as f:
+            f.write(f" {kind}\n {kind} values at input points\n")
+            f.write(f"{len(numbers):5d}{0.0:12.6f}{0.0:12.6f}{0.0:12.6f}\n")
+            for number, (x, y, z) in zip(numbers, coords):
+                f.write(f"{number:5d}{float(number):12.6f}{x:12.6f}{y:12.6f}{z:12.6f}\n")
+            for (x, y, z), value in zip(points, values):
+                f.write(f"{x:13.6f}{y:13.6f}{z:13.6f}{value:15.6E}\n")
+    else:
+        if npts == -1:
+            # Grid header on stdin; positive counts mean Angstrom
+            header = [line.split() for line in sys.stdin.read().splitlines() if line.strip()]
+            origin = np.array(header[0][1:4], dtype=float)
+            counts = [int(header[i][0]) for i in range(1, 4)]
+            axes = np.array([header[i][1:4] for i in range(1, 4)], dtype=float)
+            if counts[0] > 0:
+                origin, axes = origin / BOHR, axes / BOHR
+            counts = [abs(n) for n in counts]
+        else:
+            n = int(os.environ.get("FAKE_CUBE_POINTS") or (npts if npts > 0 else 80))
+            lower = coords.min(axis=0) - 5.0
+            spacing = (coords.max(axis=0) + 5.0 - lower) / max(n - 1, 1)
+            origin, axes, counts = lower, np.diag(spacing), [n, n, n]
+        write_cube_file(cube_file, kind, numbers, coords, origin, axes, counts,
+                        orbital=kind.upper().startswith("MO"))
+
+    record("cubegen", Path(cube_file).stem, STARTED, 0)
+    return 0
+
+TOOLS = {'g16': g16_main, 'formchk': formchk_main, 'cubegen': cubegen_main}
+
+if __name__ == "__main__":
+    sys.exit(TOOLS[sys.argv.pop(1)]())
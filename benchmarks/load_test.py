@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the orbital stage with fake Gaussian executables.
+
+This script:
+1. Writes synthetic ADMP trajectories (benchmarks/synthetic_data.py) into an
+   admp_jobs/results-style tree
+2. Runs generate_orbitals_from_xyz.py on them and times input generation
+3. Runs submit_orbital_calculations.sh on the inputs with the stubs from
+   benchmarks/fake_gaussian first on PATH, with configurable delays and
+   failure rates
+4. Reports the runner's own overhead (wall time minus the time spent inside
+   the stubs, from their ledger), job outcomes from the pipeline metrics, and
+   the files and bytes written per frame
+
+Everything is written below the work directory, which is removed afterwards
+unless --work-dir or --keep is given.
+
+Usage:
+    python load_test.py --trajectories 10 --frames 100
+    python load_test.py --trajectories 4 --frames 250 --batch-size 5 --failure-rate 0.05 --keep
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+FAKE_DIR = BENCH_DIR / "fake_gaussian"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from run_pipeline import ORBITAL_DIR
+import results_catalog
+import synthetic_data
+
+def write_trajectories(results_dir, trajectories, frames, atoms):
+    """Write `trajectories` XYZ files spread over molecules at two temperatures."""
+    temperatures = (800, 1000)
+    written = []
+    for t in range(trajectories):
+        molecule = f"MOL{t // len(temperatures)}"
+        temp = temperatures[t % len(temperatures)]
+        temp_dir = Path(results_dir) / molecule / f"{temp}K"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        written.append(synthetic_data.write_xyz_trajectory(
+            temp_dir / f"{molecule}_ADMP_{temp}K.xyz", atoms, frames, seed=t))
+    return written
+
+def run_timed(command, log_file, env=None):
+    """Run a command in the orbital directory; return (seconds, exit status)."""
+    start = time.perf_counter()
+    with open(log_file, 'w') as log:
+        result = subprocess.run(command, cwd=ORBITAL_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return time.perf_counter() - start, result.returncode
+
+def tree_usage(path):
+    """Return (files, directories, bytes, largest directory entry count) below a directory."""
+    files = directories = size = widest = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        directories += len(dirnames)
+        files += len(filenames)
+        widest = max(widest, len(dirnames) + len(filenames))
+        for name in filenames:
+            size += os.path.getsize(os.path.join(dirpath, name))
+    return files, directories, size, widest
+
+def read_ledger(ledger_file):
+    """Seconds, calls and failures per stub from the ledger."""
+    tools = defaultdict(lambda: {'calls': 0, 'failed': 0, 'seconds': 0.0})
+    if os.path.exists(ledger_file):
+        with open(ledger_file, 'r') as f:
+            for line in f:
+                tool, _, start, end, status = line.rstrip('\n').split('\t')
+                tools[tool]['calls'] += 1
+                tools[tool]['failed'] += status != "0"
+                tools[tool]['seconds'] += float(end) - float(start)
+    return dict(tools)
+
+def load_test(work_dir, args):
+    """Run the generator and the runner; return the report dict."""
+    work_dir = Path(work_dir)
+    results_dir = work_dir / "results"
+    input_dir = work_dir / "orbital_inputs"
+    output_dir = work_dir / "orbital_results"
+    ledger = work_dir / "fake_gaussian.ledger"
+
+    print(f"Writing {args.trajectories} trajectories x {args.frames} frames ({args.atoms} atoms)...")
+    write_trajectories(results_dir, args.trajectories, args.frames, args.atoms)
+
+    # Catalog lookups of the generated tree stay out of the real results_catalog.db
+    os.environ[results_catalog.DB_ENV] = str(work_dir / "results_catalog.db")
+
+    print("Generating orbital inputs...")
+    command = [sys.executable, "generate_orbitals_from_xyz.py", "--base-dir", str(results_dir),
+               "--output-dir", str(input_dir), "--max-frames", str(args.frames),
+               "--batch-size", str(args.batch_size)]
+    if args.align:
+        command.append("--align")
+    generate_seconds, status = run_timed(command, work_dir / "generate.out")
+    if status != 0:
+        raise RuntimeError(f"Input generation failed, see {work_dir / 'generate.out'}")
+    inputs = list(input_dir.rglob("*.gjf"))
+
+    env = dict(os.environ)
+    env.update({
+        'PATH': f"{FAKE_DIR}{os.pathsep}{env.get('PATH', '')}",
+        'SLURM_SUBMIT_DIR': str(ORBITAL_DIR),
+        'METRICS_DIR': str(work_dir / "metrics"),
+        'RETRY_BUDGET': str(args.retry_budget),
+        'FAKE_GAUSSIAN_LEDGER': str(ledger),
+        'FAKE_GAUSSIAN_SEED': str(args.seed),
+        'FAKE_G16_DELAY': args.g16_delay,
+        'FAKE_FORMCHK_DELAY': args.formchk_delay,
+        'FAKE_CUBEGEN_DELAY': args.cubegen_delay,
+        'FAKE_G16_FAILURE_RATE': str(args.failure_rate),
+        'FAKE_G16_FAILURE_MODES': args.failure_modes,
+        'FAKE_CUBE_POINTS': str(args.cube_points),
+    })
+
+    print(f"Running submit_orbital_calculations.sh on {len(inputs)} inputs with fake Gaussian...")
+    command = ["bash", "submit_orbital_calculations.sh", "--input", str(input_dir),
+               "--output", str(output_dir), "--scratch", str(work_dir / "scratch"), "--esp", args.esp]
+    run_seconds, status = run_timed(command, work_dir / "runner.out", env)
+
+    tools = read_ledger(ledger)
+    stub_seconds = sum(tool['seconds'] for tool in tools.values())
+    frames = args.trajectories * args.frames
+
+    jobs = {}
+    snapshot_file = work_dir / "metrics" / "gaussian_pipeline.json"
+    if snapshot_file.exists():
+        with open(snapshot_file, 'r') as f:
+            jobs = json.load(f)['runners'].get('orbital', {}).get('jobs', {})
+
+    input_files, _, input_bytes, _ = tree_usage(input_dir)
+    output_files, output_dirs, output_bytes, widest = tree_usage(output_dir)
+
+    return {
+        'frames': frames,
+        'inputs': len(inputs),
+        'generate_seconds': round(generate_seconds, 3),
+        'runner_seconds': round(run_seconds, 3),
+        'runner_exit_status': status,
+        'stub_seconds': round(stub_seconds, 3),
+        'overhead_seconds': round(run_seconds - stub_seconds, 3),
+        'overhead_per_frame': round((run_seconds - stub_seconds) / frames, 4),
+        'frames_per_second': round(frames / run_seconds, 3),
+        'tools': tools,
+        'jobs': jobs,
+        'input_files': input_files,
+        'input_bytes': input_bytes,
+        'output_files': output_files,
+        'output_directories': output_dirs,
+        'output_bytes': output_bytes,
+        'files_per_frame': round(output_files / frames, 2),
+        'bytes_per_frame': round(output_bytes / frames),
+        'largest_directory_entries': widest,
+    }
+
+def print_report(report):
+    frames = report['frames']
+    print(f"\nFrames: {frames} in {report['inputs']} inputs")
+    print(f"Input generation: {report['generate_seconds']:.2f} s "
+          f"({frames / max(report['generate_seconds'], 1e-9):.0f} frames/s)")
+    print(f"Runner: {report['runner_seconds']:.2f} s wall, {report['stub_seconds']:.2f} s inside the stubs, "
+          f"{report['overhead_seconds']:.2f} s overhead ({1000 * report['overhead_per_frame']:.1f} ms/frame)")
+
+    print(f"\n{'stub':<10}{'calls':>8}{'failed':>8}{'seconds':>10}")
+    for name, tool in sorted(report['tools'].items()):
+        print(f"{name:<10}{tool['calls']:>8}{tool['failed']:>8}{tool['seconds']:>10.2f}")
+
+    if report['jobs']:
+        print("\nJobs: " + ", ".join(f"{state} {count}" for state, count in report['jobs'].items()))
+    print(f"\nOutput: {report['output_files']} files in {report['output_directories']} directories, "
+          f"{report['output_bytes'] / 1e6:.1f} MB "
+          f"({report['files_per_frame']} files, {report['bytes_per_frame'] / 1e6:.2f} MB per frame; "
+          f"largest directory {report['largest_directory_entries']} entries)")
+    print(f"Inputs: {report['input_files']} files, {report['input_bytes'] / 1e6:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the orbital stage with fake Gaussian executables")
+    parser.add_argument("--trajectories", type=int, default=4,
+                      help="Number of trajectories (default: 4)")
+    parser.add_argument("--frames", type=int, default=50,
+                      help="Frames per trajectory (default: 50)")
+    parser.add_argument("--atoms", type=int, default=6,
+                      help="Atoms per molecule (default: 6)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                      help="Frames per input, passed to generate_orbitals_from_xyz.py (default: 1)")
+    parser.add_argument("--align", action="store_true",
+                      help="Align frames and use a common cube grid")
+    parser.add_argument("--esp", default="cube", choices=["cube", "surface", "both", "none"],
+                      help="ESP mode of the runner (default: cube)")
+    parser.add_argument("--g16-delay", default="0",
+                      help="Seconds per g16 job, or MIN-MAX (default: 0)")
+    parser.add_argument("--formchk-delay", default="0",
+                      help="Seconds per formchk call, or MIN-MAX (default: 0)")
+    parser.add_argument("--cubegen-delay", default="0",
+                      help="Seconds per cubegen call, or MIN-MAX (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                      help="Probability of a failed g16 job (default: 0)")
+    parser.add_argument("--failure-modes", default="scf",
+                      help="Failure classes to draw from: scf, memory, link9999, walltime (default: scf)")
+    parser.add_argument("--retry-budget", type=int, default=2,
+                      help="RETRY_BUDGET of the runner (default: 2)")
+    parser.add_argument("--cube-points", type=int, default=40,
+                      help="Points per axis of the fake cubes (default: 40)")
+    parser.add_argument("--seed", type=int, default=0,
+                      help="Seed for the stubs' delays and failures (default: 0)")
+    parser.add_argument("--work-dir",
+                      help="Directory for all files (kept; default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true",
+                      help="Keep the temporary work directory")
+    parser.add_argument("--report",
+                      help="Also write the report as JSON to this file")
+
+    args = parser.parse_args()
+
+    if args.work_dir:
+        work_dir = Path(args.work_dir).resolve()
+        if work_dir.exists() and any(work_dir.iterdir()):
+            print(f"Error: Work directory '{work_dir}' is not empty!")
+            sys.exit(1)
+        work_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        work_dir = Path(tempfile.mkdtemp(prefix="gjc_load_"))
+
+    try:
+        report = load_test(work_dir, args)
+        print_report(report)
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport written to {args.report}")
+    finally:
+        if args.work_dir or args.keep:
+            print(f"\nFiles kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
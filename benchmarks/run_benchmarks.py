@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Time and memory-profile the project's parsers and input generators.
+
+This script:
+1. Generates synthetic ADMP logs, XYZ trajectories, .fchk files and molecule
+   inputs at the requested scale (atoms x steps x basis functions)
+2. Runs every registered parser/generator against them, recording the best
+   wall time over several repeats and the peak traced memory
+3. Compares the results with stored baselines and flags slowdowns
+
+Usage:
+    python run_benchmarks.py --atoms 20 --steps 2000 --basis 200
+    python run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from run_pipeline import ADMP_DIR, ORBITAL_DIR, load_stage_module
+import job_performance
+import results_catalog
+import synthetic_data
+
+DEFAULT_BASELINE_FILE = BENCH_DIR / "baselines.json"
+
+def build_fixtures(work_dir, atoms, steps, basis):
+    """Write all synthetic inputs used by the benchmarks."""
+    work_dir = Path(work_dir)
+    tree_dir = work_dir / "results"
+    return {
+        'log': synthetic_data.write_admp_log(work_dir / "SYN_ADMP_800K.log", atoms, steps, basis),
+        'xyz': synthetic_data.write_xyz_trajectory(work_dir / "SYN_ADMP_800K.xyz", atoms, steps),
+        'fchk': synthetic_data.write_fchk(work_dir / "SYN_800K_step0000.fchk", atoms, basis),
+        'gjf': synthetic_data.write_molecule_gjf(work_dir / "SYN.gjf", atoms),
+        'cube': synthetic_data.write_cube(work_dir / "SYN_800K_step0000_density.cube", atoms, 60),
+        'tree': tree_dir,
+        'tree_files': synthetic_data.write_results_tree(tree_dir, n_atoms=atoms, n_basis=basis),
+        'out': work_dir / "out",
+    }
+
+def fresh_dir(path):
+    """Empty an output directory so generators do not skip existing files."""
+    shutil.rmtree(path, ignore_errors=True)
+    Path(path).mkdir(parents=True)
+    return path
+
+def registered_benchmarks():
+    """
+    Return (name, setup) pairs.
+
+    Each setup takes the fixtures dict and returns a zero-argument callable
+    that performs one run of the code under test.
+    """
+    get_xyz = load_stage_module(ADMP_DIR, "get_xyz.py")
+    admp = load_stage_module(ADMP_DIR, "generate_admp_inputs.py")
+    orbitals = load_stage_module(ORBITAL_DIR, "generate_orbitals_from_xyz.py")
+    cubes = load_stage_module(ORBITAL_DIR, "generate_inputs.py")
+    cube_analytics = load_stage_module(ORBITAL_DIR, "cube_analytics.py")
+
+    return [
+        ("get_xyz.process_log_file",
+         lambda fx: lambda: get_xyz.process_log_file(str(fx['log']))),
+        ("job_performance.parse_gaussian_log",
+         lambda fx: lambda: job_performance.parse_gaussian_log(fx['log'])),
+        ("generate_orbitals_from_xyz.read_xyz_frames",
+         lambda fx: lambda: orbitals.read_xyz_frames(fx['xyz'])),
+        ("generate_orbitals_from_xyz.process_xyz_file",
+         lambda fx: lambda: orbitals.process_xyz_file(fx['xyz'], fresh_dir(fx['out']), max_frames=0)),
+        ("generate_orbitals_from_xyz.find_xyz_files",
+         lambda fx: lambda: orbitals.find_xyz_files(fx['tree'])),
+        ("generate_admp_inputs.extract_geometry",
+         lambda fx: lambda: admp.extract_geometry(fx['gjf'])),
+        ("generate_admp_inputs.create_admp_input",
+         lambda fx: lambda: admp.create_admp_input(fx['gjf'], 800, fresh_dir(fx['out']))),
+        ("cube_analytics.load_cube",
+         lambda fx: lambda: cube_analytics.load_cube(fx['cube'])),
+        ("generate_inputs.find_fchk_files",
+         lambda fx: lambda: cubes.find_fchk_files(fx['tree'])),
+        ("generate_inputs.create_slurm_script",
+         lambda fx: lambda: cubes.create_slurm_script(
+             [f for f in fx['tree_files'] if f.suffix == '.fchk'], output_dir=fresh_dir(fx['out']))),
+    ]
+
+def measure(func, repeat):
+    """Return the best wall time over `repeat` runs and the peak traced memory."""
+    best = float('inf')
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+
+        # Memory is traced in a separate run; tracing slows execution down
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return best, peak
+
+def load_baselines(baseline_file):
+    """Load stored baselines, keyed by benchmark name and scale."""
+    if Path(baseline_file).exists():
+        with open(baseline_file, 'r') as f:
+            return json.load(f)
+    return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsers and generators on synthetic data")
+    parser.add_argument("--atoms", type=int, default=20,
+                      help="Atoms per molecule (default: 20)")
+    parser.add_argument("--steps", type=int, default=2000,
+                      help="Trajectory steps (default: 2000)")
+    parser.add_argument("--basis", type=int, default=200,
+                      help="Basis functions (default: 200)")
+    parser.add_argument("--repeat", type=int, default=3,
+                      help="Timed repeats per benchmark (default: 3)")
+    parser.add_argument("--filter", default="",
+                      help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--baseline-file", default=str(DEFAULT_BASELINE_FILE),
+                      help="Where baselines are stored (default: benchmarks/baselines.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                      help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.3,
+                      help="Flag runs slower than baseline times this factor (default: 1.3)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                      help="Ignore slowdowns smaller than this many seconds (default: 0.005)")
+
+    args = parser.parse_args()
+
+    scale = f"{args.atoms}x{args.steps}x{args.basis}"
+    baselines = load_baselines(args.baseline_file)
+    regressions = 0
+
+    with tempfile.TemporaryDirectory(prefix="gjc_bench_") as work_dir:
+        print(f"Generating synthetic fixtures (atoms x steps x basis = {scale})...")
+        fixtures = build_fixtures(work_dir, args.atoms, args.steps, args.basis)
+
+        # Some generators write relative to the current directory, and
+        # catalog lookups of the fixtures stay out of the real catalog
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        os.environ[results_catalog.DB_ENV] = os.path.join(work_dir, "results_catalog.db")
+        try:
+            print(f"\n{'benchmark':<48}{'time (s)':>10}{'peak MB':>10}{'baseline':>10}  status")
+            for name, setup in registered_benchmarks():
+                if args.filter not in name:
+                    continue
+                elapsed, peak = measure(setup(fixtures), args.repeat)
+
+                key = f"{name}@{scale}"
+                baseline = baselines.get(key)
+                if baseline is None:
+                    status = "new"
+                elif (elapsed > baseline['time'] * args.tolerance
+                      and elapsed - baseline['time'] > args.min_delta):
+                    status = f"SLOWER x{elapsed / baseline['time']:.2f}"
+                    regressions += 1
+                else:
+                    status = "ok"
+
+                baseline_text = f"{baseline['time']:.4f}" if baseline else "-"
+                print(f"{name:<48}{elapsed:>10.4f}{peak / 1e6:>10.2f}{baseline_text:>10}  {status}")
+
+                if args.update_baseline:
+                    baselines[key] = {'time': elapsed, 'peak_bytes': peak}
+        finally:
+            os.chdir(cwd)
+
+    if args.update_baseline:
+        with open(args.baseline_file, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaselines saved to {args.baseline_file}")
+
+    if regressions:
+        print(f"\nWARNING: {regressions} benchmarks slower than baseline")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
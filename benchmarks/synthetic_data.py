@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic Gaussian outputs at configurable scale.
+
+The files follow the layout of real Gaussian 16 output closely enough for the
+project's parsers: ADMP .log files with "Input orientation" blocks and step
+summaries, XYZ trajectories as written by get_xyz.py, formatted checkpoint
+(.fchk) files with MO coefficients, cube files, and molecule .gjf inputs.
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+# Element symbols and atomic numbers cycled through for synthetic molecules
+ELEMENTS = [("C", 6), ("F", 9), ("O", 8), ("S", 16), ("H", 1), ("N", 7)]
+
+SEPARATOR = " " + "-" * 69 + "\n"
+
+def synthetic_molecule(n_atoms, seed=0):
+    """Return a list of (symbol, atomic number, x, y, z) for a random molecule."""
+    rng = random.Random(seed)
+    atoms = []
+    for i in range(n_atoms):
+        symbol, number = ELEMENTS[i % len(ELEMENTS)]
+        atoms.append((symbol, number, rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(-3, 3)))
+    return atoms
+
+def trajectory(atoms, n_steps, seed=0, amplitude=0.01):
+    """Yield per-step coordinate lists following a small random walk."""
+    rng = random.Random(seed)
+    coords = [[x, y, z] for _, _, x, y, z in atoms]
+    for _ in range(n_steps):
+        yield [list(c) for c in coords]
+        for c in coords:
+            c[0] += rng.gauss(0, amplitude)
+            c[1] += rng.gauss(0, amplitude)
+            c[2] += rng.gauss(0, amplitude)
+
+def write_admp_log(path, n_atoms, n_steps, n_basis=60, seed=0):
+    """Write an ADMP log with one orientation block and step summary per step."""
+    atoms = synthetic_molecule(n_atoms, seed)
+    rng = random.Random(seed + 1)
+    etot = -312.8959809
+
+    with open(path, 'w') as f:
+        f.write(" Entering Gaussian System, Link 0=g16\n")
+        f.write(" %chk=synthetic.chk\n %mem=8GB\n %nprocshared=8\n")
+        f.write(" Will use up to    8 processors via shared memory.\n")
+        f.write(" ---------------------------------------------------\n")
+        f.write(" # B3LYP/6-31G(d) ADMP int=ultrafine Temperature=800\n")
+        f.write(" ---------------------------------------------------\n")
+
+        for step, coords in enumerate(trajectory(atoms, n_steps, seed)):
+            f.write("                          Input orientation:                          \n")
+            f.write(SEPARATOR)
+            f.write(" Center     Atomic      Atomic             Coordinates (Angstroms)\n")
+            f.write(" Number     Number       Type             X           Y           Z\n")
+            f.write(SEPARATOR)
+            for i, ((_, number, *_), (x, y, z)) in enumerate(zip(atoms, coords)):
+                f.write(f" {i + 1:6d} {number:10d} {0:11d} {x:15.6f}{y:12.6f}{z:12.6f}\n")
+            f.write(SEPARATOR)
+            f.write(f" {n_basis:5d} basis functions,   {2 * n_basis:4d} primitive gaussians\n")
+            f.write(f" NAtoms= {n_atoms:4d} NActive= {n_atoms:4d} NUniq= {n_atoms:4d}\n")
+            f.write(f" NBasis= {n_basis:5d} RedAO= T EigKep=  4.33D-03  NBF= {n_basis:5d}\n")
+            epot = -312.99 + rng.gauss(0, 0.002)
+            f.write(f" SCF Done:  E(RB3LYP) =  {epot:.9f}     A.U. after {rng.randint(1, 12):4d} cycles\n")
+            for i in range(n_atoms):
+                f.write(f" I= {i + 1:4d} X=   {rng.gauss(0, 1):.12E} Y=   {rng.gauss(0, 1):.12E}\n")
+            ekin = etot - epot
+            f.write(f"\n Summary information for step {step:6d}\n")
+            f.write(f" Time (fs) {step * 0.1:12.6f}\n")
+            f.write(f" EKinC      = {ekin:14.7f}; EKinPA = {0.0:14.7f}; EKinPB = {0.0:14.7f}\n")
+            f.write(f" EKin       = {ekin:14.7f}; EPot   = {epot:14.7f}; ETot   = {etot:14.7f}\n")
+            f.write(f" ETot-EKinP = {etot:14.7f}\n")
+            f.write(" TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ-TRJ\n")
+
+        f.write(" Job cpu time:       0 days  0 hours  4 minutes 12.2 seconds.\n")
+        f.write(" Elapsed time:       0 days  0 hours  1 minutes 16.8 seconds.\n")
+        f.write(" Normal termination of Gaussian 16 at Wed Mar 19 16:19:07 2025.\n")
+    return path
+
+def write_xyz_trajectory(path, n_atoms, n_steps, seed=0):
+    """Write a multi-frame XYZ trajectory in the format produced by get_xyz.py."""
+    atoms = synthetic_molecule(n_atoms, seed)
+    with open(path, 'w') as f:
+        for step, coords in enumerate(trajectory(atoms, n_steps, seed)):
+            f.write(f"{n_atoms}\nTime step {step}\n")
+            for (symbol, *_), (x, y, z) in zip(atoms, coords):
+                f.write(f"{symbol} {x:.6f} {y:.6f} {z:.6f}\n")
+    return path
+
+def write_fchk_array(f, label, kind, values):
+    """Write one array section of a formatted checkpoint file."""
+    f.write(f"{label:<43}{kind}   N={len(values):12d}\n")
+    per_line = 6 if kind == "I" else 5
+    for i in range(0, len(values), per_line):
+        chunk = values[i:i + per_line]
+        if kind == "I":
+            f.write("".join(f"{v:12d}" for v in chunk) + "\n")
+        else:
+            f.write("".join(f"{v:16.8E}" for v in chunk) + "\n")
+
+def write_fchk(path, n_atoms, n_basis, seed=0):
+    """Write a formatted checkpoint file with square MO coefficients."""
+    atoms = synthetic_molecule(n_atoms, seed)
+    rng = random.Random(seed)
+    n_electrons = sum(number for _, number, *_ in atoms)
+
+    with open(path, 'w') as f:
+        f.write("Synthetic frame\n")
+        f.write(f"{'SP':<10}{'RB3LYP':<60}{'6-31G(d)':<20}\n")
+        f.write(f"{'Number of atoms':<43}I{n_atoms:17d}\n")
+        f.write(f"{'Charge':<43}I{0:17d}\n")
+        f.write(f"{'Multiplicity':<43}I{1:17d}\n")
+        f.write(f"{'Number of electrons':<43}I{n_electrons:17d}\n")
+        f.write(f"{'Number of alpha electrons':<43}I{n_electrons // 2:17d}\n")
+        f.write(f"{'Number of beta electrons':<43}I{n_electrons // 2:17d}\n")
+        f.write(f"{'Number of basis functions':<43}I{n_basis:17d}\n")
+        f.write(f"{'Number of independent functions':<43}I{n_basis:17d}\n")
+        write_fchk_array(f, "Atomic numbers", "I", [number for _, number, *_ in atoms])
+        # Coordinates are stored in Bohr
+        coords = [c / 0.52917721 for _, _, x, y, z in atoms for c in (x, y, z)]
+        write_fchk_array(f, "Current cartesian coordinates", "R", coords)
+        f.write(f"{'SCF Energy':<43}R     {-312.94:22.15E}\n")
+        energies = sorted(rng.uniform(-25, 2) for _ in range(n_basis))
+        write_fchk_array(f, "Alpha Orbital Energies", "R", energies)
+        write_fchk_array(f, "Alpha MO coefficients", "R",
+                         [rng.gauss(0, 0.3) for _ in range(n_basis * n_basis)])
+        write_fchk_array(f, "Total SCF Density", "R",
+                         [rng.gauss(0, 0.1) for _ in range(n_basis * (n_basis + 1) // 2)])
+    return path
+
+def write_cube(path, n_atoms, n_points, orbital=False, seed=0, shift=0.0):
+    """Write a cube file with a Gaussian blob on an n_points^3 grid (6 values per line)."""
+    atoms = synthetic_molecule(n_atoms, seed)
+    spacing = 0.2
+    origin = -spacing * (n_points - 1) / 2
+    rng = random.Random(seed)
+
+    with open(path, 'w') as f:
+        f.write(" Synthetic cube\n")
+        f.write(" SCF Total Density\n" if not orbital else " MO coefficients\n")
+        f.write(f"{-n_atoms if orbital else n_atoms:5d}{origin:12.6f}{origin:12.6f}{origin:12.6f}\n")
+        for axis in range(3):
+            vector = [0.0, 0.0, 0.0]
+            vector[axis] = spacing
+            f.write(f"{n_points:5d}{vector[0]:12.6f}{vector[1]:12.6f}{vector[2]:12.6f}\n")
+        for _, number, x, y, z in atoms:
+            f.write(f"{number:5d}{float(number):12.6f}{x:12.6f}{y:12.6f}{z:12.6f}\n")
+        if orbital:
+            f.write(f"{1:5d}{n_atoms:5d}\n")
+
+        for i in range(n_points):
+            x = origin + i * spacing - shift
+            for j in range(n_points):
+                y = origin + j * spacing
+                values = []
+                for k in range(n_points):
+                    z = origin + k * spacing
+                    r2 = x * x + y * y + z * z
+                    value = (x if orbital else 1.0) * 2.718281828 ** (-r2) + rng.gauss(0, 1e-6)
+                    values.append(value)
+                for start in range(0, n_points, 6):
+                    f.write("".join(f"{v:13.5E}" for v in values[start:start + 6]) + "\n")
+    return path
+
+def write_molecule_gjf(path, n_atoms, seed=0):
+    """Write an optimisation input like those in gaussian_projects."""
+    atoms = synthetic_molecule(n_atoms, seed)
+    with open(path, 'w') as f:
+        f.write("%mem=3GB\n%nprocshared=4\n")
+        f.write("# opt=(maxcyc=999,noeigen) freq m062x/def2tzvp geom=connectivity int=ultrafine scf=(tight,xqc)\n\n")
+        f.write(f"{Path(path).stem} optimization\n\n0 1\n")
+        for symbol, _, x, y, z in atoms:
+            f.write(f"{symbol:2s}    {x:10.6f}    {y:10.6f}    {z:10.6f}\n")
+        f.write("\n")
+        for i in range(n_atoms):
+            f.write(f"{i + 1}\n")
+        f.write("\n")
+    return path
+
+def write_results_tree(base_dir, molecules=2, temperatures=(800, 1000), frames=5,
+                       n_atoms=4, n_basis=60):
+    """
+    Write an admp_jobs/results-style tree of trajectories and frame checkpoints.
+
+    Returns the list of files written.
+    """
+    written = []
+    for m in range(molecules):
+        molecule = f"MOL{m}"
+        for temp in temperatures:
+            temp_dir = Path(base_dir) / molecule / f"{temp}K"
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            written.append(write_xyz_trajectory(temp_dir / f"{molecule}_ADMP_{temp}K.xyz",
+                                                n_atoms, frames, seed=m))
+            for step in range(frames):
+                written.append(write_fchk(temp_dir / f"{molecule}_{temp}K_step{step:04d}.fchk",
+                                          n_atoms, n_basis, seed=step))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic Gaussian fixtures")
+    parser.add_argument("--output-dir", default="./synthetic",
+                      help="Directory for the generated files")
+    parser.add_argument("--atoms", type=int, default=20,
+                      help="Number of atoms (default: 20)")
+    parser.add_argument("--steps", type=int, default=2000,
+                      help="Number of trajectory steps (default: 2000)")
+    parser.add_argument("--basis", type=int, default=200,
+                      help="Number of basis functions (default: 200)")
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for path in [
+        write_admp_log(output_dir / "SYN_ADMP_800K.log", args.atoms, args.steps, args.basis),
+        write_xyz_trajectory(output_dir / "SYN_ADMP_800K.xyz", args.atoms, args.steps),
+        write_fchk(output_dir / "SYN_800K_step0000.fchk", args.atoms, args.basis),
+        write_molecule_gjf(output_dir / "SYN.gjf", args.atoms),
+    ]:
+        print(f"Created {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Classify failed Gaussian jobs and prepare automatic retries.
+
+This script:
+1. Classifies a Gaussian log as normal, scf (SCF non-convergence), link9999
+   (optimisation or IRC step limit), memory, walltime (killed before any
+   termination message), bad_input, diverged (aborted by admp_watchdog.py) or
+   unknown
+2. Maps each failure class to a retry policy that rewrites the input:
+   scf adds scf=xqc, memory doubles %mem, link9999 and walltime continue from
+   the checkpoint, unknown reruns unchanged; bad_input and diverged are never
+   retried
+3. Reports failure classes for whole result directories
+
+The runners call "retry" after a failed attempt and rerun the input while the
+exit status is 0 and their retry budget lasts. When SLURM signals the coming
+time limit, they stop g16, call "retry --walltime" and requeue the job, so the
+walltime policy continues the run in the next allocation; attempts are
+counted in a .retries file next to the results, across allocations.
+
+Usage:
+    python gaussian_failures.py classify generate_orbitals_from_ADMP/orbital_results
+    python gaussian_failures.py retry CF2O_800K_step0000.gjf CF2O_800K_step0000.log
+    python gaussian_failures.py retry --walltime CF2O_ADMP_800K.gjf CF2O_ADMP_800K.log
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+from results_catalog import find_artifacts
+
+# Failure messages appear at the end of the log
+TAIL_BYTES = 256 * 1024
+
+MEMORY_MARKERS = ("galloc:  could not allocate memory", "galloc: could not allocate memory",
+                  "Out-of-memory error", "not enough memory", "Insufficient memory",
+                  "MemAlloc failed")
+SCF_MARKERS = ("Convergence failure -- run terminated", ">>>>>>>>>> Convergence criterion not met")
+BAD_INPUT_MARKERS = ("QPErr --- A SYNTAX ERROR WAS DETECTED", "End of file in ZSymb",
+                     "Unrecognized atomic symbol", "Atomic number out of range",
+                     "The combination of multiplicity", "Illegal IType or MSType")
+LINK_PATTERN = re.compile(r'Error termination via Lnk1e in \S*/l(\d+)\.exe')
+
+RETRY_POLICIES = {
+    'scf': "add scf=xqc",
+    'memory': "double %mem",
+    'link9999': "continue from the checkpoint",
+    'walltime': "continue from the checkpoint",
+    'unknown': "rerun unchanged",
+}
+
+def read_tail(path, size=TAIL_BYTES):
+    """Return the last `size` bytes of a file as text."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - size))
+        return f.read().decode('utf-8', errors='replace')
+
+def classify_log(log_file):
+    """Return the failure class of a Gaussian log ("normal" when it succeeded)."""
+    log_file = Path(log_file)
+    if Path(f"{log_file}.watchdog").exists():
+        return "diverged"
+    if not log_file.exists() or log_file.stat().st_size == 0:
+        return "bad_input"
+
+    tail = read_tail(log_file)
+    if "Error termination" not in tail:
+        if "Normal termination" in tail:
+            return "normal"
+        # Killed before Gaussian could report anything
+        return "walltime"
+
+    if any(marker in tail for marker in MEMORY_MARKERS):
+        return "memory"
+    if any(marker in tail for marker in SCF_MARKERS):
+        return "scf"
+    if any(marker in tail for marker in BAD_INPUT_MARKERS):
+        return "bad_input"
+
+    match = LINK_PATTERN.findall(tail)
+    link = match[-1] if match else None
+    if link == "9999":
+        return "link9999"
+    if link == "502":
+        return "scf"
+    if link in ("1", "101", "202"):
+        return "bad_input"
+    return "unknown"
+
+def read_gjf(path):
+    """Split a Gaussian input into Link 0 lines, route, and the blank-line separated sections after it."""
+    with open(path, 'r') as f:
+        lines = f.read().split('\n')
+
+    link0 = []
+    i = 0
+    while i < len(lines) and lines[i].startswith('%'):
+        link0.append(lines[i])
+        i += 1
+
+    route = []
+    while i < len(lines) and lines[i].strip():
+        route.append(lines[i].strip())
+        i += 1
+
+    sections = []
+    current = []
+    for line in lines[i + 1:]:
+        if line.strip():
+            current.append(line)
+        elif current:
+            sections.append(current)
+            current = []
+    if current:
+        sections.append(current)
+
+    return link0, " ".join(route), sections
+
+def write_gjf(path, link0, route, sections):
+    """Write a Gaussian input from the parts returned by read_gjf."""
+    with open(path, 'w') as f:
+        for line in link0:
+            f.write(f"{line}\n")
+        f.write(f"{route}\n\n")
+        for section in sections:
+            f.write("\n".join(section) + "\n\n")
+
+def set_route_option(route, keyword, option):
+    """Add an option to a route keyword, e.g. ("scf", "xqc") in "scf=(tight)" -> "scf=(tight,xqc)"."""
+    pattern = re.compile(rf'\b{keyword}(?:=\(([^)]*)\)|=([^\s(]+)|\(([^)]*)\))?(?=\s|$)', re.IGNORECASE)
+    match = pattern.search(route)
+    if not match:
+        return f"{route} {keyword}={option}"
+
+    existing = next((g for g in match.groups() if g), "")
+    options = [o for o in existing.split(',') if o]
+    if option.lower() not in (o.lower() for o in options):
+        options.append(option)
+    if match.group(3) is not None:
+        # Keep the keyword(options) form, e.g. ADMP(MaxPoints=500,Restart)
+        value = f"({','.join(options)})"
+    else:
+        value = "=" + (options[0] if len(options) == 1 else f"({','.join(options)})")
+    return route[:match.start()] + f"{match.group(0).split('=')[0].split('(')[0]}{value}" + route[match.end():]
+
+def remove_route_keyword(route, keyword):
+    """Remove a keyword and its options from a route."""
+    pattern = re.compile(rf'\s*\b{keyword}(?:=\([^)]*\)|=[^\s(]+|\([^)]*\))?(?=\s|$)', re.IGNORECASE)
+    return pattern.sub("", route)
+
+def scale_memory(link0, factor=2, max_gb=64):
+    """Multiply %mem, capped at max_gb. Returns the new Link 0 lines, or None when already at the cap."""
+    updated = []
+    changed = False
+    for line in link0:
+        match = re.match(r'%mem=(\d+)\s*(GB|MB|KB)?', line, re.IGNORECASE)
+        if match:
+            value = int(match.group(1))
+            unit = (match.group(2) or "MB").upper()
+            gb = value / {'GB': 1, 'MB': 1024, 'KB': 1024 ** 2}[unit]
+            new_gb = min(max_gb, max(1, int(round(gb * factor))))
+            if new_gb > gb:
+                line = f"%mem={new_gb}GB"
+                changed = True
+        updated.append(line)
+    return updated if changed else None
+
+def restart_from_checkpoint(route, sections, chk_exists):
+    """Rewrite a route to continue from the job's own checkpoint."""
+    if not chk_exists:
+        return route, sections
+
+    match = re.search(r'\bADMP(?:\(([^)]*)\))?(?=\s|$)', route, re.IGNORECASE)
+    if match:
+        # ADMP continues the trajectory; geometry and velocities come from the checkpoint
+        options = [o for o in (match.group(1) or "").split(',')
+                   if o and o.lower() not in ("restart", "readvelocity")]
+        admp = f"ADMP({','.join(options + ['Restart'])})"
+        return route[:match.start()] + admp + route[match.end():], []
+
+    route = remove_route_keyword(route, "geom")
+    route = remove_route_keyword(route, "guess")
+    # Title, charge, multiplicity and geometry are read from the checkpoint
+    return f"{route} geom=allcheck guess=read", []
+
+def prepare_retry(gjf_file, log_file, max_mem_gb=64, failure=None):
+    """
+    Classify a failed run and rewrite its input according to the retry policy.
+
+    `failure` overrides the class read from the log, e.g. "walltime" for a run
+    the caller stopped at the time limit. Returns (failure class, description
+    of the change, or None when the failure should not be retried).
+    """
+    failure = failure or classify_log(log_file)
+    if failure not in RETRY_POLICIES:
+        return failure, None
+
+    link0, route, sections = read_gjf(gjf_file)
+    chk = next((line.split('=', 1)[1] for line in link0 if line.lower().startswith('%chk=')), None)
+    chk_exists = chk is not None and (Path(gjf_file).parent / chk).exists()
+
+    if failure == "scf":
+        updated = set_route_option(route, "scf", "xqc")
+        if updated == route:
+            # Already using the quadratic fallback
+            return failure, None
+        route = updated
+    elif failure == "memory":
+        link0 = scale_memory(link0, max_gb=max_mem_gb)
+        if link0 is None:
+            return failure, None
+    elif failure in ("link9999", "walltime"):
+        route, sections = restart_from_checkpoint(route, sections, chk_exists)
+
+    write_gjf(gjf_file, link0, route, sections)
+    return failure, RETRY_POLICIES[failure]
+
+def classify_directories(dirs):
+    """Return {failure class: [log files]} for all logs under the given directories."""
+    report = {}
+    for directory in dirs:
+        if not Path(directory).exists():
+            continue
+        for log_file in find_artifacts(directory, ["log"]):
+            report.setdefault(classify_log(log_file), []).append(log_file)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify Gaussian failures and prepare retries")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    classify_parser = subparsers.add_parser("classify", help="Report failure classes of all logs")
+    classify_parser.add_argument("dirs", nargs="+", help="Result directories")
+    classify_parser.add_argument("--list", action="store_true",
+                               help="List the failed logs of each class")
+
+    retry_parser = subparsers.add_parser(
+        "retry", help="Rewrite a failed input for another attempt (exit 0 if it should be rerun)")
+    retry_parser.add_argument("gjf_file", help="Gaussian input of the failed run")
+    retry_parser.add_argument("log_file", help="Gaussian log of the failed run")
+    retry_parser.add_argument("--max-mem-gb", type=int, default=64,
+                            help="Upper limit when raising %%mem (default: 64)")
+    retry_parser.add_argument("--walltime", action="store_true",
+                            help="The run was stopped at the time limit, whatever its log shows")
+
+    args = parser.parse_args()
+
+    if args.command == "retry":
+        failure, change = prepare_retry(args.gjf_file, args.log_file, args.max_mem_gb,
+                                        "walltime" if args.walltime else None)
+        if change is None:
+            print(f"Failure class: {failure} (not retried)")
+            sys.exit(1)
+        print(f"Failure class: {failure}; retrying: {change}")
+        return
+
+    report = classify_directories(args.dirs)
+    print(f"{'class':<12}{'logs':>8}  retry policy")
+    for failure, logs in sorted(report.items(), key=lambda item: -len(item[1])):
+        policy = RETRY_POLICIES.get(failure, "-" if failure == "normal" else "manual triage")
+        print(f"{failure:<12}{len(logs):>8}  {policy}")
+        if args.list and failure != "normal":
+            for log_file in logs:
+                print(f"    {log_file}")
+
+if __name__ == "__main__":
+    main()
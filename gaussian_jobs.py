@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the stage scripts and tools of the workflow.
+
+Each subcommand runs one existing script with the remaining arguments:
+1. Nothing but the chosen script is imported, so quick cluster-side calls
+   such as "metrics show" or "catalog" start without loading NumPy or RDKit
+2. Stage scripts run from their stage directory, as their READMEs describe,
+   so their default paths work from anywhere. Relative paths given to a
+   stage command stay relative to the current directory: arguments that
+   name an existing path, or a new one such as ./out or results/run2 below
+   an existing directory, are made absolute before the change of
+   directory. Tools of the top-level directory run from the current
+   directory
+3. Options for every command can be kept in a shared JSON config file
+   (--config, $GAUSSIAN_JOBS_CONFIG or gaussian_jobs.json next to this
+   script), one section per subcommand:
+
+       {
+         "admp": {"temperatures": [800, 1000], "max_points": 1000, "segments": 4},
+         "orbitals": {"batch_size": 5, "align": true, "quiet": true},
+         "pipeline": {"temperatures": [800, 1000], "jobs": 8}
+       }
+
+   Keys become options (max_points -> --max-points; true adds the flag, a
+   list adds its items) and are placed before the command line's own
+   arguments, which therefore take precedence. Only options of a script's
+   top-level parser can be set this way.
+
+Usage:
+    python gaussian_jobs.py list
+    python gaussian_jobs.py admp --temperatures 800 1000
+    python gaussian_jobs.py orbitals --batch-size 5 --quiet
+    python gaussian_jobs.py metrics show
+    python gaussian_jobs.py catalog generate_orbitals_from_ADMP/orbital_results --kind fchk
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+CONFIG_NAME = "gaussian_jobs.json"
+
+# Subcommand: (script relative to ROOT, run from the script's directory, description)
+COMMANDS = {
+    'pipeline': ("run_pipeline.py", False, "Incrementally rebuild all stage inputs"),
+    'geom': ("geom_optimise_guassian/generate_inputs.py", True, "Molecule inputs from SMILES (RDKit)"),
+    'admp': ("ADMP_decomposition_gaussian/generate_admp_inputs.py", True, "ADMP inputs per molecule and temperature"),
+    'xyz': ("ADMP_decomposition_gaussian/get_xyz.py", True, "XYZ trajectories from finished ADMP logs"),
+    'kinetics': ("ADMP_decomposition_gaussian/decomposition_kinetics.py", True, "Decomposition rate constants"),
+    'orbitals': ("generate_orbitals_from_ADMP/generate_orbitals_from_xyz.py", True, "Single-point inputs for trajectory frames"),
+    'cubes': ("generate_orbitals_from_ADMP/generate_inputs.py", True, "Cube generation job from .fchk files"),
+    'align': ("generate_orbitals_from_ADMP/align_trajectory.py", True, "Align a trajectory to a fixed frame"),
+    'track': ("generate_orbitals_from_ADMP/track_orbitals.py", True, "Track orbital identities across frames"),
+    'split': ("generate_orbitals_from_ADMP/split_batch_log.py", True, "Split a batched frame log"),
+    'esp': ("generate_orbitals_from_ADMP/esp_surface.py", True, "Electrostatic potential on the molecular surface"),
+    'analyze': ("generate_orbitals_from_ADMP/cube_analytics.py", True, "Descriptors from cube series"),
+    'barrier': ("barrier_energy_guassian/generate_inputs.py", True, "TS and IRC inputs per reaction"),
+    'schedule': ("barrier_energy_guassian/schedule_reaction_network.py", True, "Run the barrier workflow as a dependency graph"),
+    'thermo': ("barrier_energy_guassian/thermochemistry.py", True, "Barriers versus temperature"),
+    'metrics': ("pipeline_metrics.py", False, "Throughput metrics of running batches"),
+    'catalog': ("results_catalog.py", False, "Query the results catalog"),
+    'perf': ("job_performance.py", False, "Job performance database"),
+    'failures': ("gaussian_failures.py", False, "Classify failed Gaussian jobs"),
+    'walltime': ("walltime_model.py", False, "Predict SLURM walltimes"),
+    'retention': ("artifact_retention.py", False, "Compress or prune old artifacts"),
+}
+
+def usage():
+    lines = ["usage: gaussian_jobs.py [--config FILE] COMMAND [ARGS ...]", "", "commands:"]
+    lines += [f"  {name:<10}{description}" for name, (_, _, description) in COMMANDS.items()]
+    lines += ["", "Run 'gaussian_jobs.py COMMAND --help' for the options of a command."]
+    return "\n".join(lines)
+
+def config_path(path=None):
+    """Config file to use, or None when there is none."""
+    if path:
+        return Path(path)
+    if os.environ.get("GAUSSIAN_JOBS_CONFIG"):
+        return Path(os.environ["GAUSSIAN_JOBS_CONFIG"])
+    default = ROOT / CONFIG_NAME
+    return default if default.exists() else None
+
+def config_arguments(section):
+    """Command-line options for one section of the config file."""
+    arguments = []
+    for key, value in section.items():
+        flag = f"--{key.replace('_', '-')}"
+        if value is True:
+            arguments.append(flag)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, list):
+            arguments += [flag] + [str(item) for item in value]
+        else:
+            arguments.append(f"{flag}={value}")
+    return arguments
+
+def absolute_paths(arguments):
+    """Make path-like arguments (and --option=path values) absolute against the current directory."""
+    def absolute(value):
+        if value.startswith('-') or os.path.isabs(value):
+            return value
+        # "B3LYP/6-31G(d)" is not a path; "out/new" is when "out" exists
+        if os.path.exists(value) or (os.sep in value and os.path.isdir(os.path.dirname(value))):
+            return os.path.abspath(value)
+        return value
+
+    converted = []
+    for argument in arguments:
+        if argument.startswith('--') and '=' in argument:
+            option, value = argument.split('=', 1)
+            converted.append(f"{option}={absolute(value)}")
+        else:
+            converted.append(absolute(argument))
+    return converted
+
+def run_command(name, arguments, config=None):
+    """Run a subcommand's script in this process, as if it had been started directly."""
+    script, in_stage_dir, _ = COMMANDS[name]
+    script = ROOT / script
+    if config:
+        arguments = config_arguments(config.get(name, {})) + arguments
+
+    # Imports of sibling modules rely on the script's directory being on the path
+    sys.path.insert(0, str(script.parent))
+    if in_stage_dir:
+        arguments = absolute_paths(arguments)
+        os.chdir(script.parent)
+    sys.argv = [str(script)] + arguments
+
+    import runpy
+    runpy.run_path(str(script), run_name="__main__")
+
+def main():
+    arguments = sys.argv[1:]
+    config_file = None
+    if arguments and arguments[0].startswith("--config"):
+        option = arguments.pop(0)
+        if "=" in option:
+            config_file = option.split("=", 1)[1]
+        elif arguments:
+            config_file = arguments.pop(0)
+
+    if not arguments or arguments[0] in ("-h", "--help"):
+        print(usage())
+        return
+    if arguments[0] == "list":
+        for name, (script, _, _) in COMMANDS.items():
+            print(f"{name:<10}{script}")
+        return
+    if arguments[0] not in COMMANDS:
+        print(f"Error: Unknown command '{arguments[0]}'\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+
+    config = None
+    config_file = config_path(config_file)
+    if config_file:
+        if not config_file.exists():
+            print(f"Error: Config file '{config_file}' not found!", file=sys.stderr)
+            sys.exit(1)
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+
+    run_command(arguments[0], arguments[1:], config)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Align ADMP trajectory frames to a fixed molecular frame.
+
+This script:
+1. Removes the centre-of-mass translation of every frame
+2. Removes the rotation against a reference frame (the first one) with the
+   Kabsch algorithm, solved for all frames at once with a batched SVD
+3. Computes one bounding box per trajectory, so the cubes of every frame can
+   be generated on an identical grid (cubegen reads the grid from a spec file)
+
+Frames aligned this way must be run with nosymm, otherwise Gaussian moves them
+back into its standard orientation.
+
+Usage:
+    python align_trajectory.py CF2O_ADMP_800K.xyz aligned.xyz --grid grid.txt
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Atomic masses (amu) used for the centre of mass
+ATOMIC_MASSES = {
+    'H': 1.00794, 'He': 4.002602, 'Li': 6.941, 'Be': 9.012182, 'B': 10.811,
+    'C': 12.0107, 'N': 14.0067, 'O': 15.9994, 'F': 18.9984032, 'Ne': 20.1797,
+    'Na': 22.98976928, 'Mg': 24.305, 'Al': 26.9815386, 'Si': 28.0855, 'P': 30.973762,
+    'S': 32.065, 'Cl': 35.453, 'Ar': 39.948, 'K': 39.0983, 'Ca': 40.078,
+    'Br': 79.904, 'I': 126.90447,
+}
+
+def frames_to_arrays(frames):
+    """Return (symbols, coordinates shaped (frames, atoms, 3)) from read_xyz_frames output."""
+    symbols = [atom[0] for atom in frames[0][1]]
+    coords = np.array([[atom[1:4] for atom in atoms] for _, atoms in frames], dtype=float)
+    return symbols, coords
+
+def arrays_to_frames(frames, symbols, coords):
+    """Replace the coordinates of read_xyz_frames output, keeping the comment lines."""
+    return [(timestep, [(symbol, *map(float, xyz)) for symbol, xyz in zip(symbols, frame)])
+            for (timestep, _), frame in zip(frames, coords)]
+
+def kabsch_align(symbols, coords, reference=0):
+    """
+    Remove translation and rotation of all frames relative to one frame.
+
+    The reference frame is centred on its centre of mass; every frame is then
+    centred and rotated onto it by the mass-weighted Kabsch rotation.
+    Returns the aligned coordinates (frames, atoms, 3).
+    """
+    masses = np.array([ATOMIC_MASSES.get(s.capitalize(), 12.0) for s in symbols])
+    weights = masses / masses.sum()
+
+    centred = coords - np.einsum('a,fax->fx', weights, coords)[:, None, :]
+    target = centred[reference]
+
+    # Covariance per frame, then all rotations from one batched SVD
+    covariance = np.einsum('a,fax,ay->fxy', weights, centred, target)
+    u, _, vt = np.linalg.svd(covariance)
+    # Flip the last singular vector where needed to exclude reflections
+    sign = np.sign(np.linalg.det(u @ vt))
+    sign[sign == 0] = 1.0
+    u[:, :, -1] *= sign[:, None]
+    rotation = u @ vt
+
+    return centred @ rotation
+
+def bounding_box(coords, margin=4.0, spacing=0.15):
+    """
+    Return (origin, points per axis) of a box enclosing all frames.
+
+    margin and spacing are in Angstrom; the box extends margin beyond the
+    outermost atom position of the whole trajectory along each axis.
+    """
+    lower = coords.reshape(-1, 3).min(axis=0) - margin
+    upper = coords.reshape(-1, 3).max(axis=0) + margin
+    shape = np.ceil((upper - lower) / spacing).astype(int) + 1
+    return lower, shape
+
+def write_grid_spec(grid_file, origin, shape, spacing):
+    """
+    Write a cubegen grid specification (read from stdin when npts is -1).
+
+    Positive point counts mean the origin and steps are in Angstrom.
+    """
+    with open(grid_file, 'w') as f:
+        f.write(f"0 {origin[0]:.6f} {origin[1]:.6f} {origin[2]:.6f}\n")
+        for axis in range(3):
+            step = [0.0, 0.0, 0.0]
+            step[axis] = spacing
+            f.write(f"{shape[axis]} {step[0]:.6f} {step[1]:.6f} {step[2]:.6f}\n")
+    return grid_file
+
+def align_frames(frames, margin=4.0, spacing=0.15):
+    """Align read_xyz_frames output; return (aligned frames, grid origin, grid shape)."""
+    symbols, coords = frames_to_arrays(frames)
+    aligned = kabsch_align(symbols, coords)
+    origin, shape = bounding_box(aligned, margin, spacing)
+    return arrays_to_frames(frames, symbols, aligned), origin, shape
+
+def main():
+    parser = argparse.ArgumentParser(description="Align trajectory frames and compute a common cube grid")
+    parser.add_argument("xyz_file", help="XYZ trajectory")
+    parser.add_argument("output", help="Aligned XYZ trajectory")
+    parser.add_argument("--grid", help="Also write a cubegen grid specification here")
+    parser.add_argument("--margin", type=float, default=4.0,
+                      help="Grid margin around the atoms in Angstrom (default: 4.0)")
+    parser.add_argument("--spacing", type=float, default=0.15,
+                      help="Grid spacing in Angstrom (default: 0.15)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.xyz_file):
+        print(f"Error: Trajectory '{args.xyz_file}' not found!")
+        sys.exit(1)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from generate_orbitals_from_xyz import read_xyz_frames
+
+    frames = read_xyz_frames(args.xyz_file)
+    if not frames:
+        sys.exit(1)
+    aligned, origin, shape = align_frames(frames, args.margin, args.spacing)
+
+    with open(args.output, 'w') as f:
+        for timestep, atoms in aligned:
+            f.write(f"{len(atoms)}\n{timestep}\n")
+            for symbol, x, y, z in atoms:
+                f.write(f"{symbol:2s}  {x:12.6f}  {y:12.6f}  {z:12.6f}\n")
+    print(f"Aligned {len(aligned)} frames -> {args.output}")
+
+    if args.grid:
+        write_grid_spec(args.grid, origin, shape, args.spacing)
+        print(f"Grid {shape[0]}x{shape[1]}x{shape[2]} -> {args.grid}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compute descriptors from series of Gaussian cube files.
+
+This script:
+1. Finds the HOMO, LUMO, density and potential cubes written by
+   submit_orbital_calculations.sh, grouped by molecule, temperature and type
+2. Streams each series in step order, holding at most two grids in memory
+   (the current frame and the previous one)
+3. Computes per-frame integrals, frame-to-frame difference densities, orbital
+   localisation (inverse participation ratio) and isosurface volumes
+4. Writes one row per cube to cube_analytics.csv
+
+Parsed grids can be cached as .npy files, which later runs memory-map instead
+of parsing the text cube again.
+
+Usage:
+    python cube_analytics.py
+    python cube_analytics.py --results-dir ./orbital_results --cache-dir ./cube_cache
+"""
+
+import argparse
+import csv
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from results_catalog import classify_artifact, find_artifacts
+
+BOHR_PER_ANGSTROM = 1.0 / 0.52917721
+
+# Default isosurface values (a.u.) per cube type
+DEFAULT_ISOVALUES = {'homo': 0.02, 'lumo': 0.02, 'density': 0.001, 'pot': 0.1}
+ORBITAL_KINDS = ('homo', 'lumo')
+
+def read_cube_header(f):
+    """
+    Read a cube header from an open file.
+
+    Returns a dict with origin (bohr), axes (3x3 voxel vectors in bohr), shape
+    and the atoms as (atomic number, x, y, z) tuples.
+    """
+    f.readline()
+    f.readline()
+    fields = f.readline().split()
+    n_atoms = int(fields[0])
+    origin = np.array(fields[1:4], dtype=float)
+
+    shape = []
+    axes = []
+    for _ in range(3):
+        fields = f.readline().split()
+        shape.append(abs(int(fields[0])))
+        # Negative counts mean Angstrom units
+        scale = BOHR_PER_ANGSTROM if int(fields[0]) < 0 else 1.0
+        axes.append(np.array(fields[1:4], dtype=float) * scale)
+
+    atoms = []
+    for _ in range(abs(n_atoms)):
+        fields = f.readline().split()
+        atoms.append((int(fields[0]), *map(float, fields[2:5])))
+
+    if n_atoms < 0:
+        # Orbital cubes list the MO indices after the atoms
+        fields = f.readline().split()
+        remaining = int(fields[0]) - (len(fields) - 1)
+        while remaining > 0:
+            remaining -= len(f.readline().split())
+
+    return {'origin': origin, 'axes': np.array(axes), 'shape': tuple(shape), 'atoms': atoms}
+
+def load_cube(cube_file, cache_dir=None):
+    """
+    Return (header, grid) for a cube file.
+
+    The values are parsed in one pass with numpy. With a cache directory the
+    grid is stored as .npy on first use and memory-mapped afterwards.
+    """
+    with open(cube_file, 'r') as f:
+        header = read_cube_header(f)
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / f"{Path(cube_file).stem}.npy"
+            if cache_file.exists() and cache_file.stat().st_mtime >= os.path.getmtime(cube_file):
+                return header, np.load(cache_file, mmap_mode='r')
+        values = np.fromfile(f, sep=' ')
+
+    n_points = int(np.prod(header['shape']))
+    # Cubes with several orbitals interleave them; the first one is used
+    per_point = len(values) // n_points
+    grid = values.reshape(*header['shape'], per_point)[..., 0] if per_point > 1 else values.reshape(header['shape'])
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        np.save(cache_file, grid.astype(np.float32))
+    return header, grid
+
+def same_grid(header_a, header_b, tolerance=1e-6):
+    """True when two cubes sample the same points, so they can be subtracted."""
+    return (header_a['shape'] == header_b['shape']
+            and np.allclose(header_a['origin'], header_b['origin'], atol=tolerance)
+            and np.allclose(header_a['axes'], header_b['axes'], atol=tolerance))
+
+def cube_descriptors(kind, header, grid, isovalue):
+    """Per-frame descriptors of one grid."""
+    voxel = abs(np.linalg.det(header['axes']))
+    grid = np.asarray(grid, dtype=np.float64)
+    row = {
+        'min': float(grid.min()),
+        'max': float(grid.max()),
+        'iso_volume_bohr3': float(np.count_nonzero(np.abs(grid) >= isovalue) * voxel),
+    }
+
+    if kind in ORBITAL_KINDS:
+        density = grid * grid
+        norm = density.sum() * voxel
+        row['integral'] = float(norm)
+        # Inverse participation ratio: large for localised orbitals
+        ipr = (density * density).sum() * voxel / norm ** 2 if norm > 0 else float('nan')
+        row['ipr_per_bohr3'] = float(ipr)
+        row['participation_volume_bohr3'] = float(1.0 / ipr) if ipr > 0 else float('nan')
+    elif kind == 'density':
+        row['integral'] = float(grid.sum() * voxel)
+
+    return row
+
+def difference_descriptor(kind, header, grid, previous_header, previous_grid):
+    """Integrated |difference| between consecutive frames on the same grid (NaN otherwise)."""
+    if previous_grid is None or not same_grid(header, previous_header):
+        return float('nan')
+    voxel = abs(np.linalg.det(header['axes']))
+    current = np.asarray(grid, dtype=np.float64)
+    previous = np.asarray(previous_grid, dtype=np.float64)
+    if kind in ORBITAL_KINDS:
+        # Orbital phases are arbitrary; compare densities
+        current, previous = current * current, previous * previous
+    return float(np.abs(current - previous).sum() * voxel)
+
+def cube_series(results_dir):
+    """Return {(molecule, temperature, kind): [(step, cube file)]} sorted by step."""
+    series = {}
+    for cube_file in find_artifacts(results_dir, ["cube"]):
+        _, step, kind = classify_artifact(cube_file.name)
+        if step is None or kind is None:
+            continue
+        key = (cube_file.parent.parent.name, cube_file.parent.name, kind)
+        series.setdefault(key, []).append((step, cube_file))
+    return {key: sorted(frames) for key, frames in sorted(series.items())}
+
+def analyse_series(key, frames, cache_dir=None, isovalues=None):
+    """Yield one descriptor row per frame, keeping only the previous grid."""
+    molecule, temperature, kind = key
+    isovalue = (isovalues or DEFAULT_ISOVALUES).get(kind, 0.02)
+    previous_header, previous_grid = None, None
+
+    for step, cube_file in frames:
+        header, grid = load_cube(cube_file, cache_dir)
+        row = {'molecule': molecule, 'temperature': temperature, 'kind': kind, 'step': step,
+               'cube': cube_file.name}
+        row.update(cube_descriptors(kind, header, grid, isovalue))
+        row['abs_difference'] = difference_descriptor(kind, header, grid, previous_header, previous_grid)
+        yield row
+        previous_header, previous_grid = header, grid
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute descriptors from cube file series")
+    parser.add_argument("--results-dir", default="./orbital_results",
+                      help="Directory with cube files (default: ./orbital_results)")
+    parser.add_argument("--cache-dir",
+                      help="Store parsed grids as .npy here and memory-map them on later runs")
+    parser.add_argument("--iso", nargs=2, action="append", metavar=("KIND", "VALUE"),
+                      help="Isosurface value for a cube type, e.g. --iso homo 0.05")
+    parser.add_argument("--output", default="cube_analytics.csv",
+                      help="Output table (default: cube_analytics.csv)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.results_dir):
+        print(f"Error: Results directory '{args.results_dir}' not found!")
+        sys.exit(1)
+
+    isovalues = dict(DEFAULT_ISOVALUES)
+    for kind, value in args.iso or []:
+        isovalues[kind] = float(value)
+
+    series = cube_series(args.results_dir)
+    if not series:
+        print(f"No cube files found in {args.results_dir}")
+        sys.exit(1)
+
+    columns = ['molecule', 'temperature', 'kind', 'step', 'cube', 'integral', 'abs_difference',
+               'ipr_per_bohr3', 'participation_volume_bohr3', 'iso_volume_bohr3', 'min', 'max']
+    count = 0
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, restval="")
+        writer.writeheader()
+        for key, frames in series.items():
+            print(f"Processing {len(frames)} {key[2]} cubes for {key[0]} at {key[1]}")
+            for row in analyse_series(key, frames, args.cache_dir, isovalues):
+                writer.writerow({k: (f"{v:.6g}" if isinstance(v, float) else v) for k, v in row.items()})
+                count += 1
+
+    print(f"Wrote descriptors for {count} cube files to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Evaluate the electrostatic potential on the molecular surface of a frame.
+
+A full Potential=scf cube evaluates the ESP on 80^3 grid points, most of them
+far from the molecule. This script instead:
+1. Reads the geometry of a frame from its formatted checkpoint (.fchk)
+2. Builds a scaled van der Waals surface: points on a Fibonacci sphere around
+   each atom, keeping only those outside every other atom's scaled sphere
+3. Evaluates the potential at those points only, with cubegen reading the
+   point list from standard input (npts = -5)
+4. Writes a compact per-frame file (<frame>_esp.npz) with the surface points,
+   the potential and the geometry
+
+Usage:
+    python esp_surface.py CF2O_800K_step0000.fchk CF2O_800K_step0000_esp.npz
+    python esp_surface.py frame.fchk frame_esp.npz --scale 1.4 1.6 --density 3.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+BOHR = 0.52917721  # Angstrom
+
+# Bondi van der Waals radii (Angstrom)
+VDW_RADII = {
+    1: 1.20, 2: 1.40, 3: 1.82, 5: 1.92, 6: 1.70, 7: 1.55, 8: 1.52, 9: 1.47, 10: 1.54,
+    11: 2.27, 12: 1.73, 14: 2.10, 15: 1.80, 16: 1.80, 17: 1.75, 18: 1.88, 19: 2.75,
+    35: 1.85, 53: 1.98,
+}
+
+def read_fchk_arrays(fchk_file, labels):
+    """Return {label: numpy array} for the requested array sections of a .fchk file."""
+    arrays = {}
+    with open(fchk_file, 'r') as f:
+        line = f.readline()
+        while line and len(arrays) < len(labels):
+            label = line[:43].strip()
+            if label in labels and "N=" in line:
+                kind = line[43]
+                count = int(line.split("N=")[1])
+                values = []
+                while len(values) < count:
+                    values.extend(f.readline().split())
+                arrays[label] = np.array(values, dtype=int if kind == "I" else float)
+            line = f.readline()
+
+    missing = set(labels) - set(arrays)
+    if missing:
+        raise ValueError(f"{fchk_file}: missing {', '.join(sorted(missing))}")
+    return arrays
+
+def read_geometry(fchk_file):
+    """Return (atomic numbers, coordinates in Angstrom) from a .fchk file."""
+    arrays = read_fchk_arrays(fchk_file, ("Atomic numbers", "Current cartesian coordinates"))
+    numbers = arrays["Atomic numbers"]
+    coords = arrays["Current cartesian coordinates"].reshape(-1, 3) * BOHR
+    return numbers, coords
+
+def fibonacci_sphere(n):
+    """n nearly uniformly spaced unit vectors."""
+    i = np.arange(n) + 0.5
+    polar = np.arccos(1 - 2 * i / n)
+    azimuth = np.pi * (1 + 5 ** 0.5) * i
+    return np.stack([np.cos(azimuth) * np.sin(polar),
+                     np.sin(azimuth) * np.sin(polar),
+                     np.cos(polar)], axis=1)
+
+def vdw_surface(numbers, coords, scales=(1.4,), density=3.0):
+    """
+    Return surface points (Angstrom) of the scaled van der Waals surface.
+
+    Each atom gets points on a sphere of radius scale * r_vdW, as many as the
+    sphere area times `density` (points per square Angstrom); points inside
+    any other atom's scaled sphere are discarded.
+    """
+    radii = np.array([VDW_RADII.get(int(z), 2.0) for z in numbers])
+    layers = []
+    for scale in scales:
+        scaled = scale * radii
+        for atom, radius in enumerate(scaled):
+            n = max(12, int(round(4 * np.pi * radius ** 2 * density)))
+            points = coords[atom] + radius * fibonacci_sphere(n)
+            distances = np.linalg.norm(points[:, None, :] - coords[None, :, :], axis=-1)
+            outside = (distances >= scaled[None, :] - 1e-8).all(axis=1)
+            layers.append(points[outside])
+    return np.concatenate(layers)
+
+def evaluate_potential(fchk_file, points, cubegen="cubegen", nproc=0):
+    """
+    Evaluate the SCF potential at the given points (Angstrom) with cubegen.
+
+    cubegen reads one point per line (bohr) from standard input and writes
+    x y z value rows after the header; the last len(points) rows are used.
+    """
+    stdin = "".join(f"{x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in points / BOHR)
+    handle, output = tempfile.mkstemp(suffix=".cube", dir=os.path.dirname(os.path.abspath(fchk_file)))
+    os.close(handle)
+    try:
+        subprocess.run([cubegen, str(nproc), "Potential=scf", fchk_file, output, "-5", "h"],
+                       input=stdin, text=True, check=True, stdout=subprocess.DEVNULL)
+        rows = []
+        with open(output, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 4:
+                    rows.append(fields[-1])
+    finally:
+        os.remove(output)
+
+    if len(rows) < len(points):
+        raise RuntimeError(f"cubegen returned {len(rows)} values for {len(points)} points")
+    return np.array(rows[-len(points):], dtype=float)
+
+def write_surface(output_file, numbers, coords, points, esp):
+    """Write the per-frame ESP surface file."""
+    np.savez_compressed(output_file,
+                        atomic_numbers=numbers.astype(np.int16),
+                        coordinates=coords.astype(np.float32),
+                        points=points.astype(np.float32),
+                        esp=esp.astype(np.float32))
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the ESP on the molecular surface of a frame")
+    parser.add_argument("fchk_file", help="Formatted checkpoint of the frame")
+    parser.add_argument("output", help="Output file (.npz)")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1.4],
+                      help="Multiples of the vdW radii defining surface layers (default: 1.4)")
+    parser.add_argument("--density", type=float, default=3.0,
+                      help="Surface points per square Angstrom (default: 3.0)")
+    parser.add_argument("--cubegen", default="cubegen",
+                      help="cubegen executable (default: cubegen)")
+    parser.add_argument("--nproc", type=int, default=0,
+                      help="Processors for cubegen, 0 for the Gaussian default (default: 0)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.fchk_file):
+        print(f"Error: Formatted checkpoint '{args.fchk_file}' not found!")
+        sys.exit(1)
+
+    numbers, coords = read_geometry(args.fchk_file)
+    points = vdw_surface(numbers, coords, args.scale, args.density)
+    esp = evaluate_potential(args.fchk_file, points, args.cubegen, args.nproc)
+    write_surface(args.output, numbers, coords, points, esp)
+
+    print(f"ESP on {len(points)} surface points: min {esp.min():.5f}, max {esp.max():.5f} Eh/e "
+          f"-> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -5,35 +5,53 @@ Generate orbital cube files from ADMP formatted checkpoint files (.fchk).
 This script:
 1. Searches for formatted checkpoint files in ADMP results directories
 2. Creates a SLURM submission script to run cubegen for HOMO and LUMO orbitals
+   (with --tracking, the MO numbers followed by track_orbitals.py)
 3. Organizes the cube files by molecule and temperature
 """
 
 import os
+import sys
 import glob
 import argparse
 import subprocess
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from results_catalog import find_artifacts
+
+# Retention tool that regenerates formatted checkpoints on demand
+RETENTION_SCRIPT = Path(__file__).resolve().parent.parent / "artifact_retention.py"
+
+def find_regenerable_fchk(base_path, known_files):
+    """Find formatted checkpoints stored in compact form by artifact_retention.py."""
+    known = {str(f) for f in known_files}
+    regenerable = []
+    for path in find_artifacts(base_path, ["fchk.gz", "chk.gz", "chk"]):
+        suffix = next(s for s in (".fchk.gz", ".chk.gz", ".chk") if path.name.endswith(s))
+        fchk = str(path)[:-len(suffix)] + ".fchk"
+        if fchk not in known:
+            known.add(fchk)
+            regenerable.append(Path(fchk))
+    return regenerable
+
 def find_fchk_files(base_dir="../ADMP_decomposition_gaussian/admp_jobs/results"):
     """Find all formatted checkpoint files in the results directory."""
     base_path = Path(base_dir).resolve()
     print(f"Searching for .fchk files in: {base_path}")
     
-    # First search method: use glob pattern
-    all_fchk_files = list(base_path.glob("**/checkpoints/*.fchk"))
+    # Cataloged lookup; only directories changed since the last scan are re-listed
+    all_fchk_files = find_artifacts(base_path, ["fchk"])
     
-    # If no files found with the first method, try alternative search patterns
-    if not all_fchk_files:
-        print("No .fchk files found in checkpoints directories, trying broader search...")
-        all_fchk_files = list(base_path.glob("**/*.fchk"))
+    # Prefer files in checkpoints directories when the tree has them
+    in_checkpoints = [f for f in all_fchk_files if f.parent.name == "checkpoints"]
+    if in_checkpoints:
+        all_fchk_files = in_checkpoints
     
-    # If still no files, try using os.walk which might be more thorough
-    if not all_fchk_files:
-        print("Still no .fchk files found, trying more thorough search...")
-        for root, dirs, files in os.walk(base_path):
-            for file in files:
-                if file.endswith('.fchk'):
-                    all_fchk_files.append(Path(os.path.join(root, file)))
+    # Checkpoints kept in compact form are formatted when the job runs
+    regenerable = find_regenerable_fchk(base_path, all_fchk_files)
+    if regenerable:
+        print(f"Found {len(regenerable)} checkpoints to format on demand")
+        all_fchk_files.extend(regenerable)
     
     if not all_fchk_files:
         print(f"WARNING: No .fchk files found in {base_dir}")
@@ -56,7 +74,7 @@ def find_fchk_files(base_dir="../ADMP_decomposition_gaussian/admp_jobs/results")
     return all_fchk_files
 
 def create_slurm_script(fchk_files, output_dir="./cube_files", 
-                        grid_size=80, orbitals=None, max_time="12:00:00"):
+                        grid_size=80, orbitals=None, max_time="12:00:00", tracking=None):
     """
     Create a SLURM submission script to process all checkpoint files with cubegen.
     
@@ -66,6 +84,8 @@ def create_slurm_script(fchk_files, output_dir="./cube_files",
         grid_size: Resolution of the cube grid (default: 80)
         orbitals: List of orbitals to generate (default: ['HOMO', 'LUMO'])
         max_time: Maximum time allowed for the SLURM job (default: "12:00:00")
+        tracking: {frame name: {orbital: MO number}} from track_orbitals.load_tracking;
+                  tracked orbitals are cubed by MO number instead of by label
     """
     if orbitals is None:
         orbitals = ['HOMO', 'LUMO']
@@ -117,6 +137,19 @@ check_existing_cube() {
 
 """)
 
+        # Function to regenerate checkpoints kept in compact form
+        script.write("""# Regenerate formatted checkpoints stored in compact form
+ensure_fchk() {{
+    local fchk_file="$1"
+    
+    if [ ! -f "$fchk_file" ]; then
+        echo "  - Regenerating formatted checkpoint: $fchk_file"
+        python3 "{0}" --ensure "$fchk_file"
+    fi
+}}
+
+""".format(RETENTION_SCRIPT))
+
         # Process all checkpoint files
         script.write("echo \"Processing " + str(len(fchk_files)) + " checkpoint files\"\n")
         script.write("echo \"----------------------------------------\"\n\n")
@@ -144,15 +177,18 @@ check_existing_cube() {
             # Get frame number or use filename if no frame info
             base_filename = os.path.basename(fchk_file)
             frame = base_filename.split('.')[0]
+            tracked = (tracking or {}).get(frame, {})
             
             # Generate cubegen commands for each orbital
             for orbital in orbitals:
                 output_cube = f"{mol_dir}/{orbital.lower()}_{frame}.cube"
+                mo = tracked.get(orbital, orbital)
                 
                 # Add check to skip existing files
                 script.write(f"\nif ! check_existing_cube \"{output_cube}\" \"{fchk_file}\" \"{orbital}\"; then\n")
-                script.write(f"    echo \"  Running: cubegen 0 MO={orbital} {fchk_file} {output_cube} {grid_size} h\"\n")
-                script.write(f"    cubegen 0 MO={orbital} {fchk_file} {output_cube} {grid_size} h\n")
+                script.write(f"    ensure_fchk \"{fchk_file}\"\n")
+                script.write(f"    echo \"  Running: cubegen 0 MO={mo} {fchk_file} {output_cube} {grid_size} h\"\n")
+                script.write(f"    cubegen 0 MO={mo} {fchk_file} {output_cube} {grid_size} h\n")
                 script.write(f"    \n")
                 script.write(f"    if [ -f \"{output_cube}\" ]; then\n")
                 script.write(f"        echo \"  ✓ Successfully created {orbital} cube file\"\n")
@@ -208,9 +244,17 @@ def main():
                       help="Orbitals to generate (default: HOMO LUMO)")
     parser.add_argument("--max-time", default="12:00:00",
                       help="Maximum time for SLURM job (default: 12:00:00)")
+    parser.add_argument("--tracking",
+                      help="orbital_tracking.json from track_orbitals.py; cube the tracked MO numbers")
     
     args = parser.parse_args()
     
+    tracking = None
+    if args.tracking:
+        from track_orbitals import load_tracking
+        tracking = load_tracking(args.tracking)
+        print(f"Using tracked orbitals for {len(tracking)} frames from {args.tracking}")
+    
     print("Searching for formatted checkpoint files...")
     fchk_files = find_fchk_files(args.base_dir)
     
@@ -220,7 +264,8 @@ def main():
             output_dir=args.output_dir,
             grid_size=args.grid_size,
             orbitals=args.orbitals,
-            max_time=args.max_time
+            max_time=args.max_time,
+            tracking=tracking
         )
         
         print(f"\nNext steps:")
@@ -5,35 +5,50 @@ Generate orbital cube files from ADMP XYZ trajectory files.
 This script:
 1. Searches for XYZ files in ADMP results directories
 2. Processes frames from XYZ trajectory files
-3. Creates input files for Gaussian calculations
-4. Organizes the files by molecule and temperature
+3. Optionally aligns each trajectory to a fixed frame (align_trajectory.py)
+   and writes a shared cube grid specification per trajectory
+4. Creates input files for Gaussian calculations, one per frame or batches of
+   consecutive frames joined by --Link1-- (split_batch_log.py splits the log)
+5. Organizes the files by molecule and temperature
+
+Inputs are rendered from one template in memory and written by a thread pool;
+each output directory is created and listed once per trajectory, so large runs
+are not dominated by per-file metadata operations.
 """
 
 import os
+import re
+import sys
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from results_catalog import find_artifacts
+
+# Grid specification used by submit_orbital_calculations.sh for aligned frames
+GRID_SPEC_NAME = "grid.txt"
+
+# Per-segment trajectories next to the stitched one written by get_xyz.py
+SEGMENT_PATTERN = re.compile(r'_seg\d+$')
+
+# Single-point job for one frame; the route is built once per trajectory
+FRAME_TEMPLATE = ("{oldchk}%chk={name}.chk\n%mem=8GB\n%nprocshared=4\n"
+                  "# {route}\n\n{molecule} {timestep}\n\n0 1\n{atoms}\n")
+ATOM_LINE = "{:2s}  {:12.6f}  {:12.6f}  {:12.6f}\n"
+
 def find_xyz_files(base_dir="../ADMP_decomposition_gaussian/admp_jobs/results"):
     """Find all XYZ trajectory files in the results directory."""
     base_path = Path(base_dir).resolve()
     print(f"Searching for .xyz files in: {base_path}")
     
-    # First search method: use glob pattern
-    all_xyz_files = list(base_path.glob("**/*.xyz"))
-    
-    # If no files found with the first method, try alternative search patterns
-    if not all_xyz_files:
-        print("No .xyz files found, trying broader search...")
-        all_xyz_files = list(base_path.glob("**/*ADMP*.xyz"))
-    
-    # If still no files, try using os.walk which might be more thorough
-    if not all_xyz_files:
-        print("Still no .xyz files found, trying more thorough search...")
-        for root, dirs, files in os.walk(base_path):
-            for file in files:
-                if file.endswith('.xyz'):
-                    all_xyz_files.append(Path(os.path.join(root, file)))
+    # Cataloged lookup; only directories changed since the last scan are re-listed.
+    # Segment trajectories repeat frames of the stitched trajectory
+    all_xyz_files = [f for f in find_artifacts(base_path, ["xyz"])
+                     if not SEGMENT_PATTERN.search(f.stem)]
     
     if not all_xyz_files:
         print(f"WARNING: No .xyz files found in {base_dir}")
@@ -54,7 +69,7 @@ def find_xyz_files(base_dir="../ADMP_decomposition_gaussian/admp_jobs/results"):
     
     return all_xyz_files
 
-def read_xyz_frames(xyz_file):
+def read_xyz_frames(xyz_file, quiet=False):
     """Extract frames from XYZ trajectory file."""
     frames = []
     try:
@@ -78,121 +93,238 @@ def read_xyz_frames(xyz_file):
         print(f"Error reading {xyz_file}: {str(e)}")
         return []
     
-    print(f"  Extracted {len(frames)} frames from {xyz_file}")
+    if not quiet:
+        print(f"  Extracted {len(frames)} frames from {xyz_file}")
     return frames
 
-def create_gaussian_input_file(molecule, temp, timestep, atoms, output_dir, 
-                              step_num, method="B3LYP", basis="6-31G(d)"):
-    """Create a Gaussian input file for a single frame."""
-    # Create base name for files
-    base_name = f"{molecule}_{temp}_step{step_num:04d}"
+def frame_route(method, basis, nosymm=False, guess_read=False):
+    """Route section (without the leading #) of a frame's single point.
     
-    # Ensure the output directory exists
-    mol_dir = Path(output_dir) / molecule / temp
-    mol_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create Gaussian input file
-    gjf_file = mol_dir / f"{base_name}.gjf"
-    
-    # Skip if the file already exists
-    if gjf_file.exists():
-        print(f"  - Input file already exists: {gjf_file}")
-        return str(gjf_file)
-    
-    with open(gjf_file, 'w') as f:
-        f.write(f"%chk={base_name}.chk\n")
-        f.write("%mem=8GB\n")
-        f.write("%nprocshared=4\n")
-        f.write(f"# {method}/{basis} pop=full density=current\n\n")
-        f.write(f"{molecule} {timestep}\n\n")
-        f.write("0 1\n")
-        for symbol, x, y, z in atoms:
-            f.write(f"{symbol:2s}  {x:12.6f}  {y:12.6f}  {z:12.6f}\n")
-        f.write("\n")
-    
-    print(f"  - Created input file: {gjf_file}")
-    return str(gjf_file)
+    nosymm keeps the input orientation, which aligned frames need.
+    """
+    return (f"{method}/{basis} pop=full density=current"
+            f"{' nosymm' if nosymm else ''}{' guess=read' if guess_read else ''}")
 
-def process_xyz_files(xyz_files, output_dir="./orbital_inputs", max_frames=10,
-                     method="B3LYP", basis="6-31G(d)"):
-    """Process XYZ files and create Gaussian input files."""
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
+def render_frame_job(base_name, molecule, timestep, atoms, route, oldchk=None):
+    """Return the job for one frame; with oldchk the SCF guess is read from that checkpoint."""
+    return FRAME_TEMPLATE.format(
+        oldchk=f"%oldchk={oldchk}.chk\n" if oldchk else "",
+        name=base_name,
+        route=route,
+        molecule=molecule,
+        timestep=timestep,
+        atoms="".join(ATOM_LINE.format(*atom) for atom in atoms),
+    )
+
+def render_inputs(molecule, temp, numbered_frames, method="B3LYP", basis="6-31G(d)",
+                  nosymm=False, batch_size=1):
+    """Render the inputs for a list of (step number, timestep, atoms) in memory.
     
-    # Store information about all generated files
-    all_inputs = {}
+    Returns (file name, text, step numbers) per input. With batch_size > 1,
+    consecutive frames are joined by --Link1--; every frame keeps its own
+    %chk, so the results look like those of single-frame inputs, and each
+    frame after the first starts from the previous frame's converged orbitals.
+    """
+    route = frame_route(method, basis, nosymm)
+    route_guess = frame_route(method, basis, nosymm, guess_read=True)
+    rendered = []
+    for start in range(0, len(numbered_frames), batch_size):
+        batch = numbered_frames[start:start + batch_size]
+        jobs = []
+        previous = None
+        for step_num, timestep, atoms in batch:
+            frame_name = f"{molecule}_{temp}_step{step_num:04d}"
+            jobs.append(render_frame_job(frame_name, molecule, timestep, atoms,
+                                         route_guess if previous else route, previous))
+            previous = frame_name
+        if batch_size > 1:
+            name = f"{molecule}_{temp}_batch{batch[0][0]:04d}.gjf"
+        else:
+            name = f"{previous}.gjf"
+        rendered.append((name, "--Link1--\n".join(jobs), [step for step, _, _ in batch]))
+    return rendered
+
+def write_input(path, text):
+    """Write one rendered input with a single call."""
+    with open(path, 'w') as f:
+        f.write(text)
+
+def parse_trajectory_name(xyz_file):
+    """Return the molecule name and temperature label for an XYZ trajectory."""
+    xyz_path = Path(xyz_file)
     
-    for i, xyz_file in enumerate(xyz_files):
-        xyz_path = Path(xyz_file)
-        print(f"Processing file {i+1}/{len(xyz_files)}: {xyz_path}")
+    # Parse molecule name and temperature from file name
+    filename = xyz_path.name
+    if '_ADMP_' in filename:
+        molecule = filename.split('_ADMP_')[0]
+        temp = filename.split('_ADMP_')[1].split('.')[0]
+    else:
+        # Fallback to directory names if filename pattern is different
+        parts = str(xyz_file).split('/')
+        molecule_idx = parts.index("results") + 1 if "results" in parts else -3
+        temp_idx = molecule_idx + 1 if molecule_idx >= 0 else -2
         
-        # Parse molecule name and temperature from file name
-        filename = xyz_path.name
-        if '_ADMP_' in filename:
-            molecule = filename.split('_ADMP_')[0]
-            temp = filename.split('_ADMP_')[1].split('.')[0]
+        if molecule_idx >= 0 and temp_idx < len(parts):
+            molecule = parts[molecule_idx]
+            temp = parts[temp_idx]
         else:
-            # Fallback to directory names if filename pattern is different
-            parts = str(xyz_file).split('/')
-            molecule_idx = parts.index("results") + 1 if "results" in parts else -3
-            temp_idx = molecule_idx + 1 if molecule_idx >= 0 else -2
-            
-            if molecule_idx >= 0 and temp_idx < len(parts):
-                molecule = parts[molecule_idx]
-                temp = parts[temp_idx]
-            else:
-                molecule = filename.split('.')[0]
-                temp = "unknown"
-        
-        # Process frames from this XYZ file
-        frames = read_xyz_frames(xyz_file)
-        
-        # Select frames based on max_frames
-        if max_frames > 0 and len(frames) > max_frames:
-            step = max(1, len(frames) // max_frames)
-            selected_frames = frames[::step][:max_frames]
+            molecule = filename.split('.')[0]
+            temp = "unknown"
+    
+    return molecule, temp
+
+def process_xyz_file(xyz_file, output_dir="./orbital_inputs", max_frames=10,
+                    method="B3LYP", basis="6-31G(d)", align=False, grid_spacing=0.15,
+                    batch_size=1, writes=None, quiet=False):
+    """Create Gaussian input files for the selected frames of one XYZ trajectory.
+    
+    With align, translation and rotation are removed from all frames and a
+    grid covering the whole trajectory is written next to the inputs. With
+    batch_size > 1, that many consecutive frames share one --Link1-- input.
+    If a writes list is given, (path, text) pairs are appended to it instead
+    of being written, so the caller can write them in bulk.
+    
+    Returns the molecule name, temperature label and the list of input records.
+    """
+    molecule, temp = parse_trajectory_name(xyz_file)
+    
+    # Process frames from this XYZ file
+    frames = read_xyz_frames(xyz_file, quiet)
+    
+    # The trajectory's directory is created and listed once, not per input
+    mol_dir = Path(output_dir) / molecule / temp
+    existing = set()
+    if frames:
+        mol_dir.mkdir(parents=True, exist_ok=True)
+        existing = set(os.listdir(mol_dir))
+    
+    grid_file = None
+    if align and frames:
+        # NumPy is only loaded for aligned trajectories
+        from align_trajectory import align_frames, write_grid_spec
+        frames, origin, shape = align_frames(frames, spacing=grid_spacing)
+        grid_file = str(write_grid_spec(mol_dir / GRID_SPEC_NAME, origin, shape, grid_spacing))
+        if not quiet:
+            print(f"  - Aligned frames; common grid {shape[0]}x{shape[1]}x{shape[2]}: {grid_file}")
+    
+    # Select frames based on max_frames
+    if max_frames > 0 and len(frames) > max_frames:
+        step = max(1, len(frames) // max_frames)
+        selected_frames = frames[::step][:max_frames]
+        if not quiet:
             print(f"  - Processing {len(selected_frames)} selected frames (out of {len(frames)})")
-        else:
-            selected_frames = frames
+    else:
+        selected_frames = frames
+        if not quiet:
             print(f"  - Processing all {len(frames)} frames")
+    
+    # Store input files for this XYZ file
+    molecule_inputs = []
+    
+    numbered_frames = []
+    for frame_idx, (timestep, atoms) in enumerate(selected_frames):
+        try:
+            step_num = int(timestep.split()[-1])
+        except (ValueError, IndexError):
+            step_num = frame_idx
+        numbered_frames.append((step_num, timestep, atoms))
+    
+    # Create Gaussian input files for each selected frame (or batch of frames)
+    batch_size = max(1, batch_size)
+    for name, text, steps in render_inputs(molecule, temp, numbered_frames, method, basis,
+                                           nosymm=align, batch_size=batch_size):
+        gjf_file = str(mol_dir / name)
+        if name in existing:
+            # Skip if the file already exists
+            if not quiet:
+                print(f"  - Input file already exists: {gjf_file}")
+        else:
+            if writes is None:
+                write_input(gjf_file, text)
+            else:
+                writes.append((gjf_file, text))
+            if not quiet and batch_size > 1:
+                print(f"  - Created batched input file ({len(steps)} frames): {gjf_file}")
+            elif not quiet:
+                print(f"  - Created input file: {gjf_file}")
         
-        # Store input files for this XYZ file
-        molecule_inputs = []
-        
-        # Create Gaussian input files for each selected frame
-        for frame_idx, (timestep, atoms) in enumerate(selected_frames):
-            try:
-                step_num = int(timestep.split()[-1])
-            except (ValueError, IndexError):
-                step_num = frame_idx
-            
-            # Create input file
-            gjf_file = create_gaussian_input_file(
-                molecule, temp, timestep, atoms, output_dir, 
-                step_num, method, basis
-            )
-            
-            # Add to the list of inputs
-            molecule_inputs.append({
+        # Add to the list of inputs
+        for step_num in steps:
+            record = {
                 "input_file": gjf_file,
                 "molecule": molecule,
                 "temperature": temp,
                 "step": step_num
-            })
-        
-        # Add this molecule's inputs to the main dictionary
-        if molecule_inputs:
-            if molecule not in all_inputs:
-                all_inputs[molecule] = {}
-            all_inputs[molecule][temp] = molecule_inputs
-        
-        print(f"  - Created {len(molecule_inputs)} input files")
-        print("----------------------------------------")
+            }
+            if grid_file:
+                record["grid"] = grid_file
+            molecule_inputs.append(record)
     
-    # Write the summary JSON file
+    return molecule, temp, molecule_inputs
+
+def write_input_summary(all_inputs, output_dir="./orbital_inputs"):
+    """Write the summary JSON file describing all generated inputs."""
     summary_file = Path(output_dir) / "input_summary.json"
     with open(summary_file, 'w') as f:
         json.dump(all_inputs, f, indent=2)
+    return summary_file
+
+def process_xyz_files(xyz_files, output_dir="./orbital_inputs", max_frames=10,
+                     method="B3LYP", basis="6-31G(d)", align=False, grid_spacing=0.15,
+                     batch_size=1, workers=8, quiet=False):
+    """Process XYZ files and create Gaussian input files.
+    
+    Rendered inputs are written by `workers` threads while the next
+    trajectory is read. With quiet, the per-file messages are replaced by a
+    progress line.
+    """
+    # Create output directory
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Store information about all generated files
+    all_inputs = {}
+    start = time.perf_counter()
+    progress = quiet and sys.stdout.isatty()
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = []
+        for i, xyz_file in enumerate(xyz_files):
+            xyz_path = Path(xyz_file)
+            if not quiet:
+                print(f"Processing file {i+1}/{len(xyz_files)}: {xyz_path}")
+            
+            writes = []
+            molecule, temp, molecule_inputs = process_xyz_file(
+                xyz_file, output_dir, max_frames, method, basis, align, grid_spacing, batch_size,
+                writes=writes, quiet=quiet
+            )
+            pending.extend(pool.submit(write_input, path, text) for path, text in writes)
+            
+            # Add this molecule's inputs to the main dictionary
+            if molecule_inputs:
+                if molecule not in all_inputs:
+                    all_inputs[molecule] = {}
+                all_inputs[molecule][temp] = molecule_inputs
+            
+            if progress:
+                print(f"\r  {i+1}/{len(xyz_files)} trajectories, {len(pending)} input files",
+                      end="", flush=True)
+            elif not quiet:
+                print(f"  - Created inputs for {len(molecule_inputs)} frames")
+                print("----------------------------------------")
+        
+        # Raise the first write error here rather than leaving it in the pool
+        for future in pending:
+            future.result()
+    
+    elapsed = time.perf_counter() - start
+    if progress:
+        print()
+    print(f"Wrote {len(pending)} input files in {elapsed:.2f} s "
+          f"({len(pending) / max(elapsed, 1e-9):.0f} files/s)")
+    
+    # Write the summary JSON file
+    summary_file = write_input_summary(all_inputs, output_dir)
     
     print(f"\nSummary of generated input files saved to: {summary_file}")
     return all_inputs
@@ -209,6 +341,16 @@ def main():
                       help="Computational method to use (default: B3LYP)")
     parser.add_argument("--basis", default="6-31G(d)",
                       help="Basis set to use (default: 6-31G(d))")
+    parser.add_argument("--align", action="store_true",
+                      help="Remove translation/rotation and put all cubes of a trajectory on one grid")
+    parser.add_argument("--grid-spacing", type=float, default=0.15,
+                      help="Grid spacing in Angstrom for --align (default: 0.15)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                      help="Frames per input, joined by --Link1-- (default: 1)")
+    parser.add_argument("--workers", type=int, default=8,
+                      help="Threads writing input files (default: 8)")
+    parser.add_argument("--quiet", action="store_true",
+                      help="Show a progress line instead of a message per file")
     
     args = parser.parse_args()
     
@@ -221,18 +363,33 @@ def main():
             output_dir=args.output_dir,
             max_frames=args.max_frames,
             method=args.method,
-            basis=args.basis
+            basis=args.basis,
+            align=args.align,
+            grid_spacing=args.grid_spacing,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            quiet=args.quiet
         )
         
         # Count total inputs
-        total_inputs = sum(len(temp_files) 
+        total_inputs = len({record["input_file"]
+                            for molecule in all_inputs.values()
+                            for temp_files in molecule.values()
+                            for record in temp_files})
+        total_frames = sum(len(temp_files) 
                          for molecule in all_inputs.values() 
                          for temp_files in molecule.values())
         
         print(f"\nNext steps:")
-        print(f"1. Generated {total_inputs} Gaussian input files in: {args.output_dir}")
+        print(f"1. Generated {total_inputs} Gaussian input files ({total_frames} frames) in: {args.output_dir}")
+        # Time request sized from past single-point runs (walltime_model.py)
+        from walltime_model import time_for_inputs
+        time_limit = time_for_inputs(
+            sorted({record["input_file"] for molecule in all_inputs.values()
+                    for temp_files in molecule.values() for record in temp_files}),
+            "24:00:00")
         print(f"2. Use the separate submit_orbital_calculations.sh script to run the calculations:")
-        print(f"   $ sbatch submit_orbital_calculations.sh {args.output_dir}")
+        print(f"   $ sbatch --time={time_limit} submit_orbital_calculations.sh {args.output_dir}")
         print(f"\nYou can control the number of frames with --max-frames")
         print(f"Default is 10 frames per trajectory to keep computation time reasonable.")
         print(f"You can also specify different computational methods with --method and --basis")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Split the log of a batched (--Link1--) frame input into per-frame logs.
+
+Batched inputs written by generate_orbitals_from_xyz.py --batch-size K run
+several frames in one g16 process. g16 prints its "Entering Gaussian System"
+banner once per process; every later job starts with "Link1:  Proceeding to
+internal job step number N". This script cuts the combined log at either line
+and writes <frame>.log next to it, named after the frame's
+%chk, so the per-frame results look exactly like those of single-frame runs.
+Frames that never started (because an earlier job failed) get no log.
+
+The names of the frames written are printed one per line.
+
+Usage:
+    python split_batch_log.py CF2O_800K_batch0000.log
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+# The first job of a process starts with the banner, every later --Link1-- job with the step line
+JOB_START = (" Entering Gaussian System", " Link1:  Proceeding to internal job step")
+CHK_PATTERN = re.compile(r'^\s*%chk=(\S+?)(?:\.chk)?\s*$', re.IGNORECASE)
+
+def split_jobs(log_file):
+    """Return the lines of each job in a combined log."""
+    jobs = []
+    current = []
+    with open(log_file, 'r', errors='replace') as f:
+        for line in f:
+            if line.startswith(JOB_START) and current:
+                jobs.append(current)
+                current = []
+            current.append(line)
+    if current:
+        jobs.append(current)
+    return jobs
+
+def frame_name(job, fallback):
+    """Name of a job from the %chk echoed in its Link 0 section."""
+    for line in job[:200]:
+        match = CHK_PATTERN.match(line)
+        if match:
+            return Path(match.group(1)).name
+    return fallback
+
+def split_batch_log(log_file, output_dir=None):
+    """Write one log per job; return the frame names in order."""
+    log_file = Path(log_file)
+    output_dir = Path(output_dir) if output_dir else log_file.parent
+    names = []
+    for index, job in enumerate(split_jobs(log_file)):
+        name = frame_name(job, f"{log_file.stem}_{index + 1:02d}")
+        with open(output_dir / f"{name}.log", 'w') as f:
+            f.writelines(job)
+        names.append(name)
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a --Link1-- log into per-frame logs")
+    parser.add_argument("log_file", help="Combined Gaussian log")
+    parser.add_argument("--output-dir", help="Where to write the frame logs (default: next to the log)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log_file):
+        print(f"Error: Log file '{args.log_file}' not found!", file=sys.stderr)
+        sys.exit(1)
+
+    names = split_batch_log(args.log_file, args.output_dir)
+    if not names:
+        print(f"Error: No Gaussian jobs found in '{args.log_file}'", file=sys.stderr)
+        sys.exit(1)
+    for name in names:
+        print(name)
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@
 #SBATCH --partition=sapphire
 #SBATCH --job-name=XYZ_orbitals
 #SBATCH --output=XYZ_orbitals_%j.log
+#SBATCH --signal=B:USR1@300
+#SBATCH --requeue
 
 # Help message
 usage() {
@@ -19,6 +21,8 @@ usage() {
     echo "  -m, --memory GB       Set memory limit in GB (default: 8)"
     echo "  -o, --output DIR      Set output directory (default: ./orbital_results)"
     echo "  -i, --input DIR       Set input directory (default: ./orbital_inputs)"
+    echo "  -s, --scratch DIR     Set node-local scratch directory (default: \$TMPDIR)"
+    echo "  -e, --esp MODE        Electrostatic potential: cube, surface, both or none (default: cube)"
     echo "  -h, --help            Show this help message"
     echo
     echo "If no INPUT_DIR is specified, the default ./orbital_inputs will be used."
@@ -31,6 +35,10 @@ INPUT_DIR="./orbital_inputs"
 OUTPUT_DIR="./orbital_results"
 TIME_LIMIT="24:00:00"
 MEMORY="8G"
+SCRATCH_ROOT="${TMPDIR:-/tmp}"
+# cube: full Potential=scf cube; surface: ESP on the vdW surface only
+# (esp_surface.py, <frame>_esp.npz); both; none
+ESP_MODE="${ESP_MODE:-cube}"
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -51,6 +59,14 @@ while [[ $# -gt 0 ]]; do
             INPUT_DIR="$2"
             shift 2
             ;;
+        -s|--scratch)
+            SCRATCH_ROOT="$2"
+            shift 2
+            ;;
+        -e|--esp)
+            ESP_MODE="$2"
+            shift 2
+            ;;
         -h|--help)
             usage
             ;;
@@ -62,6 +78,14 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+case "$ESP_MODE" in
+    cube|surface|both|none) ;;
+    *)
+        echo "ERROR: Unknown ESP mode: $ESP_MODE (use cube, surface, both or none)"
+        exit 1
+        ;;
+esac
+
 # Check that input directory exists
 if [ ! -d "$INPUT_DIR" ]; then
     echo "WARNING: Input directory does not exist: $INPUT_DIR"
@@ -82,8 +106,116 @@ export GAUSS_PDEF=4
 echo "Starting orbital calculations"
 echo "Input directory: $INPUT_DIR"
 echo "Output directory: $OUTPUT_DIR"
+echo "Scratch directory: $SCRATCH_ROOT"
+echo "ESP mode: $ESP_MODE"
 echo "------------------------------------------------"
 
+# Directory to return to after each calculation
+SUBMIT_DIR="${SLURM_SUBMIT_DIR:-$(pwd)}"
+
+# Failed frames are classified and retried with an adjusted input up to this
+# many times (see gaussian_failures.py); attempts are counted in
+# <input>.retries in the output directory, across allocations
+RETRY_BUDGET="${RETRY_BUDGET:-2}"
+RETRIED=0
+
+# SLURM sends USR1 five minutes before the time limit (--signal above). The
+# running input is stopped, rewritten to continue from its checkpoint, and
+# the job requeued; the next allocation skips finished frames and resumes
+# the interrupted input. Continuations are counted in <input>.continuations,
+# separately from failure retries, and only stop an input that has needed
+# this many allocations
+MAX_CONTINUATIONS="${MAX_CONTINUATIONS:-20}"
+TIMED_OUT=0
+g16_pid=""
+on_time_limit() {
+    echo "Time limit approaching; stopping to requeue"
+    TIMED_OUT=1
+    [ -n "$g16_pid" ] && kill -TERM "$g16_pid" 2>/dev/null
+}
+trap on_time_limit USR1
+
+requeue_job() {
+    if [ ${#COPY_PIDS[@]} -gt 0 ]; then
+        wait "${COPY_PIDS[@]}"
+    fi
+    rm -rf "$JOB_SCRATCH"
+    if [ -n "$SLURM_JOB_ID" ] && scontrol requeue "$SLURM_JOB_ID"; then
+        echo "Requeued job $SLURM_JOB_ID"
+    else
+        echo "WARNING: Could not requeue; submit the job again to continue"
+    fi
+    exit 0
+}
+
+# Throughput metrics for watching the batch (see pipeline_metrics.py);
+# a failed metrics update never affects the run
+export METRICS_DIR="${METRICS_DIR:-$SUBMIT_DIR/metrics}"
+record_metrics() {
+    python3 "$SUBMIT_DIR/../pipeline_metrics.py" "$@" > /dev/null 2>&1 || true
+}
+
+# Per-job scratch directories live on node-local storage
+JOB_SCRATCH="$SCRATCH_ROOT/orbitals_${SLURM_JOB_ID:-$$}"
+mkdir -p "$JOB_SCRATCH"
+COPY_PIDS=()
+
+# Copy declared outputs from node-local scratch back to the shared results
+# directory, then remove the scratch directory
+copy_back() {
+    local scratch_dir="$1"
+    local dest_dir="$2"
+    shift 2
+
+    for name in "$@"; do
+        if [ -f "$scratch_dir/$name" ]; then
+            cp "$scratch_dir/$name" "$dest_dir/" || echo "  ✗ WARNING: Failed to copy back $name"
+        fi
+    done
+    rm -rf "$scratch_dir"
+}
+
+# Write one cube; aligned trajectories (generate_orbitals_from_xyz.py --align)
+# put every frame on the common grid read from their grid.txt
+run_cubegen() {
+    local quantity="$1"
+    local fchk="$2"
+    local cube="$3"
+
+    if [ -n "$grid_spec" ]; then
+        cubegen 0 "$quantity" "$fchk" "$cube" -1 h < "$grid_spec"
+    else
+        cubegen 0 "$quantity" "$fchk" "$cube" 80 h
+    fi
+}
+
+# Convert a finished frame's checkpoint and write its cubes (and surface ESP)
+generate_frame_cubes() {
+    local frame="$1"
+
+    formchk "${frame}.chk"
+    # Follow HOMO and LUMO of the trajectory's first frame through orbital
+    # crossings (track_orbitals.py). Overlaps between frames are only
+    # meaningful for aligned nosymm frames (generate_orbitals_from_xyz.py
+    # --align); other inputs, and frames where tracking fails, use plain labels
+    local mo_numbers=()
+    if [ $track_orbitals -eq 1 ]; then
+        read -r -a mo_numbers < <(python3 "$SUBMIT_DIR/track_orbitals.py" update \
+            "$output_subdir_abs/orbital_tracking.json" "${frame}.fchk" 2>/dev/null)
+    fi
+    run_cubegen "MO=${mo_numbers[0]:-HOMO}" "${frame}.fchk" "${frame}_homo.cube"
+    run_cubegen "MO=${mo_numbers[1]:-LUMO}" "${frame}.fchk" "${frame}_lumo.cube"
+    run_cubegen density "${frame}.fchk" "${frame}_density.cube"
+    ## Adding potential too!
+    if [ "$ESP_MODE" = "cube" ] || [ "$ESP_MODE" = "both" ]; then
+        run_cubegen Potential=scf "${frame}.fchk" "${frame}_pot.cube"
+    fi
+    if [ "$ESP_MODE" = "surface" ] || [ "$ESP_MODE" = "both" ]; then
+        python3 "$SUBMIT_DIR/esp_surface.py" "${frame}.fchk" "${frame}_esp.npz" \
+            || echo "  ✗ WARNING: Surface ESP evaluation failed for $frame"
+    fi
+}
+
 # Function to check for existing calculations
 check_existing_calc() {
     local log_file="$1"
@@ -98,9 +230,9 @@ check_existing_calc() {
     fi
 }
 
-# Find all Gaussian input files
-GJF_FILES=$(find "$INPUT_DIR" -name "*.gjf")
-GJF_COUNT=$(echo "$GJF_FILES" | wc -l)
+# Find all Gaussian input files (one sorted listing, reused below)
+mapfile -t ALL_GJF_FILES < <(find "$INPUT_DIR" -name "*.gjf" | sort)
+GJF_COUNT=${#ALL_GJF_FILES[@]}
 
 if [ "$GJF_COUNT" -eq 0 ]; then
     echo "ERROR: No .gjf files found in $INPUT_DIR"
@@ -110,6 +242,9 @@ if [ "$GJF_COUNT" -eq 0 ]; then
 fi
 
 echo "Found $GJF_COUNT Gaussian input files to process"
+# Metrics count frames; a batched input holds one %chk per frame
+FRAME_TOTAL=$(cat "${ALL_GJF_FILES[@]}" | grep -c '^%chk=')
+record_metrics start orbital --total $(( FRAME_TOTAL > GJF_COUNT ? FRAME_TOTAL : GJF_COUNT ))
 echo "------------------------------------------------"
 
 # Process each input file
@@ -118,10 +253,8 @@ SUCCESS=0
 FAILED=0
 SKIPPED=0
 
-# Get a sorted list of all input files
-mapfile -t ALL_GJF_FILES < <(find "$INPUT_DIR" -name "*.gjf" | sort)
-
 for gjf_file in "${ALL_GJF_FILES[@]}"; do
+    [ $TIMED_OUT -eq 1 ] && requeue_job
     COUNTER=$((COUNTER + 1))
     
     # Get base name and directory
@@ -137,8 +270,15 @@ for gjf_file in "${ALL_GJF_FILES[@]}"; do
     output_subdir="$OUTPUT_DIR/$molecule/$temp"
     mkdir -p "$output_subdir"
     
-    # Output files
-    log_file="$output_subdir/${base_name}.log"
+    # Frames in this input, one per %chk; batched inputs
+    # (generate_orbitals_from_xyz.py --batch-size) hold several
+    mapfile -t frame_names < <(sed -n 's/^%chk=\(.*\)\.chk[[:space:]]*$/\1/p' "$gjf_file" 2>/dev/null)
+    [ ${#frame_names[@]} -eq 0 ] && frame_names=("$base_name")
+    batched=0
+    [ ${#frame_names[@]} -gt 1 ] && batched=1
+    
+    # Output files; a batch is complete once its last frame has a log
+    log_file="$output_subdir/${frame_names[-1]}.log"
     
     echo "[$COUNTER/$GJF_COUNT] Processing: $base_name"
     echo "  - Input file: $gjf_file"
@@ -154,82 +294,203 @@ for gjf_file in "${ALL_GJF_FILES[@]}"; do
             continue
         fi
         
+        # An interrupted or retried input keeps the copy rewritten in the
+        # output directory, unless the source input was edited since then
+        output_subdir_abs=$(cd "$output_subdir" && pwd)
+        retries_file="$output_subdir_abs/${base_name}.retries"
+        continuations_file="$output_subdir_abs/${base_name}.continuations"
+        resumed=0
+        if [ -f "$retries_file" ] || [ -f "$continuations_file" ]; then
+            if [ -f "$output_subdir_abs/${base_name}.gjf" ] && [ ! "$gjf_file" -nt "$output_subdir_abs/${base_name}.gjf" ]; then
+                resumed=1
+            else
+                echo "  - Source input changed; starting afresh"
+                rm -f "$retries_file" "$continuations_file"
+            fi
+        fi
+        
+        # Attempts and continuations used so far, including earlier allocations
+        attempt=$(cat "$retries_file" 2>/dev/null || echo 0)
+        continuation=$(cat "$continuations_file" 2>/dev/null || echo 0)
+        if [ "$attempt" -gt "$RETRY_BUDGET" ] || [ "$continuation" -ge "$MAX_CONTINUATIONS" ]; then
+            echo "  ✗ ERROR: $base_name used $attempt retries and $continuation continuations"
+            FAILED=$((FAILED + 1))
+            for frame in "${frame_names[@]}"; do
+                record_metrics finish orbital "$frame" --status failed
+            done
+            echo "------------------------------------------------"
+            continue
+        fi
+        
         # Copy input file to output directory
-        cp "$gjf_file" "$output_subdir/"
+        if [ $resumed -eq 1 ]; then
+            echo "  - Resuming after $attempt retries and $continuation continuations"
+        else
+            cp "$gjf_file" "$output_subdir/"
+        fi
+        
+        track_orbitals=0
+        if grep -qi 'nosymm' "$output_subdir_abs/${base_name}.gjf"; then
+            track_orbitals=1
+        fi
+        
+        grid_spec=""
+        if [ -f "$input_dir/grid.txt" ]; then
+            grid_spec="$(cd "$input_dir" && pwd)/grid.txt"
+            echo "  - Using common trajectory grid: $input_dir/grid.txt"
+        fi
+        
+        # Stage the input to node-local scratch; Gaussian scratch files
+        # (.rwf, fort.7, ...) never touch the shared filesystem
+        frame_scratch="$JOB_SCRATCH/$base_name"
+        mkdir -p "$frame_scratch"
+        cp "$output_subdir_abs/${base_name}.gjf" "$frame_scratch/"
+        if [ $resumed -eq 1 ] && [ -f "$output_subdir_abs/${base_name}.chk" ]; then
+            cp "$output_subdir_abs/${base_name}.chk" "$frame_scratch/"
+        fi
+        export GAUSS_SCRDIR="$frame_scratch"
         
         # Run Gaussian calculation
         echo "  - Running Gaussian calculation..."
         
-        # Ensure we're in the output directory before running Gaussian
-        if ! cd "$output_subdir"; then
-            echo "  ✗ ERROR: Cannot change to output directory: $output_subdir"
+        # Ensure we're in the scratch directory before running Gaussian
+        if ! cd "$frame_scratch"; then
+            echo "  ✗ ERROR: Cannot change to scratch directory: $frame_scratch"
             FAILED=$((FAILED + 1))
             echo "------------------------------------------------"
             continue
         fi
         
-        # Run Gaussian and capture output
-        g16 "${base_name}.gjf" > "${base_name}_g16.out" 2>&1
-        G16_STATUS=$?
+        # Run Gaussian and capture output, retrying classified failures
+        for frame in "${frame_names[@]}"; do
+            record_metrics stage orbital "$frame" g16
+        done
+        while true; do
+            g16 "${base_name}.gjf" > "${base_name}_g16.out" 2>&1 &
+            g16_pid=$!
+            # wait returns early when the USR1 trap fires; keep waiting for g16
+            while wait $g16_pid; G16_STATUS=$?; [ $G16_STATUS -ne 0 ] && kill -0 $g16_pid 2>/dev/null; do :; done
+            g16_pid=""
+            [ $TIMED_OUT -eq 1 ] && break
+            
+            # Batched inputs are not rewritten; a failed batch reruns on the next submission
+            if [ $G16_STATUS -eq 0 ] || [ $attempt -ge $RETRY_BUDGET ] || [ $batched -eq 1 ]; then
+                break
+            fi
+            if ! python3 "$SUBMIT_DIR/../gaussian_failures.py" retry "${base_name}.gjf" "${base_name}.log"; then
+                break
+            fi
+            attempt=$((attempt + 1))
+            echo "$attempt" > "$retries_file"
+            RETRIED=$((RETRIED + 1))
+            mv "${base_name}.log" "${base_name}.log.attempt${attempt}" 2>/dev/null
+            echo "  - Retry $attempt of $RETRY_BUDGET"
+        done
+        
+        if [ $TIMED_OUT -eq 1 ]; then
+            # Continue from the checkpoint in the next allocation, without
+            # using the retry budget; batched inputs are not rewritten and
+            # rerun as a whole
+            continuation=$((continuation + 1))
+            echo "$continuation" > "$continuations_file"
+            if [ $batched -eq 0 ]; then
+                python3 "$SUBMIT_DIR/../gaussian_failures.py" retry --walltime "${base_name}.gjf" "${base_name}.log"
+            fi
+            mv "${base_name}.log" "${base_name}.log.part${continuation}" 2>/dev/null
+            copy_back "$frame_scratch" "$output_subdir_abs" "${base_name}.gjf" "${base_name}.chk" \
+                "${base_name}.log.part${continuation}"
+            cd "$SUBMIT_DIR" || cd /tmp
+            requeue_job
+        fi
         
-        # Check if calculation succeeded
-        if [ $G16_STATUS -eq 0 ]; then
-            echo "  - Gaussian calculation completed successfully"
+        # Split a --Link1-- log into per-frame logs; frames finished before a
+        # failure are kept
+        if [ $batched -eq 1 ] && [ -f "${base_name}.log" ]; then
+            python3 "$SUBMIT_DIR/split_batch_log.py" "${base_name}.log" > /dev/null \
+                && rm -f "${base_name}.log"
+        fi
+        
+        # Check if each frame succeeded
+        for frame in "${frame_names[@]}"; do
+            if [ $batched -eq 1 ]; then
+                grep -q "Normal termination" "${frame}.log" 2>/dev/null
+            else
+                [ $G16_STATUS -eq 0 ]
+            fi
+            frame_status=$?
             
-            # Generate cube files
-            if [ -f "${base_name}.chk" ]; then
-                echo "  - Generating formatted checkpoint and cube files"
-                formchk "${base_name}.chk"
-                cubegen 0 MO=HOMO "${base_name}.fchk" "${base_name}_homo.cube" 80 h
-                cubegen 0 MO=LUMO "${base_name}.fchk" "${base_name}_lumo.cube" 80 h
-                cubegen 0 density "${base_name}.fchk" "${base_name}_density.cube" 80 h
-                ## Adding potential too!
-                cubegen 0 Potential=scf "${base_name}.fchk" "${base_name}_pot.cube" 80 h
-                echo "  ✓ Successfully created cube files"
-                SUCCESS=$((SUCCESS + 1))
+            if [ $frame_status -eq 0 ]; then
+                echo "  - Gaussian calculation completed successfully: $frame"
+                
+                # Generate cube files
+                if [ -f "${frame}.chk" ]; then
+                    echo "  - Generating formatted checkpoint and cube files"
+                    record_metrics stage orbital "$frame" cubes
+                    generate_frame_cubes "$frame"
+                    echo "  ✓ Successfully created cube files"
+                    SUCCESS=$((SUCCESS + 1))
+                    record_metrics finish orbital "$frame" --status done --log "${frame}.log"
+                else
+                    echo "  ✗ ERROR: Checkpoint file not found"
+                    FAILED=$((FAILED + 1))
+                    record_metrics finish orbital "$frame" --status failed --log "${frame}.log"
+                fi
             else
-                echo "  ✗ ERROR: Checkpoint file not found"
+                echo "  ✗ ERROR: Gaussian calculation failed for $frame (g16 status $G16_STATUS)"
+                echo "  - See ${output_subdir}/${base_name}_g16.out for details"
                 FAILED=$((FAILED + 1))
+                record_metrics finish orbital "$frame" --status failed --log "${frame}.log"
             fi
-        else
-            echo "  ✗ ERROR: Gaussian calculation failed with status $G16_STATUS"
-            echo "  - See ${output_subdir}/${base_name}_g16.out for details"
-            FAILED=$((FAILED + 1))
-        fi
+        done
+        
+        # Copy back only the artifacts we keep, in the background while the
+        # next frame starts
+        keep_files=()
+        for frame in "${frame_names[@]}"; do
+            keep_files+=("${frame}.log" "${frame}.chk" "${frame}.fchk")
+            for cube in "${frame}"_*.cube; do
+                [ -f "$cube" ] && keep_files+=("$cube")
+            done
+            [ -f "${frame}_esp.npz" ] && keep_files+=("${frame}_esp.npz")
+        done
+        [ $batched -eq 1 ] && [ -f "${base_name}.log" ] && keep_files+=("${base_name}.log")
+        for attempt_log in "${base_name}".log.attempt*; do
+            [ -f "$attempt_log" ] && keep_files+=("$attempt_log" "${base_name}.gjf")
+        done
+        [ -s "${base_name}_g16.out" ] && keep_files+=("${base_name}_g16.out")
+        copy_back "$frame_scratch" "$output_subdir_abs" "${keep_files[@]}" &
+        COPY_PIDS+=($!)
         
         # Return to original directory
-        cd "$SLURM_SUBMIT_DIR" || cd /tmp
+        cd "$SUBMIT_DIR" || cd /tmp
     else
         SKIPPED=$((SKIPPED + 1))
+        for frame in "${frame_names[@]}"; do
+            record_metrics finish orbital "$frame" --status skipped
+        done
     fi
     
     echo "------------------------------------------------"
 done
 
+# Wait for outstanding copy-backs before counting results
+if [ ${#COPY_PIDS[@]} -gt 0 ]; then
+    echo "Waiting for ${#COPY_PIDS[@]} copy-back operations to finish..."
+    wait "${COPY_PIDS[@]}"
+fi
+rm -rf "$JOB_SCRATCH"
+
 echo "Orbital calculations completed"
 echo "Summary:"
 echo "  - Total input files: $GJF_COUNT"
-echo "  - Successfully processed: $SUCCESS"
-echo "  - Failed: $FAILED"
+echo "  - Successfully processed frames: $SUCCESS"
+echo "  - Failed frames: $FAILED"
+echo "  - Retries: $RETRIED"
 echo "  - Skipped (already existed): $SKIPPED"
 echo
 
-# Count generated files
-LOG_COUNT=$(find "$OUTPUT_DIR" -name "*.log" | wc -l)
-CUBE_COUNT=$(find "$OUTPUT_DIR" -name "*.cube" | wc -l)
-echo "Number of completed calculations: $LOG_COUNT"
-echo "Number of cube files generated: $CUBE_COUNT"
-
-if [ "$CUBE_COUNT" -gt 0 ]; then
-    echo "Results were generated in the following locations:"
-    find "$OUTPUT_DIR" -type d -not -path "$OUTPUT_DIR" | sort | head -n 10
-    DIR_COUNT=$(find "$OUTPUT_DIR" -type d -not -path "$OUTPUT_DIR" | wc -l)
-    if [ "$DIR_COUNT" -gt 10 ]; then
-        echo "... and $(($DIR_COUNT - 10)) more directories"
-    fi
-else
-    echo "WARNING: No cube files were generated. Check the log for errors."
-fi
+# Count generated files from the results catalog (one incremental scan)
+python3 "$SUBMIT_DIR/../results_catalog.py" --summary "$OUTPUT_DIR"
 
 echo "Job completed"
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Follow orbital identities along trajectory frames.
+
+Orbital energies cross during a decomposition, so "HOMO" of one frame can be
+a different orbital from "HOMO" of the next. This script:
+1. Reads the alpha MO coefficients of consecutive .fchk files of a trajectory
+2. Recovers each frame's AO overlap from its orthonormal MOs (C^T S C = 1,
+   so S = (C C^T)^-1) and computes the MO overlaps between consecutive
+   frames, |C_f^T S C_f+1|, for a whole block of frames at once
+3. Assigns every tracked orbital (labelled by its position in the first
+   frame, e.g. HOMO, LUMO+1) to the orbital of the next frame it overlaps
+   most, greedily from the largest overlap down
+4. Writes orbital_tracking.json with the MO number of every label in every
+   frame, which generate_inputs.py --tracking and
+   submit_orbital_calculations.sh use to choose the orbitals to cube
+
+The AO overlap between two frames is approximated by the average of the two
+frames' overlaps, which holds for the small displacements between frames. The
+basis functions must keep their orientation, so trajectories should be
+aligned (generate_orbitals_from_xyz.py --align, which also sets nosymm).
+
+Usage:
+    python track_orbitals.py track ./orbital_results --orbitals HOMO-1 HOMO LUMO LUMO+1
+    python track_orbitals.py update orbital_results/CF2O/800K/orbital_tracking.json CF2O_800K_step0005.fchk
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from results_catalog import classify_artifact, find_artifacts
+
+LABEL_PATTERN = re.compile(r'^(HOMO|LUMO)([+-]\d+)?$', re.IGNORECASE)
+TRACKING_NAME = "orbital_tracking.json"
+DEFAULT_LABELS = ["HOMO", "LUMO"]
+# Matches below this overlap are reported; the orbital probably mixed or the frames are not aligned
+WEAK_OVERLAP = 0.5
+# Written into every tracking file, since it limits how far the assignments can be trusted
+AO_OVERLAP_NOTE = ("cross-frame AO overlap approximated by the average of the two frames' "
+                   "overlaps; valid for small displacements between aligned (nosymm) frames")
+# Frames whose coefficients are held in memory at once
+BLOCK_FRAMES = 32
+
+def read_mo_data(fchk_file):
+    """Return (alpha MO coefficients as (basis functions, MOs), number of alpha electrons)."""
+    n_alpha = None
+    energies = coefficients = None
+    with open(fchk_file, 'r') as f:
+        line = f.readline()
+        while line and coefficients is None:
+            label = line[:43].strip()
+            if label == "Number of alpha electrons":
+                n_alpha = int(line.split()[-1])
+            elif label in ("Alpha Orbital Energies", "Alpha MO coefficients") and "N=" in line:
+                count = int(line.split("N=")[1])
+                values = []
+                while len(values) < count:
+                    values.extend(f.readline().split())
+                if label == "Alpha Orbital Energies":
+                    energies = np.array(values, dtype=float)
+                else:
+                    coefficients = np.array(values, dtype=float)
+            line = f.readline()
+
+    if n_alpha is None or energies is None or coefficients is None:
+        raise ValueError(f"{fchk_file}: no alpha MO coefficients")
+    # Stored MO by MO; columns are MOs after the transpose
+    return coefficients.reshape(len(energies), -1).T, n_alpha
+
+def label_index(label, n_alpha):
+    """0-based MO index of a label such as HOMO, HOMO-2 or LUMO+1."""
+    match = LABEL_PATTERN.match(label)
+    if not match:
+        raise ValueError(f"Unknown orbital label: {label}")
+    base = n_alpha - 1 if match.group(1).upper() == "HOMO" else n_alpha
+    return base + int(match.group(2) or 0)
+
+def ao_overlap(coefficients):
+    """AO overlap matrices from MO coefficients shaped (..., basis functions, MOs)."""
+    product = coefficients @ np.swapaxes(coefficients, -1, -2)
+    if coefficients.shape[-1] == coefficients.shape[-2]:
+        return np.linalg.inv(product)
+    # Linearly dependent functions were removed; the pseudo-inverse still gives C^T S C = 1
+    return np.linalg.pinv(product, hermitian=True)
+
+def frame_overlaps(coefficients, overlaps=None):
+    """
+    |MO overlap| between consecutive frames, shaped (frames - 1, MOs, MOs).
+
+    Element [f, i, j] is the overlap of orbital i of frame f with orbital j of
+    frame f + 1, using the average AO overlap of the two frames.
+    """
+    if overlaps is None:
+        overlaps = ao_overlap(coefficients)
+    pair = 0.5 * (overlaps[:-1] + overlaps[1:])
+    return np.abs(np.swapaxes(coefficients[:-1], -1, -2) @ pair @ coefficients[1:])
+
+def assign(overlap, current):
+    """
+    Follow the orbitals at indices `current` into the next frame.
+
+    Pairs are taken greedily from the largest overlap down, each orbital of
+    the next frame at most once. Returns (next indices, matched overlaps).
+    """
+    rows = overlap[current]
+    following = np.full(len(current), -1)
+    matched = np.zeros(len(current))
+    taken = set()
+    for flat in np.argsort(rows, axis=None)[::-1]:
+        row, column = divmod(int(flat), rows.shape[1])
+        if following[row] >= 0 or column in taken:
+            continue
+        following[row] = column
+        matched[row] = rows[row, column]
+        taken.add(column)
+        if len(taken) == len(current):
+            break
+    return following, matched
+
+def frame_record(fchk_file, labels, indices, matched=None):
+    """One frame's entry of the tracking file (MO numbers are 1-based, as cubegen expects)."""
+    fchk_file = Path(fchk_file)
+    record = {
+        'frame': fchk_file.stem,
+        'step': classify_artifact(fchk_file.name)[1],
+        'mo': {label: int(index) + 1 for label, index in zip(labels, indices)},
+    }
+    if matched is not None:
+        record['overlap'] = {label: round(float(value), 4) for label, value in zip(labels, matched)}
+    return record
+
+def track_series(fchk_files, labels=None, block=BLOCK_FRAMES):
+    """Track the labelled orbitals of the first frame through the frames; return the records."""
+    labels = labels or DEFAULT_LABELS
+    records = []
+    indices = None
+    previous = None
+    for start in range(0, len(fchk_files), block):
+        chunk = fchk_files[start:start + block]
+        data = [read_mo_data(f) for f in chunk]
+        coefficients = np.stack([c for c, _ in data])
+        if indices is None:
+            indices = np.array([label_index(label, data[0][1]) for label in labels])
+            records.append(frame_record(chunk[0], labels, indices))
+        # The last frame of the previous block links the blocks
+        if previous is not None:
+            coefficients = np.concatenate([previous[None], coefficients])
+            chunk = [None] + chunk
+        for f, overlap in enumerate(frame_overlaps(coefficients)):
+            indices, matched = assign(overlap, indices)
+            records.append(frame_record(chunk[f + 1], labels, indices, matched))
+        previous = coefficients[-1]
+    return records
+
+def fchk_series(base_dir):
+    """Return {"molecule/temperature": [.fchk files sorted by step]} for frame checkpoints."""
+    series = {}
+    for fchk_file in find_artifacts(base_dir, ["fchk"]):
+        step = classify_artifact(fchk_file.name)[1]
+        if step is None:
+            continue
+        key = f"{fchk_file.parent.parent.name}/{fchk_file.parent.name}"
+        series.setdefault(key, []).append((step, fchk_file))
+    return {key: [f for _, f in sorted(frames)] for key, frames in sorted(series.items())}
+
+def weak_matches(records):
+    """(frame, label, overlap) for assignments below WEAK_OVERLAP."""
+    return [(record['frame'], label, value)
+            for record in records
+            for label, value in record.get('overlap', {}).items()
+            if value < WEAK_OVERLAP]
+
+def update_tracking(tracking_file, fchk_file, labels=None):
+    """
+    Add one frame to a trajectory's tracking file; return its 0-based MO indices.
+
+    The coefficients of the last two frames are kept next to the tracking
+    file (same name, .npz), so frames can be added one at a time as they
+    finish. Records are keyed by frame: a rerun of the latest frame is
+    compared with its predecessor again and replaces its record, and a rerun
+    of an earlier frame keeps the indices already recorded.
+    """
+    tracking_file = Path(tracking_file)
+    state_file = tracking_file.with_suffix(".npz")
+    tracking = {'labels': labels or DEFAULT_LABELS, 'frames': []}
+    if tracking_file.exists():
+        with open(tracking_file, 'r') as f:
+            tracking = json.load(f)
+    tracking['ao_overlap'] = AO_OVERLAP_NOTE
+    labels = tracking['labels']
+    frame = Path(fchk_file).stem
+
+    state = {}
+    if state_file.exists():
+        with np.load(state_file) as saved:
+            state = {key: saved[key] for key in saved.files}
+    latest = str(state['frame']) if 'frame' in state else None
+    recorded = {record['frame']: n for n, record in enumerate(tracking['frames'])}
+    if frame in recorded and frame != latest:
+        record = tracking['frames'][recorded[frame]]
+        return np.array([record['mo'][label] - 1 for label in labels])
+
+    # The frame to compare with: the latest one, or its predecessor on a rerun
+    slot = "previous_" if frame == latest else ""
+    coefficients, n_alpha = read_mo_data(fchk_file)
+    overlaps = ao_overlap(coefficients)
+    matched = None
+    if f"{slot}coefficients" in state and state[f"{slot}coefficients"].shape == coefficients.shape:
+        overlap = frame_overlaps(np.stack([state[f"{slot}coefficients"], coefficients]),
+                                 np.stack([state[f"{slot}overlaps"], overlaps]))[0]
+        indices, matched = assign(overlap, state[f"{slot}indices"])
+    if matched is None:
+        indices = np.array([label_index(label, n_alpha) for label in labels])
+
+    if frame != latest:
+        state = {f"previous_{key}": value for key, value in state.items()
+                 if not key.startswith("previous_")}
+    state.update(frame=frame, coefficients=coefficients, overlaps=overlaps, indices=indices)
+    with open(state_file, 'wb') as f:
+        np.savez(f, **state)
+
+    record = frame_record(fchk_file, labels, indices, matched)
+    if frame in recorded:
+        tracking['frames'][recorded[frame]] = record
+    else:
+        tracking['frames'].append(record)
+    with open(tracking_file, 'w') as f:
+        json.dump(tracking, f, indent=1)
+    return indices
+
+def load_tracking(tracking_file):
+    """Return {frame name: {label: MO number}} from a tracking file (whole tree or one trajectory)."""
+    with open(tracking_file, 'r') as f:
+        tracking = json.load(f)
+    series = [tracking] if 'frames' in tracking else tracking.values()
+    return {record['frame']: record['mo'] for entry in series for record in entry['frames']}
+
+def main():
+    parser = argparse.ArgumentParser(description="Track orbital identities along trajectory frames")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    track_parser = subparsers.add_parser("track", help="Track every trajectory below a directory")
+    track_parser.add_argument("base_dir", help="Directory with <molecule>/<temperature>/*_stepNNNN.fchk")
+    track_parser.add_argument("--orbitals", nargs="+", default=DEFAULT_LABELS,
+                            help="Orbitals to track, as labelled in the first frame (default: HOMO LUMO)")
+    track_parser.add_argument("--output", default=TRACKING_NAME,
+                            help=f"Tracking file (default: {TRACKING_NAME})")
+
+    update_parser = subparsers.add_parser("update", help="Add one finished frame to a trajectory's tracking file")
+    update_parser.add_argument("tracking_file")
+    update_parser.add_argument("fchk_file")
+    update_parser.add_argument("--orbitals", nargs="+", default=DEFAULT_LABELS,
+                             help="Orbitals to track when the file is new (default: HOMO LUMO)")
+
+    args = parser.parse_args()
+
+    if args.command == "update":
+        # MO numbers for cubegen, in label order
+        indices = update_tracking(args.tracking_file, args.fchk_file, args.orbitals)
+        print(" ".join(str(int(i) + 1) for i in indices))
+        return
+
+    if not os.path.isdir(args.base_dir):
+        print(f"Error: Directory '{args.base_dir}' not found!")
+        sys.exit(1)
+
+    tracking = {}
+    for key, fchk_files in fchk_series(args.base_dir).items():
+        records = track_series(fchk_files, args.orbitals)
+        tracking[key] = {'labels': args.orbitals, 'ao_overlap': AO_OVERLAP_NOTE, 'frames': records}
+        reordered = sum(1 for record in records[1:]
+                        if any(record['mo'][label] != records[0]['mo'][label] for label in args.orbitals))
+        print(f"{key}: {len(records)} frames, {reordered} with reordered orbitals")
+        for frame, label, value in weak_matches(records):
+            print(f"  WARNING: {label} in {frame} matched with overlap {value:.2f}")
+
+    if not tracking:
+        print("No frame checkpoints (*_stepNNNN.fchk) found.")
+        sys.exit(1)
+    with open(args.output, 'w') as f:
+        json.dump(tracking, f, indent=1)
+    print(f"\nNote: {AO_OVERLAP_NOTE}")
+    print(f"Tracking written to {args.output}")
+
+if __name__ == "__main__":
+    main()
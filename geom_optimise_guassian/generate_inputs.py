@@ -4,10 +4,9 @@
 Script to generate Gaussian input files for reaction optimization study using SMILES
 """
 
+import argparse
 import os
 from pathlib import Path
-from rdkit import Chem
-from rdkit.Chem import AllChem
 
 def get_connectivity_matrix(mol):
     """Generate connectivity matrix from RDKit molecule"""
@@ -194,11 +193,24 @@ molecules = {
 }
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate optimization inputs from SMILES")
+    parser.add_argument("--output-dir", default="gaussian_projects",
+                      help="Directory for the input files (default: gaussian_projects)")
+    parser.add_argument("--molecules", nargs="+", choices=list(molecules),
+                      help="Only generate these molecules (default: all)")
+    
+    args = parser.parse_args()
+    
+    # RDKit is only needed once there is something to embed
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    
     # Create output directory if it doesn't exist
-    os.makedirs("gaussian_projects", exist_ok=True)
+    os.makedirs(args.output_dir, exist_ok=True)
     
     # Generate input files for each molecule
-    for name, specs in molecules.items():
+    for name in args.molecules or molecules:
+        specs = molecules[name]
         try:
             # Create RDKit molecule from SMILES
             mol = Chem.MolFromSmiles(specs['smiles'])
@@ -219,7 +231,8 @@ def main():
                 mol=mol,
                 name=name,
                 charge=specs['charge'],
-                multiplicity=specs['multiplicity']
+                multiplicity=specs['multiplicity'],
+                output_dir=args.output_dir
             )
             print(f"Created input file for {name}")
             
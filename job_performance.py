@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Record what our Gaussian jobs cost.
+
+This script:
+1. Harvests timing and size information from every Gaussian .log file under
+   the orbital, ADMP and barrier result directories
+2. Stores one row per log in a SQLite table (job_performance.db)
+3. Reports CPU-hours per molecule/stage and parallel efficiency per core count
+
+Logs are only re-parsed when their size or modification time changes.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+from results_catalog import find_artifacts
+
+ROOT = Path(__file__).resolve().parent
+
+# Directories searched for logs, with the stage each one belongs to
+DEFAULT_SEARCH_DIRS = {
+    'orbital': ROOT / "generate_orbitals_from_ADMP" / "orbital_results",
+    'admp': ROOT / "ADMP_decomposition_gaussian" / "admp_jobs" / "results",
+    'barrier': ROOT / "barrier_energy_guassian",
+    'geom': ROOT / "geom_optimise_guassian",
+}
+
+DEFAULT_DB = ROOT / "job_performance.db"
+
+TIME_PATTERN = re.compile(
+    r'(\d+) days\s+(\d+) hours\s+(\d+) minutes\s+([\d.]+) seconds'
+)
+SCF_DONE_PATTERN = re.compile(r'SCF Done:.*after\s+(\d+) cycles')
+LEAVE_LINK_PATTERN = re.compile(r'Leave Link\s+(\d+).*cpu:\s*([\d.]+)\s+elap:\s*([\d.]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    log_path TEXT PRIMARY KEY,
+    stage TEXT,
+    molecule TEXT,
+    temperature TEXT,
+    job_type TEXT,
+    method TEXT,
+    basis TEXT,
+    natoms INTEGER,
+    nbasis INTEGER,
+    nprocshared INTEGER,
+    mem TEXT,
+    cpu_seconds REAL,
+    elapsed_seconds REAL,
+    scf_count INTEGER,
+    scf_cycles INTEGER,
+    link_times TEXT,
+    status TEXT,
+    log_size INTEGER,
+    log_mtime_ns INTEGER
+)
+"""
+
+def parse_duration(line):
+    """Convert a Gaussian "N days N hours N minutes N seconds" line to seconds."""
+    match = TIME_PATTERN.search(line)
+    if not match:
+        return 0.0
+    days, hours, minutes, seconds = match.groups()
+    return int(days) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def classify_job_type(route):
+    """Return a short job type label from a route section."""
+    route = route.lower()
+    if "admp" in route:
+        return "admp"
+    if "irc" in route:
+        return "irc"
+    if "opt" in route and "ts" in route:
+        return "ts"
+    if "opt" in route:
+        return "opt+freq" if "freq" in route else "opt"
+    if "freq" in route:
+        return "freq"
+    return "sp"
+
+def route_method_basis(route):
+    """Method and basis from the first route token containing a slash."""
+    # Only the "#", "#P", "#N" or "#T" prefix is dropped; lstrip() would also
+    # eat leading letters of methods such as PBE0 or TPSSh
+    for token in re.sub(r'^#(?:[pPnNtT](?=\s|$))?\s*', '', route).split():
+        if "/" in token:
+            method, basis = token.split("/", 1)
+            return method, basis
+    return None, None
+
+def parse_gaussian_log(log_file):
+    """
+    Extract timing, size and settings from a Gaussian log file.
+
+    The file is streamed line by line. Jobs chained with --Link1-- are
+    accumulated: CPU and elapsed times, SCF counts and link timings are summed.
+    """
+    info = {
+        'route': "",
+        'job_type': None,
+        'method': None,
+        'basis': None,
+        'natoms': None,
+        'nbasis': None,
+        'nprocshared': None,
+        'mem': None,
+        'cpu_seconds': 0.0,
+        'elapsed_seconds': 0.0,
+        'scf_count': 0,
+        'scf_cycles': 0,
+        'link_times': {},
+        'normal_terminations': 0,
+        'error_termination': False,
+    }
+    route_lines = None
+
+    with open(log_file, 'r', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+
+            if route_lines is not None:
+                # Route section ends at the dashed separator
+                if stripped.startswith("---"):
+                    if not info['route']:
+                        info['route'] = " ".join(route_lines)
+                    route_lines = None
+                else:
+                    route_lines.append(stripped)
+            elif stripped.startswith("#") and not info['route']:
+                route_lines = [stripped]
+            elif stripped.startswith("%nprocshared=") or stripped.startswith("%nproc="):
+                info['nprocshared'] = int(stripped.split("=")[1])
+            elif stripped.startswith("%mem="):
+                info['mem'] = stripped.split("=")[1]
+            elif stripped.startswith("NAtoms=") and info['natoms'] is None:
+                info['natoms'] = int(stripped.split()[1])
+            elif stripped.startswith("NBasis=") and info['nbasis'] is None:
+                info['nbasis'] = int(stripped.split()[1])
+            elif stripped.startswith("SCF Done:"):
+                info['scf_count'] += 1
+                match = SCF_DONE_PATTERN.search(stripped)
+                if match:
+                    info['scf_cycles'] += int(match.group(1))
+            elif stripped.startswith("Leave Link"):
+                match = LEAVE_LINK_PATTERN.search(stripped)
+                if match:
+                    link, cpu, elap = match.groups()
+                    totals = info['link_times'].setdefault(link, [0.0, 0.0])
+                    totals[0] += float(cpu)
+                    totals[1] += float(elap)
+            elif stripped.startswith("Job cpu time:"):
+                info['cpu_seconds'] += parse_duration(stripped)
+            elif stripped.startswith("Elapsed time:"):
+                info['elapsed_seconds'] += parse_duration(stripped)
+            elif stripped.startswith("Normal termination"):
+                info['normal_terminations'] += 1
+            elif stripped.startswith("Error termination"):
+                info['error_termination'] = True
+
+    if info['route']:
+        info['job_type'] = classify_job_type(info['route'])
+        info['method'], info['basis'] = route_method_basis(info['route'])
+
+    if info['error_termination']:
+        info['status'] = "error"
+    elif info['normal_terminations']:
+        info['status'] = "normal"
+    else:
+        info['status'] = "incomplete"
+
+    return info
+
+def job_labels(log_file, stage, base_dir):
+    """Derive molecule and temperature labels from a log's location."""
+    rel_parts = Path(log_file).relative_to(base_dir).parts
+    if stage in ('orbital', 'admp') and len(rel_parts) >= 3:
+        return rel_parts[0], rel_parts[1]
+    return Path(log_file).stem, None
+
+def connect(db_path=DEFAULT_DB):
+    """Open the performance database, creating the table if needed."""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(SCHEMA)
+    return conn
+
+def harvest(conn, search_dirs=None):
+    """
+    Parse new or changed logs into the database.
+
+    Returns the number of logs (re)parsed.
+    """
+    if search_dirs is None:
+        search_dirs = DEFAULT_SEARCH_DIRS
+
+    known = {row[0]: (row[1], row[2]) for row in
+             conn.execute("SELECT log_path, log_size, log_mtime_ns FROM jobs")}
+    updated = 0
+
+    for stage, base_dir in search_dirs.items():
+        base_dir = Path(os.path.abspath(base_dir))
+        if not base_dir.exists():
+            continue
+        for log_path in find_artifacts(base_dir, ["log"]):
+            log_path = str(log_path)
+            stat = os.stat(log_path)
+            if known.get(log_path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+
+            info = parse_gaussian_log(log_path)
+            if not info['route']:
+                # Not a Gaussian log (e.g. a SLURM job log)
+                continue
+            molecule, temperature = job_labels(log_path, stage, base_dir)
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (log_path, stage, molecule, temperature, info['job_type'], info['method'],
+                 info['basis'], info['natoms'], info['nbasis'], info['nprocshared'], info['mem'],
+                 info['cpu_seconds'], info['elapsed_seconds'], info['scf_count'],
+                 info['scf_cycles'], json.dumps(info['link_times']), info['status'],
+                 stat.st_size, stat.st_mtime_ns)
+            )
+            updated += 1
+
+    conn.commit()
+    return updated
+
+def cpu_hours_report(conn):
+    """Return (stage, molecule, jobs, cpu_hours, elapsed_hours) rows."""
+    return conn.execute("""
+        SELECT stage, molecule, COUNT(*), SUM(cpu_seconds) / 3600.0, SUM(elapsed_seconds) / 3600.0
+        FROM jobs GROUP BY stage, molecule ORDER BY stage, SUM(cpu_seconds) DESC
+    """).fetchall()
+
+def efficiency_report(conn):
+    """
+    Return (nprocshared, jobs, mean efficiency) rows.
+
+    Parallel efficiency is CPU time divided by elapsed time times cores, for
+    jobs that terminated normally.
+    """
+    return conn.execute("""
+        SELECT nprocshared, COUNT(*), AVG(cpu_seconds / (elapsed_seconds * nprocshared))
+        FROM jobs
+        WHERE status = 'normal' AND elapsed_seconds > 0 AND nprocshared > 0
+        GROUP BY nprocshared ORDER BY nprocshared
+    """).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest Gaussian job timings into SQLite")
+    parser.add_argument("--db", default=str(DEFAULT_DB),
+                      help="SQLite database file (default: job_performance.db)")
+    parser.add_argument("--no-harvest", action="store_true",
+                      help="Only report from the existing database")
+
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if not args.no_harvest:
+        updated = harvest(conn)
+        print(f"Parsed {updated} new or changed log files into {args.db}")
+
+    print("\nCPU-hours per stage and molecule:")
+    print(f"  {'stage':<10}{'molecule':<20}{'jobs':>6}{'cpu h':>10}{'wall h':>10}")
+    for stage, molecule, jobs, cpu_h, wall_h in cpu_hours_report(conn):
+        print(f"  {stage:<10}{molecule:<20}{jobs:>6}{cpu_h:>10.2f}{wall_h:>10.2f}")
+
+    print("\nParallel efficiency per core count:")
+    print(f"  {'cores':>6}{'jobs':>6}{'efficiency':>12}")
+    for cores, jobs, efficiency in efficiency_report(conn):
+        print(f"  {cores:>6}{jobs:>6}{efficiency:>12.2f}")
+
+    conn.close()
+
+if __name__ == "__main__":
+    main()
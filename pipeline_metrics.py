@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Throughput metrics for running batches of Gaussian jobs.
+
+The job runners call this script as each job moves through its stages. Every
+update:
+1. Locks and updates a shared state file (several runners may write to the
+   same metrics directory)
+2. Rewrites gaussian_pipeline.prom, a Prometheus textfile with job counts by
+   state, per-stage latency histograms, per-frame SCF cycle and CPU-second
+   histograms and the age of every running stage
+3. Rewrites gaussian_pipeline.json, a snapshot with the same numbers plus the
+   longest-running jobs, for watching throughput and spotting stragglers
+
+A runner's "start" opens a batch, identified by $SLURM_JOB_ID (or --batch).
+Rerunning or resuming replaces the runner's previous batch instead of adding
+to it, so pending jobs are counted against the latest batch only; jobs keep
+their history, and a job skipped because it already finished stays done.
+Runners that run concurrently should use different runner names.
+
+The metrics directory defaults to $METRICS_DIR or ./metrics.
+
+Usage (from a runner):
+    python pipeline_metrics.py start orbital --total 120
+    python pipeline_metrics.py stage orbital CF2O_800K_step0000 g16
+    python pipeline_metrics.py stage orbital CF2O_800K_step0000 cubegen
+    python pipeline_metrics.py finish orbital CF2O_800K_step0000 --status done --log CF2O_800K_step0000.log
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+STATE_NAME = "pipeline_state.json"
+PROM_NAME = "gaussian_pipeline.prom"
+SNAPSHOT_NAME = "gaussian_pipeline.json"
+
+STAGE_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+SCF_BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+CPU_BUCKETS = (10, 60, 300, 900, 3600, 14400, 86400, 345600)
+JOB_STATES = ("pending", "running", "done", "failed", "skipped")
+
+def metrics_dir(path=None):
+    """Directory holding the state, textfile and snapshot."""
+    return Path(path or os.environ.get("METRICS_DIR", "./metrics"))
+
+def read_state(directory):
+    """The shared state without locking or writing; files are replaced atomically."""
+    state_file = directory / STATE_NAME
+    if not state_file.exists():
+        return {'runners': {}}
+    with open(state_file, 'r') as f:
+        return json.load(f)
+
+@contextmanager
+def locked_state(directory):
+    """Yield the shared state under an exclusive lock and write it back atomically."""
+    directory.mkdir(parents=True, exist_ok=True)
+    state_file = directory / STATE_NAME
+    with open(directory / f"{STATE_NAME}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        state = {'runners': {}}
+        if state_file.exists():
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+        yield state
+        write_atomic(state_file, json.dumps(state))
+        write_outputs(state, directory)
+
+def write_atomic(path, text):
+    """Replace a file in one step, so readers never see a partial file."""
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def new_histogram(buckets):
+    return {'buckets': list(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+def observe(histogram, value):
+    """Add one observation; counts are per bucket and made cumulative on output."""
+    for i, bound in enumerate(histogram['buckets']):
+        if value <= bound:
+            histogram['counts'][i] += 1
+            break
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+def runner_state(state, runner):
+    return state['runners'].setdefault(runner, {
+        'total': 0,
+        'batch': None,
+        'batches': {},
+        'started': time.time(),
+        'jobs': {},
+        'stages': {},
+        'scf_cycles': new_histogram(SCF_BUCKETS),
+        'cpu_seconds': new_histogram(CPU_BUCKETS),
+    })
+
+def end_stage(runner, job, now):
+    """Record the duration of the job's current stage, if any."""
+    stage = job.get('stage')
+    if stage and job.get('stage_started'):
+        histogram = runner['stages'].setdefault(stage, new_histogram(STAGE_BUCKETS))
+        observe(histogram, now - job['stage_started'])
+    job['stage'] = None
+    job['stage_started'] = None
+
+def start(state, runner_name, total, batch):
+    """Begin a batch of `total` jobs; it replaces the runner's previous batch."""
+    runner = runner_state(state, runner_name)
+    runner.setdefault('batches', {})[batch] = {'total': total, 'started': time.time()}
+    runner['batch'] = batch
+    runner['total'] = total
+
+def stage(state, runner_name, job_name, stage_name):
+    """Move a job into a stage, closing the previous one."""
+    now = time.time()
+    runner = runner_state(state, runner_name)
+    job = runner['jobs'].setdefault(job_name, {'state': "running", 'started': now})
+    end_stage(runner, job, now)
+    job['batch'] = runner.get('batch')
+    job['state'] = "running"
+    job['stage'] = stage_name
+    job['stage_started'] = now
+
+def finish(state, runner_name, job_name, status, log_file=None):
+    """Close a job with its final status and per-frame costs from its log."""
+    now = time.time()
+    runner = runner_state(state, runner_name)
+    job = runner['jobs'].setdefault(job_name, {'started': now})
+    end_stage(runner, job, now)
+    job['batch'] = runner.get('batch')
+    if status == "skipped" and job.get('state') == "done":
+        # Skipped on a rerun because it already finished
+        return
+    job['state'] = status
+    job['finished'] = now
+
+    if log_file and os.path.exists(log_file):
+        from job_performance import parse_gaussian_log
+        info = parse_gaussian_log(log_file)
+        if info['scf_cycles']:
+            observe(runner['scf_cycles'], info['scf_cycles'])
+        if info['cpu_seconds']:
+            observe(runner['cpu_seconds'], info['cpu_seconds'])
+
+def job_counts(runner):
+    """Number of jobs per state; jobs the current batch has not reached yet count as pending."""
+    counts = dict.fromkeys(JOB_STATES, 0)
+    for job in runner['jobs'].values():
+        counts[job['state']] = counts.get(job['state'], 0) + 1
+    reached = sum(1 for job in runner['jobs'].values() if job.get('batch') == runner.get('batch'))
+    counts['pending'] += max(0, runner['total'] - reached)
+    return counts
+
+def prometheus_histogram(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram['buckets'], histogram['counts']):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram["sum"]:.3f}')
+    lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
+
+def prometheus_text(state, now):
+    """Render the state in the Prometheus text exposition format."""
+    lines = [
+        "# HELP gaussian_pipeline_jobs Jobs by state",
+        "# TYPE gaussian_pipeline_jobs gauge",
+    ]
+    for runner_name, runner in sorted(state['runners'].items()):
+        for job_state, count in job_counts(runner).items():
+            lines.append(f'gaussian_pipeline_jobs{{runner="{runner_name}",state="{job_state}"}} {count}')
+
+    lines += ["# HELP gaussian_pipeline_stage_seconds Time spent per job stage",
+              "# TYPE gaussian_pipeline_stage_seconds histogram"]
+    for runner_name, runner in sorted(state['runners'].items()):
+        for stage_name, histogram in sorted(runner['stages'].items()):
+            prometheus_histogram(lines, "gaussian_pipeline_stage_seconds",
+                                 f'runner="{runner_name}",stage="{stage_name}"', histogram)
+
+    for metric, help_text in (("scf_cycles", "SCF cycles per finished frame"),
+                              ("cpu_seconds", "Gaussian CPU seconds per finished frame")):
+        lines += [f"# HELP gaussian_pipeline_{metric} {help_text}",
+                  f"# TYPE gaussian_pipeline_{metric} histogram"]
+        for runner_name, runner in sorted(state['runners'].items()):
+            prometheus_histogram(lines, f"gaussian_pipeline_{metric}",
+                                 f'runner="{runner_name}"', runner[metric])
+
+    lines += ["# HELP gaussian_pipeline_running_stage_age_seconds Age of the current stage of running jobs",
+              "# TYPE gaussian_pipeline_running_stage_age_seconds gauge"]
+    for runner_name, runner in sorted(state['runners'].items()):
+        for job_name, job in sorted(runner['jobs'].items()):
+            if job['state'] == "running" and job.get('stage_started'):
+                lines.append(f'gaussian_pipeline_running_stage_age_seconds{{runner="{runner_name}",'
+                             f'job="{job_name}",stage="{job["stage"]}"}} {now - job["stage_started"]:.0f}')
+
+    lines += ["# HELP gaussian_pipeline_last_update_timestamp_seconds Time of the last update",
+              "# TYPE gaussian_pipeline_last_update_timestamp_seconds gauge",
+              f"gaussian_pipeline_last_update_timestamp_seconds {now:.0f}"]
+    return "\n".join(lines) + "\n"
+
+def snapshot(state, now, stragglers=10):
+    """Summary per runner: counts, throughput, stage latencies and the longest-running jobs."""
+    summary = {'updated': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)), 'runners': {}}
+    for runner_name, runner in sorted(state['runners'].items()):
+        counts = job_counts(runner)
+        hours = max(now - runner['started'], 1.0) / 3600
+        running = sorted(
+            ({'job': name, 'stage': job['stage'], 'stage_seconds': round(now - job['stage_started'])}
+             for name, job in runner['jobs'].items()
+             if job['state'] == "running" and job.get('stage_started')),
+            key=lambda item: -item['stage_seconds'])
+        summary['runners'][runner_name] = {
+            'jobs': counts,
+            'finished_per_hour': round((counts['done'] + counts['failed']) / hours, 2),
+            'stages': {name: {'count': h['count'],
+                              'mean_seconds': round(h['sum'] / h['count'], 1) if h['count'] else None}
+                       for name, h in sorted(runner['stages'].items())},
+            'mean_scf_cycles': (round(runner['scf_cycles']['sum'] / runner['scf_cycles']['count'], 1)
+                                if runner['scf_cycles']['count'] else None),
+            'mean_cpu_seconds': (round(runner['cpu_seconds']['sum'] / runner['cpu_seconds']['count'], 1)
+                                 if runner['cpu_seconds']['count'] else None),
+            'longest_running': running[:stragglers],
+        }
+    return summary
+
+def write_outputs(state, directory):
+    now = time.time()
+    write_atomic(directory / PROM_NAME, prometheus_text(state, now))
+    write_atomic(directory / SNAPSHOT_NAME, json.dumps(snapshot(state, now), indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Update pipeline throughput metrics")
+    parser.add_argument("--dir", help="Metrics directory (default: $METRICS_DIR or ./metrics)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = subparsers.add_parser("start", help="Register a batch of jobs")
+    start_parser.add_argument("runner", help="Runner name, e.g. orbital or admp")
+    start_parser.add_argument("--total", type=int, required=True, help="Jobs in the batch")
+    start_parser.add_argument("--batch", default=os.environ.get("SLURM_JOB_ID", "local"),
+                            help="Batch identifier (default: $SLURM_JOB_ID or local)")
+
+    stage_parser = subparsers.add_parser("stage", help="Move a job into a stage")
+    stage_parser.add_argument("runner")
+    stage_parser.add_argument("job")
+    stage_parser.add_argument("stage", help="Stage name, e.g. g16, formchk, cubegen")
+
+    finish_parser = subparsers.add_parser("finish", help="Record a job's final status")
+    finish_parser.add_argument("runner")
+    finish_parser.add_argument("job")
+    finish_parser.add_argument("--status", choices=["done", "failed", "skipped"], required=True)
+    finish_parser.add_argument("--log", help="Gaussian log with the job's SCF cycles and CPU time")
+
+    subparsers.add_parser("show", help="Print the JSON snapshot")
+
+    args = parser.parse_args()
+    directory = metrics_dir(args.dir)
+
+    if args.command == "show":
+        print(json.dumps(snapshot(read_state(directory), time.time()), indent=2))
+        return
+
+    with locked_state(directory) as state:
+        if args.command == "start":
+            start(state, args.runner, args.total, args.batch)
+        elif args.command == "stage":
+            stage(state, args.runner, args.job, args.stage)
+        else:
+            finish(state, args.runner, args.job, args.status, args.log)
+
+if __name__ == "__main__":
+    main()
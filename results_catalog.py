@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained catalog of result artifacts.
+
+Every file under a results tree is indexed in SQLite (results_catalog.db) by
+directory, step and type; molecule and temperature are the first two levels
+below the queried root and are derived when querying, so the same files can
+be looked up from any parent directory. Updates walk the tree with os.scandir
+and only re-list directories whose modification time changed since the last
+scan, so repeated lookups on a large tree cost one stat per directory instead
+of a full recursive listing.
+
+The database is results_catalog.db next to this script, or the file named by
+$RESULTS_CATALOG_DB (the benchmarks point it into their work directory).
+
+Note that rewriting a file in place does not change its directory's mtime;
+the catalog tracks which files exist, and --rebuild forces a full re-scan.
+
+Usage:
+    python results_catalog.py generate_orbitals_from_ADMP/orbital_results
+    python results_catalog.py --kind fchk --molecule CF2O <results_dir>
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_DB = ROOT / "results_catalog.db"
+DB_ENV = "RESULTS_CATALOG_DB"
+
+STEP_PATTERN = re.compile(r'_step(\d+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    dir TEXT,
+    name TEXT,
+    step INTEGER,
+    kind TEXT,
+    label TEXT,
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS artifacts_dir ON artifacts (dir);
+CREATE INDEX IF NOT EXISTS artifacts_kind ON artifacts (kind);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+"""
+
+def classify_artifact(name):
+    """
+    Return (kind, step, label) for a file name.
+
+    The kind is the file type including a trailing .gz ("fchk", "chk.gz"),
+    the step comes from "_stepNNNN" and the label is the cube quantity
+    ("homo", "density", ...).
+    """
+    stem, ext = os.path.splitext(name)
+    kind = ext.lstrip('.')
+    if kind == "gz":
+        stem, inner = os.path.splitext(stem)
+        kind = f"{inner.lstrip('.')}.gz"
+
+    match = STEP_PATTERN.search(stem)
+    step = int(match.group(1)) if match else None
+    label = stem.rsplit('_', 1)[-1].lower() if kind == "cube" and '_' in stem else None
+    return kind, step, label
+
+def tree_labels(directory, base_dir):
+    """(molecule, temperature) of a directory below <base_dir>/<molecule>/<temperature>/."""
+    parts = Path(directory).relative_to(base_dir).parts
+    return (parts[0], parts[1]) if len(parts) >= 2 else (None, None)
+
+def open_catalog(db_path=None):
+    """Open the catalog database, creating the tables if needed."""
+    db_path = db_path or os.environ.get(DB_ENV) or DEFAULT_DB
+    conn = sqlite3.connect(str(db_path), timeout=60)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(artifacts)")]
+    if "molecule" in columns:
+        # Catalogs written before labels were derived at query time; the
+        # tables only cache the file system, so they are rebuilt on the next scan
+        conn.executescript("DROP TABLE artifacts; DROP TABLE dirs;")
+    conn.executescript(SCHEMA)
+    return conn
+
+def under(column):
+    """SQL condition matching a path column equal to or below a directory."""
+    return f"({column} = ? OR substr({column}, 1, ?) = ?)"
+
+def under_args(base_dir):
+    """Arguments for the condition built by under()."""
+    prefix = base_dir.rstrip(os.sep) + os.sep
+    return (base_dir, len(prefix), prefix)
+
+def update_catalog(conn, base_dir):
+    """
+    Bring the catalog up to date for one results tree.
+
+    Returns the number of directories that had to be re-listed.
+    """
+    base_dir = os.path.abspath(base_dir)
+    known = {}
+    children = {}
+    for path, parent, mtime_ns in conn.execute(
+            f"SELECT path, parent, mtime_ns FROM dirs WHERE {under('path')}", under_args(base_dir)):
+        known[path] = mtime_ns
+        children.setdefault(parent, []).append(path)
+
+    relisted = 0
+    seen = set()
+    stack = [base_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        seen.add(directory)
+
+        if known.get(directory) == mtime_ns:
+            stack.extend(children.get(directory, []))
+            continue
+
+        rows = []
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    kind, step, label = classify_artifact(entry.name)
+                    # Molecule and temperature depend on the queried root; see tree_labels()
+                    rows.append((entry.path, directory, entry.name,
+                                 step, kind, label, stat.st_size, stat.st_mtime_ns))
+
+        conn.execute("DELETE FROM artifacts WHERE dir = ?", (directory,))
+        conn.executemany("INSERT OR REPLACE INTO artifacts VALUES (?,?,?,?,?,?,?,?)", rows)
+        conn.execute("INSERT OR REPLACE INTO dirs VALUES (?,?,?)",
+                     (directory, os.path.dirname(directory), mtime_ns))
+        stack.extend(subdirs)
+        relisted += 1
+
+    # Forget directories that no longer exist
+    for directory in set(known) - seen:
+        conn.execute("DELETE FROM dirs WHERE path = ?", (directory,))
+        conn.execute("DELETE FROM artifacts WHERE dir = ?", (directory,))
+
+    conn.commit()
+    return relisted
+
+def find_artifacts(base_dir, kinds, molecule=None, temperature=None,
+                   db_path=None, refresh=True):
+    """
+    Return the paths of artifacts of the given kinds below base_dir.
+
+    Args:
+        base_dir: Root of the results tree
+        kinds: File kinds to return, e.g. ["xyz"] or ["fchk", "fchk.gz"]
+        molecule: Optional molecule name filter
+        temperature: Optional temperature label filter (e.g. "800K")
+        db_path: Catalog database file (default: $RESULTS_CATALOG_DB or DEFAULT_DB)
+        refresh: Update the catalog for base_dir before querying
+    """
+    base_dir = os.path.abspath(base_dir)
+    conn = open_catalog(db_path)
+    try:
+        if refresh:
+            update_catalog(conn, base_dir)
+
+        # A molecule filter narrows the query to that molecule's subtree
+        root = os.path.join(base_dir, molecule) if molecule is not None else base_dir
+        query = f"SELECT path, dir FROM artifacts WHERE {under('dir')}"
+        args = list(under_args(root))
+        query += f" AND kind IN ({','.join('?' * len(kinds))})"
+        args += list(kinds)
+        query += " ORDER BY path"
+
+        paths = []
+        for path, directory in conn.execute(query, args):
+            mol, temp = tree_labels(directory, base_dir)
+            if molecule is not None and mol != molecule:
+                continue
+            if temperature is not None and temp != temperature:
+                continue
+            paths.append(Path(path))
+        return paths
+    finally:
+        conn.close()
+
+def list_directories(base_dir, db_path=None, refresh=True):
+    """Yield (directory, [file names]) for every cataloged directory below base_dir."""
+    base_dir = os.path.abspath(base_dir)
+    conn = open_catalog(db_path)
+    try:
+        if refresh:
+            update_catalog(conn, base_dir)
+        grouped = {}
+        for directory, name in conn.execute(
+                f"SELECT dir, name FROM artifacts WHERE {under('dir')} ORDER BY dir",
+                under_args(base_dir)):
+            grouped.setdefault(directory, []).append(name)
+    finally:
+        conn.close()
+    return list(grouped.items())
+
+def summarize(base_dir, db_path=None):
+    """Return {kind: count} and the sorted list of molecule/temperature directories."""
+    base_dir = os.path.abspath(base_dir)
+    conn = open_catalog(db_path)
+    try:
+        update_catalog(conn, base_dir)
+        counts = dict(conn.execute(
+            f"SELECT kind, COUNT(*) FROM artifacts WHERE {under('dir')} GROUP BY kind",
+            under_args(base_dir)).fetchall())
+        dirs = [row[0] for row in conn.execute(
+            f"SELECT path FROM dirs WHERE {under('path')} AND path != ? ORDER BY path",
+            under_args(base_dir) + (base_dir,))]
+    finally:
+        conn.close()
+    return counts, dirs
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the results catalog")
+    parser.add_argument("base_dir", help="Root of the results tree")
+    parser.add_argument("--kind", nargs="+",
+                      help="Artifact kinds to list (e.g. log fchk cube)")
+    parser.add_argument("--molecule", help="Only list this molecule")
+    parser.add_argument("--temperature", help="Only list this temperature (e.g. 800K)")
+    parser.add_argument("--db",
+                      help="Catalog database (default: $RESULTS_CATALOG_DB or results_catalog.db)")
+    parser.add_argument("--rebuild", action="store_true",
+                      help="Discard the cached state for this tree and re-scan it")
+    parser.add_argument("--summary", action="store_true",
+                      help="Print artifact counts and result directories")
+
+    args = parser.parse_args()
+
+    if args.rebuild:
+        conn = open_catalog(args.db)
+        base_dir = os.path.abspath(args.base_dir)
+        conn.execute(f"DELETE FROM dirs WHERE {under('path')}", under_args(base_dir))
+        conn.execute(f"DELETE FROM artifacts WHERE {under('dir')}", under_args(base_dir))
+        conn.commit()
+        conn.close()
+
+    if args.summary or not args.kind:
+        counts, dirs = summarize(args.base_dir, args.db)
+        print(f"Number of completed calculations: {counts.get('log', 0)}")
+        print(f"Number of cube files generated: {counts.get('cube', 0)}")
+        if counts.get('cube', 0):
+            print("Results were generated in the following locations:")
+            for directory in dirs[:10]:
+                print(directory)
+            if len(dirs) > 10:
+                print(f"... and {len(dirs) - 10} more directories")
+        else:
+            print("WARNING: No cube files were generated. Check the log for errors.")
+        return
+
+    for path in find_artifacts(args.base_dir, args.kind, args.molecule, args.temperature, args.db):
+        print(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Incremental driver for the whole Gaussian workflow.
+
+Stages:
+1. geom_optimise_guassian      - molecule inputs generated from SMILES
+2. ADMP_decomposition_gaussian - ADMP inputs per molecule and temperature,
+                                 XYZ trajectories extracted from finished logs
+3. generate_orbitals_from_ADMP - single-point inputs for trajectory frames
+4. barrier_energy_guassian     - TS/IRC inputs per reaction pathway
+
+Every target records a content hash of its inputs, parameters and outputs in
+pipeline_state.json. A target is rebuilt only when one of those hashes
+changed (for example one molecule's geometry or a new temperature), and
+independent targets within a stage are built in parallel.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from results_catalog import find_artifacts
+
+ROOT = Path(__file__).resolve().parent
+GEOM_DIR = ROOT / "geom_optimise_guassian"
+ADMP_DIR = ROOT / "ADMP_decomposition_gaussian"
+ORBITAL_DIR = ROOT / "generate_orbitals_from_ADMP"
+BARRIER_DIR = ROOT / "barrier_energy_guassian"
+
+STATE_FILE = ROOT / "pipeline_state.json"
+
+def load_stage_module(stage_dir, script):
+    """Import a stage script by path (several stages share script names)."""
+    name = f"{Path(stage_dir).name}_{Path(script).stem}"
+    spec = importlib.util.spec_from_file_location(name, Path(stage_dir) / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_state(state_file=STATE_FILE):
+    """Load the recorded hashes from a previous run."""
+    if Path(state_file).exists():
+        with open(state_file, 'r') as f:
+            return json.load(f)
+    return {'hashes': {}, 'targets': {}}
+
+def save_state(state, state_file=STATE_FILE):
+    """Write the recorded hashes atomically."""
+    tmp_file = Path(f"{state_file}.tmp")
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+def file_digest(path, state):
+    """
+    Return the SHA-256 of a file's contents.
+
+    Digests are cached by size and modification time so large logs are only
+    re-read when they actually change.
+    """
+    path = str(path)
+    stat = os.stat(path)
+    cached = state['hashes'].get(path)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    state['hashes'][path] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+def params_digest(params):
+    """Return a stable hash of a target's parameters."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+def make_target(name, inputs, params, build):
+    """
+    Describe a single build target.
+
+    Args:
+        name: Unique target name, used as the key in the state file
+        inputs: Files whose contents the target depends on
+        params: JSON-serialisable parameters that affect the outputs
+        build: Callable returning (output paths, metadata)
+    """
+    return {'name': name, 'inputs': [str(p) for p in inputs], 'params': params, 'build': build}
+
+def is_stale(target, state):
+    """Check whether a target's inputs, parameters or outputs changed."""
+    record = state['targets'].get(target['name'])
+    if record is None:
+        return True
+    if record['params'] != params_digest(target['params']):
+        return True
+
+    current_inputs = {p: file_digest(p, state) for p in target['inputs'] if Path(p).exists()}
+    if current_inputs != record['inputs']:
+        return True
+
+    for path, digest in record['outputs'].items():
+        if not Path(path).exists() or file_digest(path, state) != digest:
+            return True
+    return False
+
+def build_targets(targets, state, jobs=4, dry_run=False):
+    """Rebuild the stale targets of one stage in parallel."""
+    stale = [t for t in targets if is_stale(t, state)]
+    print(f"  {len(stale)} of {len(targets)} targets out of date")
+    if dry_run or not stale:
+        for target in stale:
+            print(f"  - would rebuild {target['name']}")
+        return 0
+
+    for target in stale:
+        # Remove outputs of the previous build; generators skip existing files
+        record = state['targets'].get(target['name'])
+        for path in (record or {}).get('outputs', {}):
+            if Path(path).exists():
+                os.remove(path)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(target['build']): target for target in stale}
+        for future, target in futures.items():
+            try:
+                outputs, meta = future.result()
+            except Exception as e:
+                print(f"  ✗ ERROR: {target['name']} failed: {e}")
+                state['targets'].pop(target['name'], None)
+                failed += 1
+                continue
+
+            state['targets'][target['name']] = {
+                'params': params_digest(target['params']),
+                'inputs': {p: file_digest(p, state) for p in target['inputs'] if Path(p).exists()},
+                'outputs': {str(p): file_digest(p, state) for p in outputs if Path(p).exists()},
+                'meta': meta
+            }
+            print(f"  ✓ Rebuilt {target['name']}")
+    return failed
+
+def geom_targets():
+    """Molecule inputs regenerated when the SMILES definitions change."""
+    script = GEOM_DIR / "generate_inputs.py"
+
+    def build():
+        subprocess.run([sys.executable, script.name], cwd=GEOM_DIR, check=True)
+        return sorted((GEOM_DIR / "gaussian_projects").glob("*.gjf")), {}
+
+    return [make_target("geom", [script], {}, build)]
+
+def admp_input_targets(config):
+    """One ADMP input per molecule and temperature."""
+    admp = load_stage_module(ADMP_DIR, "generate_admp_inputs.py")
+    params = {k: config[k] for k in ('max_points', 'delta_t', 'method', 'basis', 'mem', 'nproc', 'rstf')}
+    targets = []
+
+    for molecule_path in sorted((GEOM_DIR / "gaussian_projects").glob("*.gjf")):
+        for temp in config['temperatures']:
+            temp_dir = ADMP_DIR / config['output_dir'] / f"{temp}K"
+            output = temp_dir / f"{molecule_path.stem}_ADMP_{temp}K.gjf"
+
+            def build(molecule_path=molecule_path, temp=temp, temp_dir=temp_dir, output=output):
+                temp_dir.mkdir(parents=True, exist_ok=True)
+                admp.create_admp_input(molecule_path=molecule_path, temp=temp,
+                                       output_dir=temp_dir, **params)
+                return [output], {}
+
+            targets.append(make_target(f"admp_input:{molecule_path.stem}:{temp}K",
+                                       [molecule_path], dict(params, temp=temp), build))
+    return targets
+
+def barrier_targets():
+    """TS and IRC inputs per reaction pathway."""
+    barrier = load_stage_module(BARRIER_DIR, "generate_inputs.py")
+    geom_opt_dir = GEOM_DIR / "gaussian_projects"
+    base_dir = BARRIER_DIR / "barrier_energy_gaussian"
+    reaction_paths = barrier.setup_reaction_paths()
+    targets = []
+
+    for rxn_name, components in reaction_paths.items():
+        reactant_file = geom_opt_dir / f"{components['reactant']}.gjf"
+        product_files = [geom_opt_dir / f"{p}.gjf" for p in components['products']]
+
+        def build(components=components, reactant_file=reactant_file, product_files=product_files):
+            base_dir.mkdir(exist_ok=True)
+            ts_name = components['ts_name']
+            barrier.create_ts_input(reactant_file, product_files[0], ts_name, base_dir)
+            charge, multiplicity = barrier.read_charge_multiplicity(reactant_file)
+            irc_file = barrier.create_irc_input(ts_name, charge, multiplicity, base_dir)
+            return [base_dir / f"{ts_name}.gjf", irc_file], {}
+
+        targets.append(make_target(f"barrier:{rxn_name}", [reactant_file] + product_files,
+                                   components, build))
+
+    species = {s for c in reaction_paths.values() for s in [c['reactant']] + c['products']}
+    for name in sorted(species):
+        source = geom_opt_dir / f"{name}.gjf"
+
+        def build_copy(source=source):
+            base_dir.mkdir(exist_ok=True)
+            shutil.copy2(source, base_dir)
+            return [base_dir / source.name], {}
+
+        targets.append(make_target(f"barrier_species:{name}", [source], {}, build_copy))
+
+    def build_script():
+        base_dir.mkdir(exist_ok=True)
+        barrier.create_barrier_calculation_script(base_dir, reaction_paths)
+        return [base_dir / "calculate_barriers.py"], {}
+
+    targets.append(make_target("barrier:calculate_barriers", [], reaction_paths, build_script))
+    return targets
+
+def xyz_targets(config):
+    """One XYZ trajectory per finished ADMP log, or per set of segment logs."""
+    get_xyz = load_stage_module(ADMP_DIR, "get_xyz.py")
+    results_dir = ADMP_DIR / config['output_dir'] / "results"
+    targets = []
+
+    logs = [log for log in find_artifacts(results_dir, ["log"]) if "_ADMP_" in log.name]
+    single, segmented = get_xyz.group_segment_logs(logs)
+
+    for log_file in single:
+        def build(log_file=log_file):
+            if not get_xyz.process_log_file(str(log_file)):
+                raise RuntimeError(f"could not extract frames from {log_file}")
+            return [log_file.with_suffix('.xyz')], {}
+
+        targets.append(make_target(f"xyz:{log_file.relative_to(results_dir)}", [log_file], {}, build))
+
+    for trajectory_log, segment_logs in sorted(segmented.items()):
+        trajectory_log = Path(trajectory_log)
+        def build(segment_logs=segment_logs, trajectory_log=trajectory_log):
+            if not get_xyz.stitch_segment_logs([str(log) for log in segment_logs]):
+                raise RuntimeError(f"could not stitch segments of {trajectory_log}")
+            return [trajectory_log.with_suffix('.xyz')], {}
+
+        targets.append(make_target(f"xyz:{trajectory_log.relative_to(results_dir)}",
+                                   sorted(segment_logs), {}, build))
+    return targets
+
+def orbital_input_targets(config):
+    """Single-point inputs for the selected frames of each trajectory."""
+    orbitals = load_stage_module(ORBITAL_DIR, "generate_orbitals_from_xyz.py")
+    results_dir = ADMP_DIR / config['output_dir'] / "results"
+    output_dir = ORBITAL_DIR / "orbital_inputs"
+    params = {k: config[k] for k in ('max_frames', 'orbital_method', 'orbital_basis', 'align',
+                                      'batch_size')}
+    targets = []
+
+    for xyz_file in find_artifacts(results_dir, ["xyz"]):
+        # Segment trajectories repeat frames of the stitched trajectory
+        if orbitals.SEGMENT_PATTERN.search(xyz_file.stem):
+            continue
+        def build(xyz_file=xyz_file):
+            molecule, temp, inputs = orbitals.process_xyz_file(
+                xyz_file, output_dir, config['max_frames'],
+                config['orbital_method'], config['orbital_basis'], config['align'],
+                batch_size=config['batch_size']
+            )
+            outputs = sorted({record['input_file'] for record in inputs})
+            outputs += sorted({record['grid'] for record in inputs if 'grid' in record})
+            for record in inputs:
+                record['input_file'] = os.path.relpath(record['input_file'], ORBITAL_DIR)
+                if 'grid' in record:
+                    record['grid'] = os.path.relpath(record['grid'], ORBITAL_DIR)
+            meta = {'molecule': molecule, 'temperature': temp, 'inputs': inputs}
+            return outputs, meta
+
+        targets.append(make_target(f"orbital_inputs:{xyz_file.relative_to(results_dir)}",
+                                   [xyz_file], params, build))
+    return targets
+
+def write_orbital_summary(state):
+    """Merge the per-trajectory records into orbital_inputs/input_summary.json."""
+    orbitals = load_stage_module(ORBITAL_DIR, "generate_orbitals_from_xyz.py")
+    all_inputs = {}
+    for name, record in sorted(state['targets'].items()):
+        meta = record.get('meta') or {}
+        if name.startswith("orbital_inputs:") and meta.get('inputs'):
+            all_inputs.setdefault(meta['molecule'], {})[meta['temperature']] = meta['inputs']
+    output_dir = ORBITAL_DIR / "orbital_inputs"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return orbitals.write_input_summary(all_inputs, output_dir)
+
+def main():
+    admp = load_stage_module(ADMP_DIR, "generate_admp_inputs.py")
+    defaults = admp.DEFAULT_CONFIG
+
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the Gaussian workflow")
+    parser.add_argument("--temperatures", type=int, nargs="+", default=defaults['temperatures'],
+                      help="ADMP temperatures in Kelvin")
+    parser.add_argument("--max-frames", type=int, default=10,
+                      help="Maximum number of frames per trajectory (default: 10)")
+    parser.add_argument("--orbital-method", default="B3LYP",
+                      help="Method for frame calculations (default: B3LYP)")
+    parser.add_argument("--orbital-basis", default="6-31G(d)",
+                      help="Basis set for frame calculations (default: 6-31G(d))")
+    parser.add_argument("--align", action="store_true",
+                      help="Align frames and use one cube grid per trajectory")
+    parser.add_argument("--batch-size", type=int, default=1,
+                      help="Frames per orbital input, joined by --Link1-- (default: 1)")
+    parser.add_argument("--skip-geom", action="store_true",
+                      help="Treat gaussian_projects/*.gjf as sources (no RDKit needed)")
+    parser.add_argument("--jobs", type=int, default=4,
+                      help="Parallel builds per stage (default: 4)")
+    parser.add_argument("--dry-run", action="store_true",
+                      help="Only report which targets are out of date")
+
+    args = parser.parse_args()
+
+    config = dict(defaults, temperatures=args.temperatures, max_frames=args.max_frames,
+                  orbital_method=args.orbital_method, orbital_basis=args.orbital_basis, align=args.align,
+                  batch_size=args.batch_size)
+    state = load_state()
+
+    # Targets are listed stage by stage so later stages see earlier outputs
+    stages = [
+        ("ADMP inputs and barrier inputs", lambda: admp_input_targets(config) + barrier_targets()),
+        ("XYZ trajectories", lambda: xyz_targets(config)),
+        ("Orbital inputs", lambda: orbital_input_targets(config)),
+    ]
+    if not args.skip_geom:
+        stages.insert(0, ("Molecule geometries", geom_targets))
+
+    failed = 0
+    try:
+        for label, targets in stages:
+            print(f"\n{label}:")
+            failed += build_targets(targets(), state, jobs=args.jobs, dry_run=args.dry_run)
+    finally:
+        if not args.dry_run:
+            save_state(state)
+
+    if not args.dry_run:
+        summary_file = write_orbital_summary(state)
+        print(f"\nSummary of orbital inputs saved to: {summary_file}")
+    print(f"\nPipeline finished with {failed} failed targets")
+
+if __name__ == "__main__":
+    main()
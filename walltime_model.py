@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Predict SLURM walltimes for Gaussian inputs from our own job history.
+
+This script:
+1. Reads completed jobs from job_performance.db (harvesting new logs first)
+2. Fits ln(elapsed time per unit of work) against ln(atoms) and ln(basis
+   functions) separately for each job type, method and basis set, falling
+   back to coarser groups when a group has too few jobs; the unit of work is
+   one MD step for ADMP and one job otherwise
+3. Predicts the time of new inputs, adds a safety margin (an upper quantile
+   of the fit residuals times a factor) and rounds up to a SLURM --time
+
+Submission tooling calls "predict" with the inputs a job will run; without
+matching history it falls back to the given default time.
+
+Usage:
+    python walltime_model.py report
+    python walltime_model.py predict orbital_inputs/CF2O/800K/*.gjf
+    python walltime_model.py predict --aggregate max admp_jobs/*_r*.gjf --default 12:00:00
+"""
+
+import argparse
+import math
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from job_performance import DEFAULT_DB, classify_job_type, connect, harvest, route_method_basis
+
+# Basis functions per element for basis sets without history (Gaussian uses 6D for 6-31G(d))
+BASIS_FUNCTIONS = {
+    '6-31G(D)': {'H': 2, 'He': 2, 'row2': 15, 'row3': 19},
+    '6-31G*': {'H': 2, 'He': 2, 'row2': 15, 'row3': 19},
+    '6-31G': {'H': 2, 'He': 2, 'row2': 9, 'row3': 13},
+}
+ROW2 = {'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne'}
+ROW3 = {'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar'}
+
+MIN_JOBS = 3              # jobs needed before a group gets its own fit
+MIN_SIGMA = 0.25          # floor on the log-residual spread
+RIDGE = 0.1               # shrinks the slopes; atoms and basis functions are nearly collinear
+MAX_SECONDS = 7 * 86400   # partition limit
+ADMP_DEFAULT_POINTS = 50  # Gaussian default MaxPoints (steps 0-50 in the CF2O log)
+
+MAXPOINTS_PATTERN = re.compile(r'MaxPoints\s*=\s*(\d+)', re.IGNORECASE)
+SEGMENT_PATTERN = re.compile(r'_seg(\d+)$')
+
+def parse_slurm_time(text):
+    """Convert D-HH:MM:SS, HH:MM:SS or MM:SS to seconds."""
+    days = 0
+    if '-' in text:
+        day_text, text = text.split('-', 1)
+        days = int(day_text)
+    parts = [int(p) for p in text.split(':')]
+    while len(parts) < 3:
+        parts.insert(0, 0)
+    hours, minutes, seconds = parts
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+def format_slurm_time(seconds):
+    """Format seconds as a SLURM time, D-HH:MM:SS from one day upwards."""
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}-{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+def work_units(job_type, steps):
+    """Units of work a job's time is normalised by (MD steps for ADMP)."""
+    return max(1, steps or 1) if job_type == "admp" else 1
+
+def load_history(conn):
+    """Return rows (job_type, method, basis, natoms, nbasis, seconds per unit) of finished jobs."""
+    rows = []
+    for job_type, method, basis, natoms, nbasis, elapsed, scf_count in conn.execute("""
+            SELECT job_type, method, basis, natoms, nbasis, elapsed_seconds, scf_count
+            FROM jobs
+            WHERE status = 'normal' AND elapsed_seconds > 0 AND natoms > 0 AND nbasis > 0"""):
+        # One SCF per ADMP step (plus the initial one)
+        units = work_units(job_type, scf_count)
+        rows.append((job_type, (method or "").upper(), (basis or "").upper(),
+                     natoms, nbasis, elapsed / units))
+    return rows
+
+def fit_group(samples):
+    """
+    Ridge-regularised fit of ln(seconds) = c0 + c1 ln(natoms) + c2 ln(nbasis).
+
+    Returns (coefficients, residual sigma); groups too small or too uniform
+    for a slope fall back to the mean.
+    """
+    # Imported here, so predictions without history and quick calls start fast
+    import numpy as np
+
+    natoms = np.array([s[0] for s in samples], dtype=float)
+    nbasis = np.array([s[1] for s in samples], dtype=float)
+    y = np.log([s[2] for s in samples])
+
+    if len(samples) > 3 and np.ptp(np.log(nbasis)) > 0.1:
+        X = np.column_stack([np.ones_like(y), np.log(natoms), np.log(nbasis)])
+        # Penalty rows on the two slopes (the intercept is not penalised)
+        penalty = np.sqrt(RIDGE) * np.eye(3)[1:]
+        coefficients, *_ = np.linalg.lstsq(np.vstack([X, penalty]),
+                                           np.concatenate([y, np.zeros(2)]), rcond=None)
+    else:
+        X = np.ones((len(y), 1))
+        coefficients = np.array([y.mean()])
+    residuals = y - X @ coefficients
+    dof = max(1, len(y) - X.shape[1])
+    sigma = max(MIN_SIGMA, float(np.sqrt((residuals ** 2).sum() / dof)))
+    return np.pad(coefficients, (0, 3 - len(coefficients))), sigma
+
+def fit_models(rows):
+    """
+    Fit every group with enough jobs.
+
+    Keys are (job_type, method, basis), (job_type, method) and (job_type,);
+    values are (coefficients, sigma, number of jobs, basis functions per atom).
+    """
+    groups = {}
+    for job_type, method, basis, natoms, nbasis, seconds in rows:
+        for key in ((job_type, method, basis), (job_type, method), (job_type,)):
+            groups.setdefault(key, []).append((natoms, nbasis, seconds))
+
+    models = {}
+    for key, samples in groups.items():
+        if len(samples) >= MIN_JOBS:
+            coefficients, sigma = fit_group(samples)
+            per_atom = sum(nbasis / natoms for natoms, nbasis, _ in samples) / len(samples)
+            models[key] = (coefficients, sigma, len(samples), per_atom)
+    return models
+
+def lookup_model(models, job_type, method, basis):
+    """Most specific fitted model for a job, or None."""
+    method, basis = (method or "").upper(), (basis or "").upper()
+    for key in ((job_type, method, basis), (job_type, method), (job_type,)):
+        if key in models:
+            return models[key]
+    return None
+
+def estimate_nbasis(symbols, basis, per_atom=None):
+    """Basis functions for a geometry, from the table or the history's average per atom."""
+    table = BASIS_FUNCTIONS.get((basis or "").upper())
+    if table:
+        total = 0
+        for symbol in symbols:
+            if symbol in table:
+                total += table[symbol]
+            elif symbol in ROW2:
+                total += table['row2']
+            elif symbol in ROW3:
+                total += table['row3']
+            else:
+                total += table['row3'] + 10
+        return total
+    if per_atom:
+        return per_atom * len(symbols)
+    return None
+
+def predict_seconds(models, job_type, method, basis, symbols, steps=None,
+                    margin=1.5, quantile_z=2.0):
+    """
+    Predicted walltime with safety margin, or None without a usable model.
+
+    The margin is the z-quantile of the group's log residuals, multiplied by
+    the given factor.
+    """
+    model = lookup_model(models, job_type, method, basis)
+    if model is None or not symbols:
+        return None
+    coefficients, sigma, _, per_atom = model
+
+    nbasis = estimate_nbasis(symbols, basis, per_atom)
+    if not nbasis:
+        return None
+    log_seconds = (coefficients[0] + coefficients[1] * math.log(len(symbols))
+                   + coefficients[2] * math.log(nbasis))
+    seconds = math.exp(log_seconds + quantile_z * sigma) * margin
+    return seconds * work_units(job_type, steps)
+
+def read_gjf_jobs(gjf_file):
+    """
+    Return (route, symbols, ADMP steps) for each job in an input (several with --Link1--).
+
+    Jobs that read their geometry from a checkpoint inherit the atoms of the
+    previous job or, for ADMP restart segments, of the trajectory's first segment.
+    """
+    gjf_file = Path(gjf_file)
+    with open(gjf_file, 'r') as f:
+        text = f.read()
+
+    jobs = []
+    symbols = []
+    for block in text.split("--Link1--"):
+        lines = block.strip('\n').split('\n')
+        i = 0
+        while i < len(lines) and lines[i].startswith('%'):
+            i += 1
+        route_lines = []
+        while i < len(lines) and lines[i].strip():
+            route_lines.append(lines[i].strip())
+            i += 1
+        route = " ".join(route_lines)
+
+        if "allcheck" not in route.lower() and "restart" not in route.lower():
+            # Title, blank line, charge/multiplicity, then one atom per line
+            sections = "\n".join(lines[i + 1:]).split("\n\n")
+            if len(sections) >= 2:
+                atom_lines = sections[1].strip().split('\n')[1:]
+                found = [line.split()[0] for line in atom_lines if line.split()]
+                if found and not found[0][0].isdigit():
+                    symbols = [re.sub(r'[^A-Za-z].*', '', s).capitalize() for s in found]
+
+        steps = None
+        if "admp" in route.lower():
+            match = MAXPOINTS_PATTERN.search(route)
+            steps = int(match.group(1)) if match else ADMP_DEFAULT_POINTS
+        jobs.append((route, symbols, steps))
+
+    segment = SEGMENT_PATTERN.search(gjf_file.stem)
+    if segment and int(segment.group(1)) > 1:
+        # Restart segments give cumulative MaxPoints and no geometry
+        index = int(segment.group(1))
+        first = gjf_file.with_name(SEGMENT_PATTERN.sub("_seg01", gjf_file.stem) + gjf_file.suffix)
+        first_symbols = read_gjf_jobs(first)[0][1] if first.exists() else []
+        jobs = [(route, symbols or first_symbols, math.ceil(steps / index) if steps else steps)
+                for route, symbols, steps in jobs]
+    return jobs
+
+def predict_inputs(gjf_files, models, aggregate="sum", margin=1.5):
+    """
+    Predicted seconds for running the inputs, or None if any input cannot be predicted.
+
+    aggregate "sum" is for inputs run one after another in a single job,
+    "max" for one input per array task.
+    """
+    totals = []
+    for gjf_file in gjf_files:
+        seconds = 0.0
+        for route, symbols, steps in read_gjf_jobs(gjf_file):
+            method, basis = route_method_basis(route)
+            job_seconds = predict_seconds(models, classify_job_type(route), method, basis,
+                                          symbols, steps, margin)
+            if job_seconds is None:
+                return None
+            seconds += job_seconds
+        totals.append(seconds)
+    if not totals:
+        return None
+    return max(totals) if aggregate == "max" else sum(totals)
+
+def slurm_time(seconds, default, minimum=900, round_to=900):
+    """Round a prediction up to a SLURM time; the default when there is no prediction."""
+    if seconds is None:
+        return default
+    seconds = max(minimum, math.ceil(seconds / round_to) * round_to)
+    return format_slurm_time(min(seconds, MAX_SECONDS))
+
+def load_models(db_path=DEFAULT_DB, refresh=True):
+    """Fit the models from the performance database."""
+    conn = connect(db_path)
+    try:
+        if refresh:
+            harvest(conn)
+        return fit_models(load_history(conn))
+    finally:
+        conn.close()
+
+def time_for_inputs(gjf_files, default, aggregate="sum", margin=1.5, models=None,
+                    db_path=DEFAULT_DB):
+    """SLURM --time for running the given inputs, falling back to default."""
+    try:
+        if models is None:
+            models = load_models(db_path)
+        seconds = predict_inputs(gjf_files, models, aggregate, margin)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"WARNING: Walltime prediction failed ({e}); using {default}", file=sys.stderr)
+        return default
+    return slurm_time(seconds, default)
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict SLURM walltimes from past Gaussian jobs")
+    parser.add_argument("--db", default=str(DEFAULT_DB),
+                      help="Performance database (default: job_performance.db)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("report", help="Show the fitted models")
+
+    predict_parser = subparsers.add_parser("predict", help="Print a --time for running the given inputs")
+    predict_parser.add_argument("gjf_files", nargs="+", help="Gaussian inputs")
+    predict_parser.add_argument("--aggregate", choices=["sum", "max"], default="sum",
+                              help="sum: inputs run in one job; max: one input per array task")
+    predict_parser.add_argument("--margin", type=float, default=1.5,
+                              help="Factor on top of the residual quantile (default: 1.5)")
+    predict_parser.add_argument("--default", default="2-00:00:00",
+                              help="Time used without matching history (default: 2-00:00:00)")
+
+    args = parser.parse_args()
+
+    if args.command == "predict":
+        print(time_for_inputs(args.gjf_files, args.default, args.aggregate, args.margin,
+                              db_path=args.db))
+        return
+
+    models = load_models(args.db)
+    if not models:
+        print("No completed jobs with size information yet. Run job_performance.py first.")
+        return
+    print(f"{'group':<40}{'jobs':>6}{'c0':>9}{'atoms':>8}{'nbasis':>8}{'sigma':>8}")
+    for key, (coefficients, sigma, count, _) in sorted(models.items()):
+        print(f"{'/'.join(key):<40}{count:>6}{coefficients[0]:>9.2f}{coefficients[1]:>8.2f}"
+              f"{coefficients[2]:>8.2f}{sigma:>8.2f}")
+
+if __name__ == "__main__":
+    main()